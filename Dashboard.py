@@ -2,25 +2,22 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-import time
 import random
+import threading
+import os
+import sys
+import time
+import uuid
+import pickle
 import warnings
 warnings.filterwarnings('ignore')
 
-# Configuration de la page
-st.set_page_config(
-    page_title="Dashboard Top 40 Devises - Marché des Changes",
-    page_icon="💱",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+from forex_core import (MarketState, PositionLedger, make_data_source, MARKET_DATA_SOURCE, LEDGER_PATH,
+                         CORRELATION_WINDOWS, CROSS_RATE_TOLERANCE, SIGNAL_STRONG_FORCE)
 
 # CSS personnalisé
-st.markdown("""
+PAGE_CSS = """
 <style>
     .main-header {
         font-size: 2.8rem;
@@ -66,6 +63,11 @@ st.markdown("""
         font-size: 2rem;
         margin-right: 1rem;
     }
+    .currency-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fill, minmax(240px, 1fr));
+        gap: 1rem;
+    }
     .metric-highlight {
         background: linear-gradient(45deg, #f093fb 0%, #f5576c 100%);
         color: white;
@@ -115,645 +117,297 @@ st.markdown("""
         text-align: center;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-class ForexDashboard:
+def configure_page():
+    """Configure la page Streamlit et injecte le CSS (à appeler en tête du script uniquement)"""
+    # Configuration de la page
+    st.set_page_config(
+        page_title="Dashboard Top 40 Devises - Marché des Changes",
+        page_icon="💱",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    # CSS personnalisé
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
+
+# Durée de vie de l'état de marché partagé (secondes)
+MARKET_STATE_TTL = 3600
+# La régénération des données touche l'état partagé par toutes les sessions : réservée à l'administrateur
+ADMIN_MODE = os.environ.get('FOREX_ADMIN') == '1'
+
+def release_market_state(market):
+    """Arrête le producteur d'un état de marché évincé du cache"""
+    market.stop_live_feed()
+
+@st.cache_resource
+def get_live_state():
+    """Dernier état de marché construit, hors TTL : son moteur de ticks (prix, historique
+    intraday, extrêmes de la séance) est repris par l'état suivant"""
+    return {}
+
+@st.cache_resource(ttl=MARKET_STATE_TTL, show_spinner="Génération des données de marché...",
+                   on_release=release_market_state)
+def get_market_state():
+    """Construit l'état de marché partagé par toutes les sessions du processus"""
+    live = get_live_state()
+    previous = live.get('market')
+    if previous is not None:
+        # Un seul producteur à la fois sur le moteur de ticks repris
+        previous.stop_live_feed()
+    market = MarketState(source=make_data_source(MARKET_DATA_SOURCE),
+                         tick_engine=previous.tick_engine if previous is not None else None)
+    market.start_live_feed()
+    live['market'] = market
+    return market
+
+def invalidate_market_state():
+    """Invalide l'état de marché partagé : il sera reconstruit au prochain accès"""
+    # Régénération explicite : le moteur de ticks (prix, ouverture de séance) n'est pas repris
+    get_live_state().pop('market', None)
+    get_market_state.clear()
+
+def sparkline_ordinates(values, height=32):
+    """Ordonnées SVG (arrondies au dixième, telles qu'affichées) des colonnes d'une matrice (points × paires)"""
+    low, high = values.min(axis=0), values.max(axis=0)
+    return np.round(height - (values - low) / np.where(high > low, high - low, 1.0) * height, 1)
+
+def sparkline_svgs(values, width=200, height=32):
+    """Sparklines SVG (polyline) des colonnes d'une matrice (points × paires) ; chaînes vides sous deux points"""
+    n_points, n_paires = values.shape
+    if n_points < 2:
+        return [''] * n_paires
+    y = sparkline_ordinates(values, height)
+    # Un seul gabarit de format pour toutes les cartes : abscisses fixes, ordonnées substituées
+    template = ' '.join(f'{x:.1f},%.1f' for x in np.linspace(0, width, n_points))
+    return [f'<svg width="100%" height="{height}" viewBox="0 0 {width} {height}" preserveAspectRatio="none" '
+            f'style="margin-top: 0.5rem;"><polyline points="{template % tuple(column)}" fill="none" '
+            f'stroke="white" stroke-width="1.5" stroke-opacity="0.8"/></svg>'
+            for column in y.T.tolist()]
+
+def render_currency_card(currency, sparkline=''):
+    """Génère le HTML de la carte d'une paire de devises"""
+    intraday = (f"<br>↕️ Séance: {currency['bas']:.4f} – {currency['haut']:.4f}"
+                if 'haut' in currency else '')
+    change_class = "positive" if currency['change_pct'] > 0 else "negative" if currency['change_pct'] < 0 else "neutral"
+    card_class = f"currency-card category-{currency['categorie'].lower().replace(' ', '').replace('é', 'e')}"
+    
+    return f"""
+    <div class="{card_class}">
+        <div style="display: flex; align-items: center; margin-bottom: 1rem;">
+            <span class="currency-icon">{currency['icone']}</span>
+            <div>
+                <h3 style="margin: 0; font-size: 1.2rem;">{currency['symbole']}</h3>
+                <p style="margin: 0; opacity: 0.9; font-size: 0.9rem;">{currency['nom']}</p>
+            </div>
+        </div>
+        <div class="currency-value">{currency['prix']:.4f}</div>
+        <div style="font-size: 0.9rem; opacity: 0.8;">{currency['unite']}</div>
+        <div class="currency-change {change_class}">
+            {currency['change_pct']:+.2f}%
+        </div>{sparkline}
+        <div style="margin-top: 1rem; font-size: 0.8rem;">
+            📊 Vol: {currency['volume_journalier']:.1f}B<br>
+            📈 Volatilité: {currency['volatilite']:.1f}%{intraday}
+        </div>
+    </div>
+    """
+
+# Les sparklines des cartes sont redessinées au plus une fois par période (secondes) :
+# une courbe qui défile seule ne regénère pas la carte à chaque tick
+CARD_SPARKLINE_REFRESH = 30.0
+
+class CurrencyCardGrid:
+    """Grille des cartes de devises : un bloc HTML par catégorie, cartes regénérées seulement si leurs valeurs affichées changent"""
+    
     def __init__(self):
-        self.currencies = self.define_currencies()
-        self.historical_data = self.initialize_historical_data()
-        self.current_data = self.initialize_current_data()
-        self.market_data = self.initialize_market_data()
+        # symbole -> (valeurs affichées, HTML de la carte)
+        self.cards = {}
+        self.lock = threading.Lock()
+    
+    def render(self, snapshot, intraday=None, now=None):
+        """Retourne le HTML de chaque catégorie et la liste des paires dont la carte a changé.
+        
+        intraday (MarketState.intraday) ajoute les extrêmes de la séance et une sparkline par carte,
+        redessinée une fois par période CARD_SPARKLINE_REFRESH de l'horloge now (time.time par défaut).
+        """
+        # Valeurs telles qu'affichées : un tick invisible à l'arrondi ne regénère pas la carte
+        columns = [
+            np.char.mod('%.4f', snapshot['prix'].to_numpy(dtype=np.float64)),
+            np.char.mod('%+.2f', snapshot['change_pct'].to_numpy(dtype=np.float64)),
+            np.char.mod('%.1f', snapshot['volume_journalier'].to_numpy(dtype=np.float64))
+        ]
+        if intraday is not None:
+            columns += [np.char.mod('%.4f', intraday['haut']), np.char.mod('%.4f', intraday['bas'])]
+            # Période de rafraîchissement des sparklines : toutes les cartes sont redessinées à son changement
+            now = time.time() if now is None else now
+            columns.append(np.full(len(snapshot), int(now // CARD_SPARKLINE_REFRESH)))
+        keys = list(zip(*columns))
+        symboles = snapshot['symbole'].tolist()
+        categories = snapshot['categorie'].tolist()
+        
+        with self.lock:
+            positions = [i for i, (symbole, key) in enumerate(zip(symboles, keys))
+                         if self.cards.get(symbole, (None,))[0] != key]
+            sparklines = [''] * len(positions)
+            if intraday is not None:
+                sparklines = sparkline_svgs(intraday['sparkline'][:, positions])
+            # Lignes modifiées seulement, lues colonne par colonne : to_dict('records') sur le
+            # DataFrame coûtait plus que le rendu des cartes elles-mêmes
+            fields = list(snapshot.columns)
+            rows = zip(*(snapshot[field].to_numpy()[positions].tolist() for field in fields)) if positions else []
+            # Sans ligne vide ni indentation en tête : le bloc reste du HTML pour le Markdown
+            for i, row, sparkline in zip(positions, rows, sparklines):
+                currency = dict(zip(fields, row))
+                if intraday is not None:
+                    currency['haut'], currency['bas'] = intraday['haut'][i], intraday['bas'][i]
+                self.cards[symboles[i]] = (keys[i], render_currency_card(currency, sparkline).strip())
+            
+            grids = {}
+            for symbole, categorie in zip(symboles, categories):
+                grids.setdefault(categorie, []).append(self.cards[symbole][1])
         
-    def define_currencies(self):
-        """Définit les 40 principales paires de devises avec leurs caractéristiques"""
         return {
-            # Paires Majeures (contre USD)
-            'EUR/USD': {
-                'nom': 'Euro / Dollar Américain',
-                'symbole': 'EUR/USD',
-                'icone': '🇪🇺🇺🇸',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 1.0850,
-                'volatilite': 1.2,
-                'volume_journalier': 750.0,  # milliards USD
-                'pays': ['Zone Euro', 'États-Unis'],
-                'banque_centrale': ['BCE', 'Fed'],
-                'description': 'La paire de devises la plus échangée au monde'
-            },
-            'GBP/USD': {
-                'nom': 'Livre Sterling / Dollar Américain',
-                'symbole': 'GBP/USD',
-                'icone': '🇬🇧🇺🇸',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 1.2750,
-                'volatilite': 1.5,
-                'volume_journalier': 350.0,
-                'pays': ['Royaume-Uni', 'États-Unis'],
-                'banque_centrale': ['BoE', 'Fed'],
-                'description': 'Aussi connue sous le nom de "Cable"'
-            },
-            'USD/JPY': {
-                'nom': 'Dollar Américain / Yen Japonais',
-                'symbole': 'USD/JPY',
-                'icone': '🇺🇸🇯🇵',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 155.50,
-                'volatilite': 1.3,
-                'volume_journalier': 550.0,
-                'pays': ['États-Unis', 'Japon'],
-                'banque_centrale': ['Fed', 'BoJ'],
-                'description': 'La troisième paire la plus échangée'
-            },
-            'USD/CHF': {
-                'nom': 'Dollar Américain / Franc Suisse',
-                'symbole': 'USD/CHF',
-                'icone': '🇺🇸🇨🇭',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 0.9050,
-                'volatilite': 1.4,
-                'volume_journalier': 250.0,
-                'pays': ['États-Unis', 'Suisse'],
-                'banque_centrale': ['Fed', 'SNB'],
-                'description': 'Considérée comme une valeur refuge'
-            },
-            'AUD/USD': {
-                'nom': 'Dollar Australien / Dollar Américain',
-                'symbole': 'AUD/USD',
-                'icone': '🇦🇺🇺🇸',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 0.6650,
-                'volatilite': 1.6,
-                'volume_journalier': 200.0,
-                'pays': ['Australie', 'États-Unis'],
-                'banque_centrale': ['RBA', 'Fed'],
-                'description': 'Influencée par les prix des matières premières'
-            },
-            'USD/CAD': {
-                'nom': 'Dollar Américain / Dollar Canadien',
-                'symbole': 'USD/CAD',
-                'icone': '🇺🇸🇨🇦',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 1.3650,
-                'volatilite': 1.4,
-                'volume_journalier': 180.0,
-                'pays': ['États-Unis', 'Canada'],
-                'banque_centrale': ['Fed', 'BoC'],
-                'description': 'Influencée par les prix du pétrole'
-            },
-            'NZD/USD': {
-                'nom': 'Dollar Néo-Zélandais / Dollar Américain',
-                'symbole': 'NZD/USD',
-                'icone': '🇳🇿🇺🇸',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 0.6150,
-                'volatilite': 1.7,
-                'volume_journalier': 80.0,
-                'pays': ['Nouvelle-Zélande', 'États-Unis'],
-                'banque_centrale': ['RBNZ', 'Fed'],
-                'description': 'Souvent appelée "Kiwi"'
-            },
-            
-            # Paires Croisées Majeures
-            'EUR/GBP': {
-                'nom': 'Euro / Livre Sterling',
-                'symbole': 'EUR/GBP',
-                'icone': '🇪🇺🇬🇧',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 0.8520,
-                'volatilite': 1.3,
-                'volume_journalier': 100.0,
-                'pays': ['Zone Euro', 'Royaume-Uni'],
-                'banque_centrale': ['BCE', 'BoE'],
-                'description': 'Paire croisée importante'
-            },
-            'EUR/JPY': {
-                'nom': 'Euro / Yen Japonais',
-                'symbole': 'EUR/JPY',
-                'icone': '🇪🇺🇯🇵',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 168.50,
-                'volatilite': 1.5,
-                'volume_journalier': 120.0,
-                'pays': ['Zone Euro', 'Japon'],
-                'banque_centrale': ['BCE', 'BoJ'],
-                'description': 'Très liquide'
-            },
-            'GBP/JPY': {
-                'nom': 'Livre Sterling / Yen Japonais',
-                'symbole': 'GBP/JPY',
-                'icone': '🇬🇧🇯🇵',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 197.50,
-                'volatilite': 1.8,
-                'volume_journalier': 90.0,
-                'pays': ['Royaume-Uni', 'Japon'],
-                'banque_centrale': ['BoE', 'BoJ'],
-                'description': 'Connue pour sa volatilité'
-            },
-            'EUR/CHF': {
-                'nom': 'Euro / Franc Suisse',
-                'symbole': 'EUR/CHF',
-                'icone': '🇪🇺🇨🇭',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 0.9820,
-                'volatilite': 1.2,
-                'volume_journalier': 60.0,
-                'pays': ['Zone Euro', 'Suisse'],
-                'banque_centrale': ['BCE', 'SNB'],
-                'description': 'Considérée comme stable'
-            },
-            'EUR/AUD': {
-                'nom': 'Euro / Dollar Australien',
-                'symbole': 'EUR/AUD',
-                'icone': '🇪🇺🇦🇺',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 1.6320,
-                'volatilite': 1.6,
-                'volume_journalier': 50.0,
-                'pays': ['Zone Euro', 'Australie'],
-                'banque_centrale': ['BCE', 'RBA'],
-                'description': 'Influencée par les matières premières'
-            },
-            'EUR/CAD': {
-                'nom': 'Euro / Dollar Canadien',
-                'symbole': 'EUR/CAD',
-                'icone': '🇪🇺🇨🇦',
-                'categorie': 'Majeures',
-                'unite': 'taux de change',
-                'prix_base': 1.4820,
-                'volatilite': 1.5,
-                'volume_journalier': 45.0,
-                'pays': ['Zone Euro', 'Canada'],
-                'banque_centrale': ['BCE', 'BoC'],
-                'description': 'Paire croisée importante'
-            },
-            
-            # Paires Mineures
-            'USD/SEK': {
-                'nom': 'Dollar Américain / Couronne Suédoise',
-                'symbole': 'USD/SEK',
-                'icone': '🇺🇸🇸🇪',
-                'categorie': 'Mineures',
-                'unite': 'taux de change',
-                'prix_base': 10.7500,
-                'volatilite': 1.8,
-                'volume_journalier': 40.0,
-                'pays': ['États-Unis', 'Suède'],
-                'banque_centrale': ['Fed', 'Riksbank'],
-                'description': 'Paire nordique'
-            },
-            'USD/NOK': {
-                'nom': 'Dollar Américain / Couronne Norvégienne',
-                'symbole': 'USD/NOK',
-                'icone': '🇺🇸🇳🇴',
-                'categorie': 'Mineures',
-                'unite': 'taux de change',
-                'prix_base': 10.5500,
-                'volatilite': 1.9,
-                'volume_journalier': 35.0,
-                'pays': ['États-Unis', 'Norvège'],
-                'banque_centrale': ['Fed', 'Norges Bank'],
-                'description': 'Influencée par les prix du pétrole'
-            },
-            'USD/DKK': {
-                'nom': 'Dollar Américain / Couronne Danoise',
-                'symbole': 'USD/DKK',
-                'icone': '🇺🇸🇩🇰',
-                'categorie': 'Mineures',
-                'unite': 'taux de change',
-                'prix_base': 6.8800,
-                'volatilite': 1.4,
-                'volume_journalier': 30.0,
-                'pays': ['États-Unis', 'Danemark'],
-                'banque_centrale': ['Fed', 'Danmarks Nationalbank'],
-                'description': 'Liée à l\'EUR via l\'ERM II'
-            },
-            'USD/PLN': {
-                'nom': 'Dollar Américain / Zloty Polonais',
-                'symbole': 'USD/PLN',
-                'icone': '🇺🇸🇵🇱',
-                'categorie': 'Mineures',
-                'unite': 'taux de change',
-                'prix_base': 3.9500,
-                'volatilite': 2.0,
-                'volume_journalier': 25.0,
-                'pays': ['États-Unis', 'Pologne'],
-                'banque_centrale': ['Fed', 'NBP'],
-                'description': 'Paire d\'Europe de l\'Est'
-            },
-            'USD/CZK': {
-                'nom': 'Dollar Américain / Couronne Tchèque',
-                'symbole': 'USD/CZK',
-                'icone': '🇺🇸🇨🇿',
-                'categorie': 'Mineures',
-                'unite': 'taux de change',
-                'prix_base': 23.2500,
-                'volatilite': 1.7,
-                'volume_journalier': 20.0,
-                'pays': ['États-Unis', 'République Tchèque'],
-                'banque_centrale': ['Fed', 'ČNB'],
-                'description': 'Paire d\'Europe centrale'
-            },
-            'USD/HUF': {
-                'nom': 'Dollar Américain / Forint Hongrois',
-                'symbole': 'USD/HUF',
-                'icone': '🇺🇸🇭🇺',
-                'categorie': 'Mineures',
-                'unite': 'taux de change',
-                'prix_base': 355.50,
-                'volatilite': 2.1,
-                'volume_journalier': 18.0,
-                'pays': ['États-Unis', 'Hongrie'],
-                'banque_centrale': ['Fed', 'MNB'],
-                'description': 'Paire d\'Europe de l\'Est'
-            },
-            'USD/SGD': {
-                'nom': 'Dollar Américain / Dollar de Singapour',
-                'symbole': 'USD/SGD',
-                'icone': '🇺🇸🇸🇬',
-                'categorie': 'Mineures',
-                'unite': 'taux de change',
-                'prix_base': 1.3450,
-                'volatilite': 1.3,
-                'volume_journalier': 45.0,
-                'pays': ['États-Unis', 'Singapour'],
-                'banque_centrale': ['Fed', 'MAS'],
-                'description': 'Paire asiatique importante'
-            },
-            'USD/HKD': {
-                'nom': 'Dollar Américain / Dollar de Hong Kong',
-                'symbole': 'USD/HKD',
-                'icone': '🇺🇸🇭🇰',
-                'categorie': 'Mineures',
-                'unite': 'taux de change',
-                'prix_base': 7.8250,
-                'volatilite': 0.3,
-                'volume_journalier': 60.0,
-                'pays': ['États-Unis', 'Hong Kong'],
-                'banque_centrale': ['Fed', 'HKMA'],
-                'description': 'Paire à taux fixe'
-            },
-            'USD/ZAR': {
-                'nom': 'Dollar Américain / Rand Sud-Africain',
-                'symbole': 'USD/ZAR',
-                'icone': '🇺🇸🇿🇦',
-                'categorie': 'Mineures',
-                'unite': 'taux de change',
-                'prix_base': 18.8500,
-                'volatilite': 2.5,
-                'volume_journalier': 25.0,
-                'pays': ['États-Unis', 'Afrique du Sud'],
-                'banque_centrale': ['Fed', 'SARB'],
-                'description': 'Paire de matières premières'
-            },
-            'USD/MXN': {
-                'nom': 'Dollar Américain / Peso Mexicain',
-                'symbole': 'USD/MXN',
-                'icone': '🇺🇸🇲🇽',
-                'categorie': 'Mineures',
-                'unite': 'taux de change',
-                'prix_base': 16.8500,
-                'volatilite': 2.2,
-                'volume_journalier': 30.0,
-                'pays': ['États-Unis', 'Mexique'],
-                'banque_centrale': ['Fed', 'Banxico'],
-                'description': 'Paire d\'Amérique latine'
-            },
-            
-            # Paires Exotiques
-            'USD/TRY': {
-                'nom': 'Dollar Américain / Livre Turque',
-                'symbole': 'USD/TRY',
-                'icone': '🇺🇸🇹🇷',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 32.2500,
-                'volatilite': 3.5,
-                'volume_journalier': 15.0,
-                'pays': ['États-Unis', 'Turquie'],
-                'banque_centrale': ['Fed', 'CBRT'],
-                'description': 'Paire très volatile'
-            },
-            'USD/THB': {
-                'nom': 'Dollar Américain / Baht Thaïlandais',
-                'symbole': 'USD/THB',
-                'icone': '🇺🇸🇹🇭',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 36.5500,
-                'volatilite': 1.8,
-                'volume_journalier': 12.0,
-                'pays': ['États-Unis', 'Thaïlande'],
-                'banque_centrale': ['Fed', 'BOT'],
-                'description': 'Paire d\'Asie du Sud-Est'
-            },
-            'USD/IDR': {
-                'nom': 'Dollar Américain / Rupiah Indonésien',
-                'symbole': 'USD/IDR',
-                'icone': '🇺🇸🇮🇩',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 15850.0,
-                'volatilite': 2.0,
-                'volume_journalier': 10.0,
-                'pays': ['États-Unis', 'Indonésie'],
-                'banque_centrale': ['Fed', 'BI'],
-                'description': 'Paire d\'Asie du Sud-Est'
-            },
-            'USD/INR': {
-                'nom': 'Dollar Américain / Roupie Indienne',
-                'symbole': 'USD/INR',
-                'icone': '🇺🇸🇮🇳',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 83.2500,
-                'volatilite': 1.5,
-                'volume_journalier': 20.0,
-                'pays': ['États-Unis', 'Inde'],
-                'banque_centrale': ['Fed', 'RBI'],
-                'description': 'Paire asiatique importante'
-            },
-            'USD/CNY': {
-                'nom': 'Dollar Américain / Yuan Chinois',
-                'symbole': 'USD/CNY',
-                'icone': '🇺🇸🇨🇳',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 7.2450,
-                'volatilite': 1.4,
-                'volume_journalier': 40.0,
-                'pays': ['États-Unis', 'Chine'],
-                'banque_centrale': ['Fed', 'PBoC'],
-                'description': 'Paire gérée par la Chine'
-            },
-            'USD/KRW': {
-                'nom': 'Dollar Américain / Won Sud-Coréen',
-                'symbole': 'USD/KRW',
-                'icone': '🇺🇸🇰🇷',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 1325.50,
-                'volatilite': 1.6,
-                'volume_journalier': 15.0,
-                'pays': ['États-Unis', 'Corée du Sud'],
-                'banque_centrale': ['Fed', 'BoK'],
-                'description': 'Paire asiatique importante'
-            },
-            'USD/BRL': {
-                'nom': 'Dollar Américain / Real Brésilien',
-                'symbole': 'USD/BRL',
-                'icone': '🇺🇸🇧🇷',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 5.2500,
-                'volatilite': 2.8,
-                'volume_journalier': 18.0,
-                'pays': ['États-Unis', 'Brésil'],
-                'banque_centrale': ['Fed', 'BCB'],
-                'description': 'Paire d\'Amérique du Sud'
-            },
-            'USD/RUB': {
-                'nom': 'Dollar Américain / Rouble Russe',
-                'symbole': 'USD/RUB',
-                'icone': '🇺🇸🇷🇺',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 91.2500,
-                'volatilite': 3.2,
-                'volume_journalier': 12.0,
-                'pays': ['États-Unis', 'Russie'],
-                'banque_centrale': ['Fed', 'CBR'],
-                'description': 'Paire très volatile'
-            },
-            'USD/CLP': {
-                'nom': 'Dollar Américain / Peso Chilien',
-                'symbole': 'USD/CLP',
-                'icone': '🇺🇸🇨🇱',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 925.50,
-                'volatilite': 2.0,
-                'volume_journalier': 8.0,
-                'pays': ['États-Unis', 'Chili'],
-                'banque_centrale': ['Fed', 'BCCh'],
-                'description': 'Paire d\'Amérique du Sud'
-            },
-            'USD/COP': {
-                'nom': 'Dollar Américain / Peso Colombien',
-                'symbole': 'USD/COP',
-                'icone': '🇺🇸🇨🇴',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 3850.50,
-                'volatilite': 2.3,
-                'volume_journalier': 6.0,
-                'pays': ['États-Unis', 'Colombie'],
-                'banque_centrale': ['Fed', 'Banco de la República'],
-                'description': 'Paire d\'Amérique du Sud'
-            },
-            'USD/PHP': {
-                'nom': 'Dollar Américain / Peso Philippin',
-                'symbole': 'USD/PHP',
-                'icone': '🇺🇸🇵🇭',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 56.8500,
-                'volatilite': 1.7,
-                'volume_journalier': 8.0,
-                'pays': ['États-Unis', 'Philippines'],
-                'banque_centrale': ['Fed', 'BSP'],
-                'description': 'Paire d\'Asie du Sud-Est'
-            },
-            'USD/MYR': {
-                'nom': 'Dollar Américain / Ringgit Malaisien',
-                'symbole': 'USD/MYR',
-                'icone': '🇺🇸🇲🇾',
-                'categorie': 'Exotiques',
-                'unite': 'taux de change',
-                'prix_base': 4.6250,
-                'volatilite': 1.5,
-                'volume_journalier': 10.0,
-                'pays': ['États-Unis', 'Malaisie'],
-                'banque_centrale': ['Fed', 'BNM'],
-                'description': 'Paire d\'Asie du Sud-Est'
-            },
-            
-            # Cryptomonnaies
-            'BTC/USD': {
-                'nom': 'Bitcoin / Dollar Américain',
-                'symbole': 'BTC/USD',
-                'icone': '₿',
-                'categorie': 'Cryptomonnaies',
-                'unite': 'taux de change',
-                'prix_base': 65250.0,
-                'volatilite': 4.5,
-                'volume_journalier': 30.0,
-                'pays': ['Global', 'États-Unis'],
-                'banque_centrale': ['Décentralisé', 'Fed'],
-                'description': 'La cryptomonnaie la plus connue'
-            },
-            'ETH/USD': {
-                'nom': 'Ethereum / Dollar Américain',
-                'symbole': 'ETH/USD',
-                'icone': 'Ξ',
-                'categorie': 'Cryptomonnaies',
-                'unite': 'taux de change',
-                'prix_base': 3250.0,
-                'volatilite': 5.0,
-                'volume_journalier': 20.0,
-                'pays': ['Global', 'États-Unis'],
-                'banque_centrale': ['Décentralisé', 'Fed'],
-                'description': 'Deuxième cryptomonnaie par capitalisation'
-            }
-        }
+            categorie: f'<div class="currency-grid">{"".join(cards)}</div>'
+            for categorie, cards in grids.items()
+        }, [symboles[i] for i in positions]
+
+# Sessions : mise en veille après inactivité (secondes), oubli des sessions disparues (secondes)
+# et budget mémoire de l'état de chaque session (octets)
+SESSION_IDLE_TIMEOUT = 15 * 60
+SESSION_FORGET_AFTER = 2 * 3600
+SESSION_MEMORY_BUDGET = 256 * 1024
+# Entrées de l'état de session gérées par l'application, jamais évincées
+SESSION_RESERVED_KEYS = ('session_id', 'en_veille', 'etat_marche_vu', 'empreinte_widgets')
+
+class SessionRegistry:
+    """Sessions abonnées à l'état partagé : dernière interaction et empreinte mémoire de chacune"""
     
-    def initialize_historical_data(self):
-        """Initialise les données historiques des devises"""
-        dates = pd.date_range('2020-01-01', datetime.now(), freq='D')
-        data = []
-        
-        for date in dates:
-            for symbole, info in self.currencies.items():
-                # Prix de base
-                base_price = info['prix_base']
-                
-                # Impact des événements mondiaux
-                global_impact = 1.0
-                
-                # Crise COVID (2020)
-                if date.year == 2020 and date.month <= 6:
-                    if 'USD' in symbole and symbole != 'USD/JPY':
-                        global_impact *= random.uniform(1.05, 1.15)  # USD renforcé
-                    else:
-                        global_impact *= random.uniform(0.9, 1.1)
-                # Reprise post-COVID (2021)
-                elif date.year == 2021:
-                    if 'USD' in symbole and symbole != 'USD/JPY':
-                        global_impact *= random.uniform(0.95, 1.05)  # USD affaibli
-                    else:
-                        global_impact *= random.uniform(1.05, 1.15)
-                # Guerre Ukraine (2022)
-                elif date.year == 2022 and date.month >= 2:
-                    if symbole in ['EUR/USD', 'GBP/USD']:
-                        global_impact *= random.uniform(0.9, 1.0)  # EUR/GBP affaiblis
-                    elif symbole in ['USD/CHF', 'USD/JPY']:
-                        global_impact *= random.uniform(1.0, 1.1)  # CHF/JPY renforcés
-                # Tensions récentes
-                elif date.year >= 2023:
-                    global_impact *= random.uniform(0.98, 1.08)
-                
-                # Volatilité quotidienne basée sur le profil de volatilité
-                daily_volatility = random.normalvariate(1, info['volatilite']/100)
-                
-                # Tendance saisonnière
-                seasonal = 1 + 0.003 * np.sin(2 * np.pi * date.dayofyear / 365)
-                
-                prix_actuel = base_price * global_impact * daily_volatility * seasonal
-                
-                data.append({
-                    'date': date,
-                    'symbole': symbole,
-                    'nom': info['nom'],
-                    'categorie': info['categorie'],
-                    'prix': prix_actuel,
-                    'volume': random.uniform(100000, 5000000),
-                    'volatilite_jour': abs(daily_volatility - 1) * 100
-                })
-        
-        return pd.DataFrame(data)
+    def __init__(self):
+        self.sessions = {}
+        self.lock = threading.Lock()
     
-    def initialize_current_data(self):
-        """Initialise les données courantes"""
-        current_data = []
-        for symbole, info in self.currencies.items():
-            # Dernières données historiques
-            last_data = self.historical_data[self.historical_data['symbole'] == symbole].iloc[-1]
-            
-            # Variations simulées
-            change_pct = random.uniform(-2.0, 2.0)
-            
-            current_data.append({
-                'symbole': symbole,
-                'nom': info['nom'],
-                'icone': info['icone'],
-                'categorie': info['categorie'],
-                'unite': info['unite'],
-                'prix': last_data['prix'] * (1 + change_pct/100),
-                'change_pct': change_pct,
-                'volatilite': info['volatilite'],
-                'volume_journalier': info['volume_journalier'],
-                'pays': info['pays'],
-                'banque_centrale': info['banque_centrale'],
-                'spread': random.uniform(0.1, 2.0)
-            })
-        
-        return pd.DataFrame(current_data)
+    def touch(self, session_id, size, now=None):
+        """Enregistre une interaction de la session et oublie les sessions disparues"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self.sessions[session_id] = (now, size)
+            self.sessions = {key: value for key, value in self.sessions.items()
+                             if now - value[0] <= SESSION_FORGET_AFTER}
     
-    def initialize_market_data(self):
-        """Initialise les données des marchés mondiaux"""
-        indices = {
-            'Dollar Index (DXY)': {'valeur': 104.5, 'change': 0.0, 'secteur': 'USD'},
-            'Euro Index': {'valeur': 95.2, 'change': 0.0, 'secteur': 'EUR'},
-            'Pound Index': {'valeur': 92.8, 'change': 0.0, 'secteur': 'GBP'},
-            'Yen Index': {'valeur': 88.5, 'change': 0.0, 'secteur': 'JPY'},
-            'Franc Index': {'valeur': 96.3, 'change': 0.0, 'secteur': 'CHF'},
-            'Aussie Index': {'valeur': 90.7, 'change': 0.0, 'secteur': 'AUD'},
-            'Loonie Index': {'valeur': 91.2, 'change': 0.0, 'secteur': 'CAD'},
-            'Kiwi Index': {'valeur': 89.8, 'change': 0.0, 'secteur': 'NZD'}
-        }
-        
-        return {'indices': indices}
+    def is_idle(self, session_id, now=None):
+        """Vrai si la session n'a pas interagi depuis SESSION_IDLE_TIMEOUT"""
+        now = time.monotonic() if now is None else now
+        last_seen, _ = self.sessions.get(session_id, (now, 0))
+        return now - last_seen > SESSION_IDLE_TIMEOUT
     
-    def update_live_data(self):
-        """Met à jour les données en temps réel"""
-        for idx in self.current_data.index:
-            symbole = self.current_data.loc[idx, 'symbole']
-            
-            # Mise à jour des prix
-            if random.random() < 0.6:  # 60% de chance de changement
-                variation = random.uniform(-1.0, 1.0)
-                
-                self.current_data.loc[idx, 'prix'] *= (1 + variation/100)
-                self.current_data.loc[idx, 'change_pct'] = variation
-                
-                # Mise à jour du volume
-                self.current_data.loc[idx, 'volume_journalier'] *= random.uniform(0.8, 1.2)
+    def summary(self, now=None):
+        """Nombre de sessions actives et mémoire totale de leurs états (octets)"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            active = [size for last_seen, size in self.sessions.values() if now - last_seen <= SESSION_IDLE_TIMEOUT]
+        return len(active), sum(active)
+
+@st.cache_resource
+def get_session_registry():
+    """Registre des sessions du processus"""
+    return SessionRegistry()
+
+def session_state_sizes():
+    """Taille sérialisée (octets) de chaque entrée de l'état de la session courante"""
+    sizes = {}
+    for key, value in st.session_state.to_dict().items():
+        try:
+            sizes[key] = len(pickle.dumps(value))
+        except Exception:
+            sizes[key] = sys.getsizeof(value)
+    return sizes
+
+def enforce_session_budget(budget=SESSION_MEMORY_BUDGET):
+    """Évince les plus grosses entrées de l'état de session au-delà du budget ; retourne la taille finale"""
+    sizes = session_state_sizes()
+    total = sum(sizes.values())
+    for key in sorted(sizes, key=sizes.get, reverse=True):
+        if total <= budget:
+            break
+        if key in SESSION_RESERVED_KEYS:
+            continue
+        del st.session_state[key]
+        total -= sizes[key]
+    return total
+
+def widget_fingerprint():
+    """Empreinte des valeurs des widgets nommés de la session : elle change quand l'utilisateur agit"""
+    return hash(tuple(sorted((key, repr(value)) for key, value in st.session_state.to_dict().items()
+                             if key not in SESSION_RESERVED_KEYS)))
+
+def resume_session():
+    """Sort la session de veille (rappel du bouton Reprendre)"""
+    st.session_state['en_veille'] = False
+
+@st.cache_resource(on_release=lambda ledger: ledger.close_connection())
+def get_position_ledger():
+    """Registre des positions partagé par les sessions du processus"""
+    return PositionLedger(LEDGER_PATH)
+
+@st.cache_resource
+def get_card_grid():
+    """Grille de cartes partagée par les sessions (le HTML ne dépend que des valeurs affichées)"""
+    return CurrencyCardGrid()
+
+# Largeur de référence des graphiques (pixels) : un intervalle min/max par pixel
+CHART_PIXEL_WIDTH = 1000
+# Au-delà de ce nombre de points par figure, les traces passent en WebGL
+WEBGL_POINT_THRESHOLD = 1000
+
+def downsample_minmax(values, n_buckets):
+    """Indices conservés par un sous-échantillonnage min/max (2 points par intervalle, par colonne)"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return downsample_minmax(values[:, None], n_buckets)[:, 0]
     
-    def calculate_rsi(self, prices, period=14):
-        """Calcule le RSI (Relative Strength Index)"""
-        delta = prices.diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+    n = len(values)
+    if n <= 2 * n_buckets:
+        return np.broadcast_to(np.arange(n)[:, None], values.shape)
     
-    def calculate_bollinger_bands(self, prices, period=20, std_dev=2):
-        """Calcule les bandes de Bollinger"""
-        sma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
-        
-        upper_band = sma + (std * std_dev)
-        lower_band = sma - (std * std_dev)
-        
-        return upper_band, lower_band
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    padded = np.full((n_buckets * size, values.shape[1]), np.nan)
+    padded[:n] = values
+    blocks = padded.reshape(n_buckets, size, -1)
+    missing = np.isnan(blocks)
+    offsets = (np.arange(n_buckets) * size)[:, None]
+    lows = np.where(missing, np.inf, blocks).argmin(axis=1) + offsets
+    highs = np.where(missing, -np.inf, blocks).argmax(axis=1) + offsets
+    
+    # Premier et dernier points toujours conservés, ordre chronologique rétabli
+    edges = np.broadcast_to(np.array([[0], [n - 1]]), (2, values.shape[1]))
+    return np.sort(np.concatenate([edges, lows, highs]), axis=0).clip(max=n - 1)
+
+def downsample_columns(x, frame, n_buckets=CHART_PIXEL_WIDTH):
+    """Sous-échantillonne chaque colonne d'un tableau : retourne {colonne: (x, y)}"""
+    x = np.asarray(x)
+    values = frame.to_numpy(dtype=np.float64)
+    idx = downsample_minmax(values, n_buckets)
+    return {
+        column: (x[idx[:, j]], values[idx[:, j], j])
+        for j, column in enumerate(frame.columns)
+    }
+
+def line_trace_class(n_points):
+    """Scatter (SVG) pour les petites figures, Scattergl (WebGL) au-delà du seuil"""
+    import plotly.graph_objects as go
+    
+    return go.Scattergl if n_points > WEBGL_POINT_THRESHOLD else go.Scatter
+
+class ForexDashboard:
+    def __init__(self, market):
+        # Les sessions ne font que lire l'état partagé
+        self.market = market
+        self.currencies = market.currencies
+        self.price_store = market.price_store
+        self.current_data = market.live_snapshot()
     
     def display_header(self):
         """Affiche l'en-tête du dashboard"""
@@ -780,44 +434,72 @@ class ForexDashboard:
         st.markdown('<h3 class="section-header">💰 TAUX DE CHANGE EN TEMPS RÉEL</h3>', 
                    unsafe_allow_html=True)
         
-        # Grouper par catégorie
-        categories = self.current_data['categorie'].unique()
+        # Un seul bloc par catégorie ; seules les cartes modifiées sont regénérées
+        grids, _ = get_card_grid().render(self.current_data, self.market.intraday())
         
-        for categorie in categories:
-            st.markdown(f'<h4 style="color: #0055A4; margin-top: 1rem;">{categorie}</h4>', 
+        for categorie, grid in grids.items():
+            st.markdown(f'<h4 style="color: #0055A4; margin-top: 1rem;">{categorie}</h4>{grid}', 
                        unsafe_allow_html=True)
-            
-            cat_data = self.current_data[self.current_data['categorie'] == categorie]
-            
-            # Afficher 4 devises par ligne
-            for i in range(0, len(cat_data), 4):
-                cols = st.columns(min(4, len(cat_data) - i))
-                
-                for j, (_, currency) in enumerate(cat_data.iloc[i:i+4].iterrows()):
-                    with cols[j]:
-                        change_class = "positive" if currency['change_pct'] > 0 else "negative" if currency['change_pct'] < 0 else "neutral"
-                        card_class = f"currency-card category-{categorie.lower().replace(' ', '').replace('é', 'e')}"
-                        
-                        st.markdown(f"""
-                        <div class="{card_class}">
-                            <div style="display: flex; align-items: center; margin-bottom: 1rem;">
-                                <span class="currency-icon">{currency['icone']}</span>
-                                <div>
-                                    <h3 style="margin: 0; font-size: 1.2rem;">{currency['symbole']}</h3>
-                                    <p style="margin: 0; opacity: 0.9; font-size: 0.9rem;">{currency['nom']}</p>
-                                </div>
-                            </div>
-                            <div class="currency-value">{currency['prix']:.4f}</div>
-                            <div style="font-size: 0.9rem; opacity: 0.8;">{currency['unite']}</div>
-                            <div class="currency-change {change_class}">
-                                {currency['change_pct']:+.2f}%
-                            </div>
-                            <div style="margin-top: 1rem; font-size: 0.8rem;">
-                                📊 Vol: {currency['volume_journalier']:.1f}B<br>
-                                📈 Volatilité: {currency['volatilite']:.1f}%
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
+    
+    def display_currency_indices(self):
+        """Affiche les indices de devises (paniers pondérés) et leur évolution sur la séance"""
+        st.markdown('<h3 class="section-header">🧺 INDICES DE DEVISES</h3>', 
+                   unsafe_allow_html=True)
+        
+        indices = self.market.live_indices().frame()
+        if indices.empty:
+            st.info("Aucun panier calculable avec les paires de cet univers")
+            return
+        # Une colonne de sparklines : une liste de valeurs par indice
+        indices['seance'] = list(self.market.intraday_indices().T)
+        st.dataframe(
+            indices,
+            column_config={
+                'indice': "Indice",
+                'devise': "Devise",
+                'valeur': st.column_config.NumberColumn("Valeur", format="%.2f"),
+                'change_pct': st.column_config.NumberColumn("Variation (%)", format="%+.2f"),
+                'seance': st.column_config.LineChartColumn("Séance")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    
+    def display_cross_rates(self):
+        """Affiche la matrice des taux croisés et les incohérences triangulaires"""
+        st.markdown('<h3 class="section-header">🔀 TAUX CROISÉS</h3>', 
+                   unsafe_allow_html=True)
+        
+        cross_rates = self.market.live_cross_rates()
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            devises = st.multiselect(
+                "Devises de la matrice:",
+                cross_rates.devises,
+                default=['USD', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD'],
+                key='taux_croises_devises'
+            )
+            if devises:
+                st.dataframe(cross_rates.matrix(devises).style.format('{:.4f}'), use_container_width=True)
+        
+        with col2:
+            # Paire quelconque, cotée ou non, dérivée des jambes USD
+            base = st.selectbox("Devise de base:", cross_rates.devises, index=cross_rates.devises.index('EUR'),
+                                key='taux_croise_base')
+            quote = st.selectbox("Devise de cotation:", cross_rates.devises,
+                                 index=cross_rates.devises.index('JPY'), key='taux_croise_cotation')
+            st.metric(f"{base}/{quote}", f"{cross_rates.rate(base, quote):.4f}")
+        
+        inconsistencies = cross_rates.inconsistencies()
+        if inconsistencies.empty:
+            st.success("✅ Toutes les paires cotées sont cohérentes avec les jambes USD")
+        else:
+            st.warning(f"⚠️ {len(inconsistencies)} paire(s) cotée(s) incohérente(s) avec les jambes USD "
+                       f"(écart > {CROSS_RATE_TOLERANCE:.1%})")
+            st.dataframe(inconsistencies.style.format({
+                'Prix coté': '{:.4f}', 'Taux implicite': '{:.4f}', 'Écart (%)': '{:+.2f}'
+            }), hide_index=True, use_container_width=True)
     
     def display_key_metrics(self):
         """Affiche les métriques clés"""
@@ -847,22 +529,59 @@ class ForexDashboard:
                 f"{random.randint(-8, 12)}% vs hier"
             )
         
+        # Sparklines et extrêmes de la séance (vues sur l'historique des ticks)
+        intraday = self.market.intraday()
+        strongest = self.current_data.index.get_loc(strongest_currency.name)
+        weakest = self.current_data.index.get_loc(weakest_currency.name)
+        
         with col3:
             st.metric(
                 "Plus Forte Hausse",
                 f"{strongest_currency['symbole']}",
-                f"{strongest_currency['change_pct']:+.2f}%"
+                f"{strongest_currency['change_pct']:+.2f}%",
+                help=f"Séance : {intraday['bas'][strongest]:.4f} – {intraday['haut'][strongest]:.4f}",
+                chart_data=intraday['sparkline'][:, strongest].tolist()
             )
         
         with col4:
             st.metric(
                 "Plus Forte Baisse",
                 f"{weakest_currency['symbole']}",
-                f"{weakest_currency['change_pct']:+.2f}%"
+                f"{weakest_currency['change_pct']:+.2f}%",
+                help=f"Séance : {intraday['bas'][weakest]:.4f} – {intraday['haut'][weakest]:.4f}",
+                chart_data=intraday['sparkline'][:, weakest].tolist()
             )
     
+    def display_live_panels(self, panels, refresh_interval=None):
+        """Affiche les widgets temps réel dans un fragment rafraîchi indépendamment du reste de la page"""
+        @st.fragment(run_every=refresh_interval)
+        def live_panels():
+            # Rerun du fragment provoqué par un widget (et non par le minuteur) : c'est une interaction
+            fingerprint = widget_fingerprint()
+            if fingerprint != st.session_state.get('empreinte_widgets'):
+                st.session_state['empreinte_widgets'] = fingerprint
+                if not st.session_state.get('en_veille'):
+                    get_session_registry().touch(st.session_state.get('session_id'), enforce_session_budget())
+            if refresh_interval is not None and get_session_registry().is_idle(st.session_state.get('session_id')):
+                # Session inactive : rechargement complet sans rafraîchissement automatique
+                st.session_state['en_veille'] = True
+                st.rerun()
+            self.current_data = self.market.live_snapshot()
+            feed = self.market.live_feed
+            if feed is not None and feed.error is not None:
+                st.warning(f"⚠️ Flux temps réel en erreur ({feed.error!r}) : prix figés depuis "
+                           f"{feed.last_success.strftime('%H:%M:%S')}")
+            for panel in panels:
+                panel()
+        
+        live_panels()
+    
     def create_price_overview(self):
         """Crée la vue d'ensemble des prix"""
+        # Chargement différé : plotly n'est importé qu'à l'affichage de la page
+        import plotly.express as px
+        import plotly.graph_objects as go
+        
         st.markdown('<h3 class="section-header">📈 ANALYSE DES TAUX HISTORIQUES</h3>', 
                    unsafe_allow_html=True)
         
@@ -892,11 +611,8 @@ class ForexDashboard:
                     index=3
                 )
             
-            # Filtrage des données
-            filtered_data = self.historical_data[
-                self.historical_data['symbole'].isin(selected_currencies)
-            ]
-            
+            # Filtrage des données (colonnes des paires, bornes de dates par dichotomie)
+            cutoff_date = None
             if period != 'Toute la période':
                 if 'mois' in period:
                     months = int(period.split()[0])
@@ -904,22 +620,38 @@ class ForexDashboard:
                 else:
                     years = int(period.split()[0])
                     cutoff_date = datetime.now() - timedelta(days=365 * years)
-                filtered_data = filtered_data[filtered_data['date'] >= cutoff_date]
             
-            fig = px.line(filtered_data, 
-                         x='date', 
-                         y='prix',
-                         color='symbole',
-                         title=f'Évolution des Taux de Change ({period})',
-                         color_discrete_sequence=px.colors.qualitative.Bold)
+            chart_type = st.radio("Type de graphique:", ['Lignes', 'Chandeliers'], horizontal=True)
+            
+            # Barres lues au niveau le plus grossier de la pyramide OHLC qui remplit le graphique
+            filtered_data = self.market.ohlc_bars(selected_currencies, start=cutoff_date)
+            niveau = filtered_data.attrs['niveau']
+            
+            if chart_type == 'Chandeliers' and selected_currencies:
+                candle_pair = st.selectbox("Paire:", selected_currencies)
+                candles = filtered_data[filtered_data['symbole'] == candle_pair]
+                fig = go.Figure(go.Candlestick(x=candles['date'], open=candles['ouverture'], high=candles['haut'],
+                                               low=candles['bas'], close=candles['cloture'], name=candle_pair))
+                fig.update_layout(title=f'{candle_pair} ({period}, barres par {niveau})',
+                                  xaxis_rangeslider_visible=False)
+            else:
+                fig = px.line(filtered_data, 
+                             x='date', 
+                             y='cloture',
+                             color='symbole',
+                             title=f'Évolution des Taux de Change ({period}, clôtures par {niveau})',
+                             color_discrete_sequence=px.colors.qualitative.Bold,
+                             render_mode='webgl' if len(filtered_data) > WEBGL_POINT_THRESHOLD else 'svg')
             fig.update_layout(yaxis_title="Taux de Change")
             st.plotly_chart(fig, use_container_width=True)
         
         with tab2:
-            # Analyse par catégorie
-            fig = px.box(self.historical_data, 
+            # Analyse par catégorie : clôtures mensuelles de la pyramide (quelques milliers de lignes
+            # au lieu de l'historique journalier complet), catégorie jointe depuis la table des paires
+            monthly = self.market.ohlc_bars(list(self.currencies), level='mois')
+            fig = px.box(self.market.with_metadata(monthly, ['categorie']), 
                         x='categorie', 
-                        y='prix',
+                        y='cloture',
                         title='Distribution des Taux par Catégorie',
                         color='categorie')
             st.plotly_chart(fig, use_container_width=True)
@@ -927,49 +659,49 @@ class ForexDashboard:
         with tab3:
             col1, col2 = st.columns(2)
             
+            volatility = self.market.volatility_model()
+            
             with col1:
-                # Volatilité historique
-                volatilite_data = self.historical_data.groupby('symbole')['volatilite_jour'].mean().reset_index()
-                fig = px.bar(volatilite_data, 
+                # Volatilité journalière prévue : EWMA et GARCH(1,1) face au niveau de long terme
+                parameters = volatility.parameters()
+                fig = px.bar(parameters.melt(id_vars='symbole', value_vars=['long_terme', 'ewma', 'garch'],
+                                             var_name='modele', value_name='volatilite'),
                             x='symbole', 
-                            y='volatilite_jour',
-                            title='Volatilité Historique Moyenne (%)',
-                            color='symbole',
+                            y='volatilite',
+                            color='modele',
+                            barmode='group',
+                            title='Volatilité Journalière Prévue (%)',
                             color_discrete_sequence=px.colors.qualitative.Bold)
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                # Volatilité récente (30 derniers jours)
-                recent_data = self.historical_data[
-                    self.historical_data['date'] > (datetime.now() - timedelta(days=30))
-                ]
-                recent_vol = recent_data.groupby('symbole')['volatilite_jour'].std().reset_index()
-                
-                fig = px.scatter(recent_vol, 
-                               x='symbole', 
-                               y='volatilite_jour',
-                               size='volatilite_jour',
-                               title='Volatilité Récente (30 jours)',
-                               color='symbole',
-                               size_max=40)
+                # Structure par terme : volatilité réalisée sur les h derniers jours, prévue sur les h prochains
+                symbole_vol = st.selectbox("Paire:", volatility.symboles, key='volatilite_paire')
+                term_structure = volatility.term_structure([symbole_vol])
+                fig = go.Figure()
+                for colonne, nom in [('realisee', 'Réalisée'), ('ewma', 'EWMA'), ('garch', 'GARCH(1,1)')]:
+                    fig.add_trace(go.Scatter(x=term_structure['horizon'], y=term_structure[colonne],
+                                             mode='lines+markers', name=nom))
+                fig.update_layout(title=f'Structure par Terme de la Volatilité - {symbole_vol}',
+                                  xaxis_title='Horizon (jours)', yaxis_title='Volatilité journalière (%)',
+                                  xaxis_type='log')
                 st.plotly_chart(fig, use_container_width=True)
+            
+            with st.expander("Paramètres GARCH(1,1)"):
+                st.dataframe(parameters.style.format({
+                    'alpha': '{:.3f}', 'beta': '{:.3f}', 'persistance': '{:.3f}', 'demi_vie': '{:.1f} j',
+                    'long_terme': '{:.2f}%', 'ewma': '{:.2f}%', 'garch': '{:.2f}%'
+                }), hide_index=True, use_container_width=True)
         
         with tab4:
             # Performance relative
-            performance_data = []
-            for symbole in self.currencies.keys():
-                currency_data = self.historical_data[self.historical_data['symbole'] == symbole]
-                if len(currency_data) > 0:
-                    start_price = currency_data.iloc[0]['prix']
-                    end_price = currency_data.iloc[-1]['prix']
-                    performance = ((end_price - start_price) / start_price) * 100
-                    performance_data.append({
-                        'symbole': symbole,
-                        'performance': performance,
-                        'categorie': self.currencies[symbole]['categorie']
-                    })
-            
-            performance_df = pd.DataFrame(performance_data)
+            start_prices = self.price_store.first()
+            end_prices = self.price_store.last()
+            performance_df = pd.DataFrame({
+                'symbole': start_prices.index,
+                'performance': ((end_prices - start_prices) / start_prices).values * 100,
+                'categorie': [self.currencies[symbole]['categorie'] for symbole in start_prices.index]
+            })
             fig = px.bar(performance_df, 
                         x='symbole', 
                         y='performance',
@@ -980,6 +712,9 @@ class ForexDashboard:
     
     def create_central_bank_analysis(self):
         """Analyse des banques centrales"""
+        # Chargement différé : plotly n'est importé qu'à l'affichage de la page
+        import plotly.express as px
+        
         st.markdown('<h3 class="section-header">🏦 ANALYSE DES BANQUES CENTRALES</h3>', 
                    unsafe_allow_html=True)
         
@@ -1128,6 +863,10 @@ class ForexDashboard:
     
     def create_technical_analysis(self):
         """Analyse technique avancée"""
+        # Chargement différé : plotly n'est importé qu'à l'affichage de la page
+        import plotly.express as px
+        from plotly.subplots import make_subplots
+        
         st.markdown('<h3 class="section-header">🔬 ANALYSE TECHNIQUE AVANCÉE</h3>', 
                    unsafe_allow_html=True)
         
@@ -1138,15 +877,29 @@ class ForexDashboard:
                                              list(self.currencies.keys()))
             
             if devise_selectionnee:
-                devise_data = self.historical_data[
-                    self.historical_data['symbole'] == devise_selectionnee
-                ].copy()
+                # Valeurs courantes issues du moteur incrémental
+                live = self.market.live_indicators().loc[devise_selectionnee]
+                col_rsi, col_ma20, col_ma50, col_boll = st.columns(4)
+                col_rsi.metric("RSI (14)", f"{live['RSI']:.1f}")
+                col_ma20.metric("MM20", f"{live['MA20']:.4f}")
+                col_ma50.metric("MM50", f"{live['MA50']:.4f}")
+                col_boll.metric("Bollinger", f"{live['Bollinger_Low']:.4f} – {live['Bollinger_High']:.4f}")
+                
+                devise_data = self.price_store.series(devise_selectionnee).rename('prix')
+                devise_data = devise_data.rename_axis('date').reset_index()
                 
                 # Calcul des indicateurs techniques
                 devise_data['MA20'] = devise_data['prix'].rolling(window=20).mean()
                 devise_data['MA50'] = devise_data['prix'].rolling(window=50).mean()
-                devise_data['RSI'] = self.calculate_rsi(devise_data['prix'])
-                devise_data['Bollinger_High'], devise_data['Bollinger_Low'] = self.calculate_bollinger_bands(devise_data['prix'])
+                devise_data['RSI'] = self.market.calculate_rsi(devise_data['prix'])
+                devise_data['Bollinger_High'], devise_data['Bollinger_Low'] = self.market.calculate_bollinger_bands(devise_data['prix'])
+                
+                # Sous-échantillonnage à la largeur du graphique, WebGL pour les longues séries
+                points = downsample_columns(
+                    devise_data['date'],
+                    devise_data[['prix', 'MA20', 'MA50', 'Bollinger_High', 'Bollinger_Low', 'RSI']]
+                )
+                Trace = line_trace_class(sum(len(x) for x, _ in points.values()))
                 
                 fig = make_subplots(rows=3, cols=1, 
                                   shared_xaxes=True, 
@@ -1155,25 +908,25 @@ class ForexDashboard:
                                   row_heights=[0.5, 0.25, 0.25])
                 
                 # Prix et moyennes mobiles
-                fig.add_trace(go.Scatter(x=devise_data['date'], y=devise_data['prix'],
-                                       name='Prix', line=dict(color='#0055A4')), row=1, col=1)
-                fig.add_trace(go.Scatter(x=devise_data['date'], y=devise_data['MA20'],
-                                       name='MM20', line=dict(color='orange')), row=1, col=1)
-                fig.add_trace(go.Scatter(x=devise_data['date'], y=devise_data['MA50'],
-                                       name='MM50', line=dict(color='red')), row=1, col=1)
+                fig.add_trace(Trace(x=points['prix'][0], y=points['prix'][1],
+                                  name='Prix', line=dict(color='#0055A4')), row=1, col=1)
+                fig.add_trace(Trace(x=points['MA20'][0], y=points['MA20'][1],
+                                  name='MM20', line=dict(color='orange')), row=1, col=1)
+                fig.add_trace(Trace(x=points['MA50'][0], y=points['MA50'][1],
+                                  name='MM50', line=dict(color='red')), row=1, col=1)
                 
                 # Bandes de Bollinger
-                fig.add_trace(go.Scatter(x=devise_data['date'], y=devise_data['Bollinger_High'],
-                                       name='Bollinger High', line=dict(color='gray', dash='dash')), row=2, col=1)
-                fig.add_trace(go.Scatter(x=devise_data['date'], y=devise_data['prix'],
-                                       name='Prix', line=dict(color='#0055A4'), showlegend=False), row=2, col=1)
-                fig.add_trace(go.Scatter(x=devise_data['date'], y=devise_data['Bollinger_Low'],
-                                       name='Bollinger Low', line=dict(color='gray', dash='dash'), 
-                                       fill='tonexty'), row=2, col=1)
+                fig.add_trace(Trace(x=points['Bollinger_High'][0], y=points['Bollinger_High'][1],
+                                  name='Bollinger High', line=dict(color='gray', dash='dash')), row=2, col=1)
+                fig.add_trace(Trace(x=points['prix'][0], y=points['prix'][1],
+                                  name='Prix', line=dict(color='#0055A4'), showlegend=False), row=2, col=1)
+                fig.add_trace(Trace(x=points['Bollinger_Low'][0], y=points['Bollinger_Low'][1],
+                                  name='Bollinger Low', line=dict(color='gray', dash='dash'), 
+                                  fill='tonexty'), row=2, col=1)
                 
                 # RSI
-                fig.add_trace(go.Scatter(x=devise_data['date'], y=devise_data['RSI'],
-                                       name='RSI', line=dict(color='purple')), row=3, col=1)
+                fig.add_trace(Trace(x=points['RSI'][0], y=points['RSI'][1],
+                                  name='RSI', line=dict(color='purple')), row=3, col=1)
                 fig.add_hline(y=70, line_dash="dash", line_color="red", row=3, col=1)
                 fig.add_hline(y=30, line_dash="dash", line_color="green", row=3, col=1)
                 
@@ -1215,38 +968,26 @@ class ForexDashboard:
         with tab3:
             st.subheader("Signaux de Trading Actuels")
             
-            # Simulation de signaux
-            signals = []
-            for symbole in self.currencies.keys():
-                signal_type = random.choice(['ACHAT', 'VENTE', 'NEUTRE'])
-                strength = random.randint(1, 10)
-                reason = random.choice([
-                    'Surachat RSI', 'Survente RSI', 'Croissance MM20/50', 
-                    'Bande Bollinger', 'Support/Résistance', 'Volume élevé'
-                ])
-                
-                signals.append({
-                    'Symbole': symbole,
-                    'Signal': signal_type,
-                    'Force': strength,
-                    'Raison': reason
-                })
-            
-            signals_df = pd.DataFrame(signals)
+            # Signaux calculés par le moteur (mis en cache par version des données)
+            signals_df = self.market.signals()[['Symbole', 'Signal', 'Force', 'Raison']]
             
             # Filtrer les signaux forts
-            strong_signals = signals_df[signals_df['Force'] >= 7].sort_values('Force', ascending=False)
+            strong_signals = signals_df[
+                (signals_df['Force'] >= SIGNAL_STRONG_FORCE) & (signals_df['Signal'] != 'NEUTRE')
+            ].sort_values('Force', ascending=False)
             
             if not strong_signals.empty:
-                st.write("### 🚨 Signaux Forts (Force ≥ 7)")
-                for _, signal in strong_signals.iterrows():
-                    signal_class = "profit-loss-positive" if signal['Signal'] == 'ACHAT' else "profit-loss-negative"
-                    st.markdown(f"""
-                    <div class="{signal_class}">
-                        <strong>{signal['Symbole']}</strong> - {signal['Signal']} (Force: {signal['Force']}/10)<br>
-                        Raison: {signal['Raison']}
-                    </div>
-                    """, unsafe_allow_html=True)
+                st.write(f"### 🚨 Signaux Forts (Force ≥ {SIGNAL_STRONG_FORCE})")
+                signal_classes = np.where(strong_signals['Signal'] == 'ACHAT',
+                                          "profit-loss-positive", "profit-loss-negative")
+                st.markdown("".join(
+                    f'<div class="{signal_class}" style="margin: 0.5rem 0;">'
+                    f'<strong>{symbole}</strong> - {signal} (Force: {force}/10)<br>'
+                    f'Raison: {raison}</div>'
+                    for signal_class, symbole, signal, force, raison in zip(
+                        signal_classes, strong_signals['Symbole'], strong_signals['Signal'],
+                        strong_signals['Force'], strong_signals['Raison'])
+                ), unsafe_allow_html=True)
             else:
                 st.info("Aucun signal fort détecté actuellement.")
             
@@ -1254,11 +995,17 @@ class ForexDashboard:
             st.write("### 📋 Tous les Signaux")
             st.dataframe(signals_df, use_container_width=True)
     
-    def create_trading_simulator(self):
+    def create_trading_simulator(self, refresh_interval=None):
         """Simulateur de trading"""
+        # Chargement différé : plotly n'est importé qu'à l'affichage de la page
+        import plotly.express as px
+        
         st.markdown('<h3 class="section-header">🎮 SIMULATEUR DE TRADING</h3>', 
                    unsafe_allow_html=True)
         
+        backtester = self.market.backtester
+        ledger = get_position_ledger()
+        dates = self.price_store.dates
         col1, col2 = st.columns([2, 1])
         
         with col1:
@@ -1269,6 +1016,7 @@ class ForexDashboard:
             
             # Type de position
             position_type = st.radio("Type de position:", ['ACHAT (Long)', 'VENTE (Short)'])
+            direction = 1 if position_type == 'ACHAT (Long)' else -1
             
             # Paramètres de la position
             col_amount, col_leverage = st.columns(2)
@@ -1284,66 +1032,171 @@ class ForexDashboard:
             with col_tp:
                 take_profit = st.number_input("Take Profit (%):", min_value=0.1, max_value=20.0, value=5.0, step=0.1)
             
+            # Durée maximale de la position (aperçu Monte Carlo et rejeu historique)
+            horizon = st.number_input("Durée max (jours):", min_value=1, max_value=365, value=90, step=1)
+            
             # Bouton pour ouvrir la position
             if st.button("Ouvrir Position", type="primary"):
                 current_price = self.current_data[self.current_data['symbole'] == pair]['prix'].iloc[0]
-                
-                # Simulation du résultat
-                price_change = random.uniform(-take_profit, take_profit)
-                final_price = current_price * (1 + price_change/100)
-                
-                if position_type == 'ACHAT (Long)':
-                    pnl_pct = price_change
-                else:
-                    pnl_pct = -price_change
-                
-                pnl_amount = amount * pnl_pct/100 * leverage
+                position_id = ledger.open(pair, direction, amount, leverage, current_price, stop_loss, take_profit)
                 
                 # Affichage du résultat
                 st.markdown('<div class="simulator-card">', unsafe_allow_html=True)
-                st.write(f"**Position ouverte:** {position_type} {pair}")
+                st.write(f"**Position ouverte:** #{position_id} {position_type} {pair}")
                 st.write(f"**Prix d'entrée:** ${current_price:.4f}")
-                st.write(f"**Prix de sortie:** ${final_price:.4f}")
-                st.write(f"**Variation:** {price_change:+.2f}%")
-                st.write(f"**P&L:** ${pnl_amount:+.2f}")
+                st.write(f"**Stop Loss / Take Profit:** -{stop_loss:.1f}% / +{take_profit:.1f}% (levier x{leverage})")
+                st.markdown('</div>', unsafe_allow_html=True)
                 
-                if pnl_amount > 0:
-                    st.markdown(f'<div class="profit-loss-positive">PROFIT: ${pnl_amount:+.2f}</div>', unsafe_allow_html=True)
-                else:
-                    st.markdown(f'<div class="profit-loss-negative">PERTE: ${pnl_amount:+.2f}</div>', unsafe_allow_html=True)
+                # Aperçu du risque de la position
+                preview = self.market.monte_carlo.simulate(pair, horizon, direction, stop_loss, take_profit,
+                                                           leverage, amount)
+                probabilites = preview['probabilites']
+                quantiles = preview['quantiles']
+                st.subheader(f"Aperçu du risque (Monte Carlo, {len(preview['pnl']):,} trajectoires)")
+                col_tp_prob, col_sl_prob, col_expected = st.columns(3)
+                with col_tp_prob:
+                    st.metric("Probabilité Take Profit", f"{probabilites['Take Profit']:.1%}")
+                with col_sl_prob:
+                    st.metric("Probabilité Stop Loss", f"{probabilites['Stop Loss'] + probabilites['Liquidation']:.1%}",
+                              f"dont liquidation {probabilites['Liquidation']:.1%}", delta_color="off")
+                with col_expected:
+                    st.metric("P&L espéré", f"${preview['pnl_moyen']:+.2f}",
+                              f"{preview['jours_moyen']:.1f} jours en moyenne", delta_color="off")
+                st.caption(" · ".join(f"Q{q:.0%} : ${value:+,.2f}" for q, value in quantiles.items()))
                 
-                st.markdown('</div>', unsafe_allow_html=True)
+                counts, edges = np.histogram(preview['pnl'], bins=60)
+                fig = px.bar(x=(edges[:-1] + edges[1:]) / 2, y=counts / counts.sum(),
+                             labels={'x': 'P&L ($)', 'y': 'Probabilité'},
+                             title="Distribution du P&L à l'échéance ou à la sortie")
+                fig.update_traces(marker_color=np.where(edges[:-1] >= 0, '#28a745', '#dc3545'))
+                st.plotly_chart(fig, use_container_width=True)
         
         with col2:
-            st.subheader("Historique des Trades")
-            
-            # Simulation d'historique
-            trade_history = []
-            for i in range(10):
-                pair = random.choice(list(self.currencies.keys()))
-                position_type = random.choice(['ACHAT', 'VENTE'])
-                pnl = random.uniform(-500, 1000)
+            self.display_live_panels([self.display_position_ledger], refresh_interval)
+        
+        with st.expander("📜 Rejeu historique de la position"):
+            entry_date = st.date_input("Date d'entrée:",
+                                       value=dates[max(len(dates) - 1 - horizon, 0)].date(),
+                                       min_value=dates[0].date(), max_value=dates[-2].date())
+            results = backtester.run(entry_date, horizon, direction, stop_loss, take_profit, leverage, amount)
+            trade = results.set_index('symbole').loc[pair]
+            st.write(f"**{position_type} {pair}** entrée le {entry_date:%d/%m/%Y} à ${trade['entree']:.4f}, "
+                     f"sortie le {trade['date_sortie']:%d/%m/%Y} à ${trade['sortie']:.4f} "
+                     f"({trade['jours']} jours, {trade['raison']}) : **P&L ${trade['pnl']:+.2f}**")
+            
+            st.caption("Même position sur toutes les paires")
+            st.dataframe(pd.DataFrame({
+                'Paire': results['symbole'],
+                'Sortie': results['raison'],
+                'Jours': results['jours'],
+                'P&L': results['pnl'].map(lambda pnl: f"${pnl:+.2f}")
+            }), use_container_width=True, hide_index=True)
+            col_win, col_total = st.columns(2)
+            with col_win:
+                st.metric("Taux de réussite", f"{(results['pnl'] > 0).mean() * 100:.1f}%")
+            with col_total:
+                st.metric("P&L total", f"${results['pnl'].sum():+,.2f}")
+        
+        with st.expander("🧪 Balayage de paramètres (SL × TP × levier × paire)"):
+            col_grid_sl, col_grid_tp, col_grid_lev = st.columns(3)
+            with col_grid_sl:
+                sl_range = st.slider("Stop Loss (%)", 0.5, 10.0, (0.5, 5.0), step=0.5)
+            with col_grid_tp:
+                tp_range = st.slider("Take Profit (%)", 0.5, 20.0, (1.0, 10.0), step=0.5)
+            with col_grid_lev:
+                leverages = st.multiselect("Leviers", [1, 5, 10, 20, 50, 100], default=[1, 10, 50])
+            
+            stop_losses = np.arange(sl_range[0], sl_range[1] + 0.25, 0.5)
+            take_profits = np.arange(tp_range[0], tp_range[1] + 0.25, 0.5)
+            n_configs = len(stop_losses) * len(take_profits) * len(leverages) * len(self.currencies)
+            
+            if leverages and st.button(f"Lancer le balayage ({n_configs:,} configurations)"):
+                sweep = backtester.sweep(entry_date, horizon, direction, stop_losses, take_profits, leverages)
+                summary = sweep.groupby(['stop_loss', 'take_profit', 'levier'])['pnl_pct'].mean().reset_index()
                 
-                trade_history.append({
-                    'Paire': pair,
-                    'Type': position_type,
-                    'P&L': f"${pnl:+.2f}",
-                    'Résultat': 'Profit' if pnl > 0 else 'Perte'
-                })
-            
-            history_df = pd.DataFrame(trade_history)
-            st.dataframe(history_df, use_container_width=True)
-            
-            # Statistiques
-            total_trades = len(trade_history)
-            winning_trades = len([t for t in trade_history if t['Résultat'] == 'Profit'])
-            win_rate = (winning_trades / total_trades) * 100
-            
-            st.metric("Total Trades", total_trades)
-            st.metric("Taux de réussite", f"{win_rate:.1f}%")
+                best = summary.loc[summary['pnl_pct'].idxmax()]
+                st.success(f"Meilleure configuration : SL {best['stop_loss']:.1f}% · TP {best['take_profit']:.1f}% · "
+                           f"levier x{best['levier']:.0f} → P&L moyen {best['pnl_pct']:+.2f}% de la marge")
+                
+                heatmap = summary[summary['levier'] == best['levier']].pivot(
+                    index='stop_loss', columns='take_profit', values='pnl_pct'
+                )
+                fig = px.imshow(heatmap, color_continuous_scale='RdYlGn', aspect='auto',
+                                labels=dict(x='Take Profit (%)', y='Stop Loss (%)', color='P&L moyen (%)'),
+                                title=f"P&L moyen par configuration (levier x{best['levier']:.0f})")
+                st.plotly_chart(fig, use_container_width=True)
+    
+    def display_position_ledger(self):
+        """Positions ouvertes valorisées au dernier tick, historique et statistiques du registre"""
+        ledger = get_position_ledger()
+        # Les positions ayant atteint leur stop ou leur objectif sont clôturées au passage, sauf au
+        # premier rendu d'un état de marché reconstruit : ses prix n'ont pas encore été affichés
+        if st.session_state.get('etat_marche_vu') == self.market.created_at:
+            open_positions = ledger.settle(self.current_data)
+        else:
+            open_positions = ledger.mark_to_market(self.current_data)
+            st.session_state['etat_marche_vu'] = self.market.created_at
+        
+        st.subheader("Positions Ouvertes")
+        if open_positions.empty:
+            st.caption("Aucune position ouverte")
+        else:
+            st.dataframe(pd.DataFrame({
+                'Id': open_positions['id'],
+                'Paire': open_positions['symbole'],
+                'Type': np.where(open_positions['sens'] > 0, 'ACHAT', 'VENTE'),
+                # Paire retirée de l'univers : pas de prix, position non valorisée
+                'Variation': open_positions['variation_pct'].map(
+                    lambda change: f"{change:+.2f}%" if pd.notna(change) else "n/d"),
+                'P&L latent': open_positions['pnl_latent'].map(
+                    lambda pnl: f"${pnl:+.2f}" if pd.notna(pnl) else "n/d")
+            }), use_container_width=True, hide_index=True)
+            st.metric("P&L latent", f"${open_positions['pnl_latent'].sum():+,.2f}")
+            
+            # Risque à un jour du portefeuille, recalculé à chaque tick
+            risk = self.market.portfolio_risk(open_positions)
+            risk_table = risk.pivot(index='confiance', columns='methode', values=['var', 'es'])
+            risk_table = risk_table.reindex(columns=risk['methode'].unique(), level=1)
+            methodes = {'parametrique': 'paramétrique', 'historique': 'historique', 'monte_carlo': 'Monte Carlo'}
+            risk_table.columns = [f"{'VaR' if mesure == 'var' else 'ES'} {methodes[methode]}"
+                                  for mesure, methode in risk_table.columns]
+            risk_table.index = [f"{confiance:.1%}" for confiance in risk_table.index]
+            st.caption("Risque à un jour (pertes en $)")
+            st.dataframe(risk_table.style.format('${:,.2f}'), use_container_width=True)
+            unpriced = self.market.risk.unpriced(open_positions)
+            if len(unpriced):
+                st.caption(f"⚠️ Hors du calcul de risque (paire absente de l'univers) : "
+                           f"{', '.join(unpriced['symbole'].unique())}")
+            
+            to_close = st.multiselect("Positions à clôturer:", open_positions['id'].tolist(),
+                                      key='positions_a_cloturer')
+            if to_close and st.button("Clôturer", key='cloturer_positions'):
+                prices = open_positions.set_index('id').loc[to_close, 'prix']
+                ledger.close(prices.index.to_numpy(), prices.to_numpy())
+                st.rerun()
+        
+        st.subheader("Historique des Trades")
+        history = ledger.history(limit=20)
+        history_df = pd.DataFrame({
+            'Paire': history['symbole'],
+            'Type': np.where(history['sens'] > 0, 'ACHAT', 'VENTE'),
+            'Sortie': history['raison'],
+            'P&L': history['pnl'].map(lambda pnl: f"${pnl:+.2f}"),
+            'Résultat': np.where(history['pnl'] > 0, 'Profit', 'Perte')
+        })
+        st.dataframe(history_df, use_container_width=True, hide_index=True)
+        
+        # Statistiques
+        stats = ledger.statistics()
+        st.metric("Total Trades", int(stats['trades']))
+        st.metric("Taux de réussite", f"{stats['taux_reussite']:.1f}%")
+        st.metric("P&L réalisé", f"${stats['pnl_total']:+,.2f}")
     
     def create_market_sentiment(self):
         """Analyse du sentiment du marché"""
+        # Chargement différé : plotly n'est importé qu'à l'affichage de la page
+        import plotly.express as px
+        
         st.markdown('<h3 class="section-header">💭 SENTIMENT DU MARCHÉ</h3>', 
                    unsafe_allow_html=True)
         
@@ -1491,15 +1344,18 @@ class ForexDashboard:
     
     def display_correlation_matrix(self):
         """Affiche la matrice de corrélation"""
+        # Chargement différé : plotly n'est importé qu'à l'affichage de la page
+        import plotly.express as px
+        
         st.markdown('<h3 class="section-header">🔗 MATRICE DE CORRÉLATION</h3>', 
                    unsafe_allow_html=True)
         
-        # Préparation des données pour la corrélation
-        pivot_data = self.historical_data.pivot(index='date', columns='symbole', values='prix')
+        # Fenêtre glissante des rendements
+        window = st.radio("Fenêtre de calcul:", CORRELATION_WINDOWS, index=len(CORRELATION_WINDOWS) - 1,
+                          format_func=lambda w: f"{w} jours", horizontal=True)
         
-        # Calcul de la corrélation sur les rendements
-        returns_data = pivot_data.pct_change().dropna()
-        correlation_matrix = returns_data.corr()
+        # Corrélation des rendements, tenue à jour par le moteur incrémental
+        correlation_matrix = self.market.correlations.matrix(window)
         
         # Sélection des paires principales pour la visualisation
         major_pairs = ['EUR/USD', 'GBP/USD', 'USD/JPY', 'USD/CHF', 'AUD/USD', 'USD/CAD']
@@ -1512,7 +1368,7 @@ class ForexDashboard:
             fig = px.imshow(selected_correlation,
                            text_auto=True,
                            aspect="auto",
-                           title="Matrice de Corrélation des Paires Majeures",
+                           title=f"Matrice de Corrélation des Paires Majeures ({window} jours)",
                            color_continuous_scale='RdBu_r',
                            range_color=[-1, 1])
             st.plotly_chart(fig, use_container_width=True)
@@ -1520,29 +1376,23 @@ class ForexDashboard:
         # Analyse des corrélations fortes
         st.subheader("Analyse des Corrélations Fortes")
         
-        # Trouver les corrélations les plus fortes
-        corr_pairs = []
-        for i in range(len(correlation_matrix.columns)):
-            for j in range(i+1, len(correlation_matrix.columns)):
-                pair1 = correlation_matrix.columns[i]
-                pair2 = correlation_matrix.columns[j]
-                corr_value = correlation_matrix.iloc[i, j]
-                
-                if abs(corr_value) > 0.7:  # Corrélation forte
-                    corr_pairs.append({
-                        'Paire 1': pair1,
-                        'Paire 2': pair2,
-                        'Corrélation': corr_value
-                    })
-        
-        if corr_pairs:
-            corr_df = pd.DataFrame(corr_pairs).sort_values('Corrélation', key=abs, ascending=False)
-            st.dataframe(corr_df.head(10), use_container_width=True)
+        # Trouver les corrélations les plus fortes (|ρ| > 0.7)
+        corr_df = self.market.correlations.strong_pairs(window, threshold=0.7, top_k=10)
+        
+        if not corr_df.empty:
+            st.dataframe(corr_df, use_container_width=True)
         else:
             st.info("Aucune corrélation forte (> 0.7) détectée actuellement.")
     
     def run(self):
         """Fonction principale pour exécuter le dashboard"""
+        # La session ne conserve que ses sélections ; l'état de marché est partagé par le processus
+        sessions = get_session_registry()
+        session_id = st.session_state.setdefault('session_id', uuid.uuid4().hex)
+        session_size = enforce_session_budget()
+        if not st.session_state.get('en_veille'):
+            sessions.touch(session_id, session_size)
+        
         # Affichage de l'en-tête
         self.display_header()
         
@@ -1566,16 +1416,33 @@ class ForexDashboard:
         st.sidebar.subheader("Options de rafraîchissement")
         auto_refresh = st.sidebar.checkbox("Rafraîchissement automatique", value=True)
         
+        refresh_interval = None
         if auto_refresh:
             refresh_interval = st.sidebar.slider("Intervalle (secondes):", 5, 60, 10)
+        if st.session_state.get('en_veille'):
+            refresh_interval = None
+            st.sidebar.info("⏸️ Session en veille : rafraîchissement suspendu après inactivité")
+            st.sidebar.button("▶️ Reprendre", on_click=resume_session)
+        
+        # État de marché partagé
+        active_sessions, sessions_memory = sessions.summary()
+        st.sidebar.caption(f"Données {self.market.source_name} générées à "
+                           f"{self.market.created_at.strftime('%H:%M:%S')} · "
+                           f"👥 {active_sessions} session(s) active(s), {sessions_memory / 1024:.0f} Ko d'état")
+        if ADMIN_MODE and st.sidebar.button("🔄 Régénérer les données"):
+            # Sans suppression de l'instantané, le même historique serait reprojeté
+            if self.market.history_snapshot is not None:
+                self.market.history_snapshot.discard()
+            invalidate_market_state()
+            st.rerun()
         
         # Affichage de la page sélectionnée
         if page == "📊 Vue d'ensemble":
-            self.display_key_metrics()
-            self.display_currency_cards()
+            self.display_live_panels([self.display_key_metrics, self.display_currency_indices,
+                                      self.display_currency_cards], refresh_interval)
             
         elif page == "💰 Taux de change":
-            self.display_currency_cards()
+            self.display_live_panels([self.display_currency_cards, self.display_cross_rates], refresh_interval)
             
         elif page == "📈 Analyse historique":
             self.create_price_overview()
@@ -1587,20 +1454,16 @@ class ForexDashboard:
             self.create_technical_analysis()
             
         elif page == "🎮 Simulateur de trading":
-            self.create_trading_simulator()
+            self.create_trading_simulator(refresh_interval)
             
         elif page == "💭 Sentiment du marché":
             self.create_market_sentiment()
             
         elif page == "🔗 Corrélations":
             self.display_correlation_matrix()
-        
-        # Rafraîchissement automatique
-        if auto_refresh:
-            time.sleep(refresh_interval)
-            st.rerun() # <--- LIGNE CORRIGÉE
 
 # Point d'entrée principal
 if __name__ == "__main__":
-    dashboard = ForexDashboard()
+    configure_page()
+    dashboard = ForexDashboard(get_market_state())
     dashboard.run()
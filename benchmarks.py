@@ -0,0 +1,285 @@
+# benchmarks.py
+"""Banc d'essai des chemins de calcul et de rendu du dashboard.
+
+    python benchmarks.py                     # compare aux références enregistrées
+    python benchmarks.py --save-baseline     # enregistre les mesures comme références
+    python benchmarks.py --pairs 37 500      # restreint les univers mesurés
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from forex_core import MarketState
+from Dashboard import CurrencyCardGrid
+
+# Univers mesurés : l'univers réel et deux univers synthétiques
+DEFAULT_UNIVERSES = [37, 500, 2000]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+# Dégradation tolérée par rapport à la référence (0.25 = 25 % plus lent ou plus gourmand)
+DEFAULT_THRESHOLD = 0.25
+# Charge de calibration mesurée avant chaque univers : les temps sont comparés rapportés au sien,
+# donc indépendamment de la vitesse de la machine
+CALIBRATION_CASE = 'calibration'
+# Écart absolu en deçà duquel une mesure plus lente reste du bruit (secondes)
+NOISE_FLOOR_SECONDS = 0.005
+# Les chemins courts sont répétés jusqu'à cette durée cumulée (secondes), dans une limite d'exécutions :
+# le meilleur temps écarte alors les interruptions de la machine
+MIN_MEASURE_SECONDS = 1.0
+MAX_MEASURE_RUNS = 100
+# Relations vérifiées dans une même exécution, sans référence : (chemin rapide, chemin plus lent)
+EXPECTED_ORDERINGS = [
+    ('currency_cards_cached', 'currency_cards_html'),
+    ('open_history_snapshot', 'generate_history'),
+    ('correlation_update', 'correlation_matrix'),
+    ('volatility_update', 'volatility_fit')
+]
+
+CATEGORIES = ['Majeures', 'Mineures', 'Exotiques', 'Cryptomonnaies']
+
+def synthetic_currencies(n_pairs, seed=0):
+    """Univers synthétique de n_pairs paires au format de define_currencies"""
+    rng = np.random.default_rng(seed)
+    currencies = {}
+    for i in range(n_pairs):
+        symbole = f'X{i:04d}/USD'
+        currencies[symbole] = {
+            'nom': f'Devise synthétique {i} / Dollar Américain',
+            'symbole': symbole,
+            'icone': '💱',
+            'categorie': CATEGORIES[i % len(CATEGORIES)],
+            'unite': 'taux de change',
+            'prix_base': float(np.exp(rng.uniform(-1, 9))),
+            'volatilite': float(rng.uniform(0.3, 5.0)),
+            'volume_journalier': float(rng.uniform(5, 750)),
+            'pays': ['Synthétique', 'États-Unis'],
+            'banque_centrale': ['Synthétique', 'Fed'],
+            'description': 'Paire générée pour les benchmarks'
+        }
+    return currencies
+
+def calibration():
+    """Charge de référence en NumPy pur (tri, exponentielle, somme cumulée), sur un seul cœur"""
+    values = np.random.default_rng(0).standard_normal(1 << 18)
+    np.sort(values)
+    np.cumsum(np.exp(values))
+
+def benchmark_cases(state):
+    """Chemins mesurés : nom -> fonction sans argument"""
+    store = state.price_store
+
+    def indicators():
+        for symbole in store.symboles:
+            prices = store.series(symbole)
+            state.calculate_rsi(prices)
+            state.calculate_bollinger_bands(prices)
+
+    def live_tick():
+        # Une seconde écoulée depuis la dernière lecture : un tick pour toutes les paires
+        state.tick_engine.last_update -= 1.0
+        state.update_live_data()
+
+    def correlation():
+        state.correlations.matrix(365)
+        state.correlations.strong_pairs(365)
+
+    def cross_rates():
+        # Taux croisés de toutes les devises et contrôle triangulaire sur un nouveau tick
+        state.cross_rates.update(state.tick_engine.prix)
+        state.cross_rates.matrix()
+        state.cross_rates.inconsistencies()
+
+    # Portefeuille de 300 positions sur des paires tirées au hasard, valorisées au dernier tick
+    rng = np.random.default_rng(0)
+    held = rng.integers(len(store.symboles), size=300)
+    positions = pd.DataFrame({
+        'symbole': np.array(store.symboles, dtype=object)[held],
+        'sens': rng.choice([-1, 1], size=300),
+        'montant': 1000.0,
+        'levier': rng.choice([1.0, 10.0, 50.0], size=300),
+        'prix_entree': store.prix[-1][held],
+        'prix': state.tick_engine.prix[held]
+    })
+
+    def currency_cards_html():
+        # Grille complète après un tick, cache des cartes vide (même tick que currency_cards_delta)
+        live_tick()
+        CurrencyCardGrid().render(state.live_snapshot(), state.intraday(), now=0.0)
+
+    # Horloge figée : les sparklines restent dans la même période de rafraîchissement
+    warm_grid = CurrencyCardGrid()
+    warm_grid.render(state.live_snapshot(), state.intraday(), now=0.0)
+
+    def currency_cards_delta():
+        # Rafraîchissement après un tick : seules les cartes modifiées sont regénérées
+        live_tick()
+        warm_grid.render(state.live_snapshot(), state.intraday(), now=0.0)
+
+    def currency_cards_cached():
+        # Autre session sur le même instantané publié (sans avancer les ticks) : aucune carte regénérée
+        warm_grid.render(state.current_data, state.intraday(), now=0.0)
+
+    return {
+        'generate_history': lambda: state.load_history(snapshot=False),
+        'open_history_snapshot': state.load_history,
+        'initialize_historical_data': state.initialize_historical_data,
+        'initialize_current_data': state.initialize_current_data,
+        'update_live_data': live_tick,
+        'calculate_rsi_bollinger': indicators,
+        'correlation_matrix': correlation,
+        'correlation_update': lambda: state.correlations.update(store.prix[-1]),
+        'ohlc_query_full_period': lambda: state.ohlc.query(store.symboles[:5]),
+        'ohlc_update': lambda: state.ohlc.update(store.dates[-1], store.prix[-1]),
+        'tick_history_append': lambda: state.tick_engine.history.append(time.time(), state.tick_engine.prix),
+        'intraday_sparklines': state.intraday,
+        'cross_rate_matrix': cross_rates,
+        'basket_indices_update': lambda: state.basket_indices.update(state.tick_engine.prix),
+        'basket_indices_intraday': state.intraday_indices,
+        'volatility_fit': lambda: state.volatility.fit(store.prix),
+        'volatility_update': lambda: state.volatility.update(store.prix[-1]),
+        'volatility_term_structure': state.volatility.term_structure,
+        'portfolio_risk_prepare': state.risk.prepare,
+        'portfolio_risk': lambda: state.risk.evaluate(positions),
+        'currency_cards_html': currency_cards_html,
+        'currency_cards_delta': currency_cards_delta,
+        'currency_cards_cached': currency_cards_cached
+    }
+
+def measure(func, repeat):
+    """Meilleur temps sur au moins `repeat` exécutions (davantage pour les chemins courts, jusqu'à
+    MIN_MEASURE_SECONDS cumulées), puis pic mémoire (tracemalloc) sur une exécution"""
+    timings = []
+    while len(timings) < repeat or (sum(timings) < MIN_MEASURE_SECONDS and len(timings) < MAX_MEASURE_RUNS):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': min(timings), 'peak_mb': peak / 2**20}
+
+def report_history_memory(state):
+    """Mémoire de l'historique long (memory_usage(deep=True)) comparée au format dénormalisé float64"""
+    compact = state.memory_usage()
+    denormalized = state.with_metadata(state.historical_data).astype({
+        'symbole': object, 'nom': object, 'categorie': object,
+        'prix': np.float64, 'volume': np.float64, 'volatilite_jour': np.float64
+    })
+    before = denormalized.memory_usage(deep=True).sum()
+    after = compact['historical_data'] + compact['currency_table']
+    print(f"{len(state.currencies):>6} paires  historical_data : {before / 2**20:.1f} Mo dénormalisé -> "
+          f"{after / 2**20:.1f} Mo compact (x{before / after:.1f})", flush=True)
+    del denormalized
+
+def run_benchmarks(universes, repeat):
+    """Exécute tous les cas pour chaque taille d'univers"""
+    results = {}
+    # Instantanés d'historique dans un répertoire jetable, pas dans le cache de l'application
+    snapshot_dir = tempfile.TemporaryDirectory()
+    # L'univers réel (define_currencies) est mesuré tel quel, les autres tailles sont synthétiques
+    default_state = MarketState(seed=42, cache_dir=snapshot_dir.name)
+    for n_pairs in universes:
+        if n_pairs == len(default_state.currencies):
+            state = default_state
+        else:
+            state = MarketState(seed=42, cache_dir=snapshot_dir.name, currencies=synthetic_currencies(n_pairs))
+        # Les grands univers sont coûteux : moins de répétitions
+        n_repeat = max(1, repeat if n_pairs <= 100 else repeat // 3)
+        results[str(n_pairs)] = {}
+        report_history_memory(state)
+        cases = {CALIBRATION_CASE: calibration, **benchmark_cases(state)}
+        for name, func in cases.items():
+            result = measure(func, max(n_repeat, 5) if name == CALIBRATION_CASE else n_repeat)
+            results[str(n_pairs)][name] = result
+            print(f"{n_pairs:>6} paires  {name:<28} {result['seconds'] * 1000:>10.2f} ms "
+                  f"{result['peak_mb']:>10.1f} Mo", flush=True)
+        del state
+        gc.collect()
+    del default_state
+    snapshot_dir.cleanup()
+    return results
+
+def compare(results, baseline, threshold):
+    """Liste les régressions au-delà du seuil par rapport aux références, à vitesse de machine égale"""
+    regressions = []
+    for universe, cases in results.items():
+        references = baseline.get(universe, {})
+        # Vitesse de la machine courante rapportée à celle des références (calibration)
+        speed = (cases[CALIBRATION_CASE]['seconds'] / references[CALIBRATION_CASE]['seconds']
+                 if CALIBRATION_CASE in references else 1.0)
+        for name, result in cases.items():
+            reference = references.get(name)
+            if reference is None or name == CALIBRATION_CASE:
+                continue
+            expected = reference['seconds'] * speed
+            if (result['seconds'] > expected * (1 + threshold)
+                    and result['seconds'] - expected > NOISE_FLOOR_SECONDS):
+                regressions.append(f"{universe} paires / {name} : temps {expected * 1000:.2f} ms attendus "
+                                   f"(calibration x{speed:.2f}) -> {result['seconds'] * 1000:.2f} ms")
+            if result['peak_mb'] > max(reference['peak_mb'], 1.0) * (1 + threshold):
+                regressions.append(f"{universe} paires / {name} : mémoire "
+                                   f"{reference['peak_mb']:.1f} Mo -> {result['peak_mb']:.1f} Mo")
+    return regressions
+
+def check_orderings(results):
+    """Liste les chemins rapides plus lents que leur chemin de référence dans une même exécution"""
+    violations = []
+    for universe, cases in results.items():
+        for fast, slow in EXPECTED_ORDERINGS:
+            if fast in cases and slow in cases and cases[fast]['seconds'] > cases[slow]['seconds']:
+                violations.append(f"{universe} paires / {fast} ({cases[fast]['seconds'] * 1000:.2f} ms) "
+                                  f"plus lent que {slow} ({cases[slow]['seconds'] * 1000:.2f} ms)")
+    return violations
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks du dashboard Forex")
+    parser.add_argument('--pairs', type=int, nargs='+', default=DEFAULT_UNIVERSES,
+                        help="tailles d'univers à mesurer")
+    parser.add_argument('--repeat', type=int, default=5, help="nombre d'exécutions chronométrées")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="dégradation relative tolérée avant d'échouer")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="fichier des références")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="enregistre les mesures comme nouvelles références")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.pairs, args.repeat)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Références enregistrées dans {args.baseline}")
+        return 0
+
+    regressions = check_orderings(results)
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions += compare(results, json.load(f), args.threshold)
+    else:
+        print("Aucune référence enregistrée : lancer avec --save-baseline")
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.threshold:.0%} :")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"\nAucune régression au-delà de {args.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
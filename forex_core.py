@@ -0,0 +1,2595 @@
+# forex_core.py
+"""Modèle de marché sans interface : univers de devises, historiques, ticks et indicateurs.
+
+Ce module n'importe que numpy et pandas : il peut être utilisé depuis un worker, un test
+ou un traitement batch sans démarrer Streamlit ni charger plotly (yfinance n'est importé
+qu'à l'utilisation de YFinanceSource).
+"""
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import random
+import threading
+import logging
+import itertools
+from functools import cached_property
+from statistics import NormalDist
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+def generate_historical_matrices(currencies, dates, rng):
+    """Génère en bloc les matrices (dates × paires) de prix, volume et volatilité"""
+    symboles = list(currencies.keys())
+    n_dates, n_paires = len(dates), len(symboles)
+    shape = (n_dates, n_paires)
+    
+    # Masques calendaires (colonne) et masques de paires (ligne)
+    annee = dates.year.values[:, None]
+    mois = dates.month.values[:, None]
+    covid = (annee == 2020) & (mois <= 6)
+    reprise = annee == 2021
+    ukraine = (annee == 2022) & (mois >= 2)
+    tensions = annee >= 2023
+    
+    usd = np.array([('USD' in s) and s != 'USD/JPY' for s in symboles])[None, :]
+    eur_gbp = np.isin(symboles, ['EUR/USD', 'GBP/USD'])[None, :]
+    refuges = np.isin(symboles, ['USD/CHF', 'USD/JPY'])[None, :]
+    
+    # Bornes des multiplicateurs d'impact mondial par régime (1.0 hors régime)
+    low = np.ones(shape)
+    high = np.ones(shape)
+    for masque, bas, haut in [
+        (covid & usd, 1.05, 1.15),       # Crise COVID (2020) : USD renforcé
+        (covid & ~usd, 0.9, 1.1),
+        (reprise & usd, 0.95, 1.05),     # Reprise post-COVID (2021) : USD affaibli
+        (reprise & ~usd, 1.05, 1.15),
+        (ukraine & eur_gbp, 0.9, 1.0),   # Guerre Ukraine (2022) : EUR/GBP affaiblis
+        (ukraine & refuges, 1.0, 1.1),   # CHF/JPY renforcés
+        (tensions, 0.98, 1.08),          # Tensions récentes
+    ]:
+        masque = np.broadcast_to(masque, shape)
+        low[masque] = bas
+        high[masque] = haut
+    global_impact = low + (high - low) * rng.random(shape)
+    
+    # Volatilité quotidienne basée sur le profil de volatilité
+    prix_base = np.array([info['prix_base'] for info in currencies.values()])
+    volatilite = np.array([info['volatilite'] for info in currencies.values()])
+    daily_volatility = rng.normal(1.0, volatilite / 100, size=shape)
+    
+    # Tendance saisonnière
+    seasonal = 1 + 0.003 * np.sin(2 * np.pi * dates.dayofyear.values[:, None] / 365)
+    
+    return {
+        'prix': prix_base * global_impact * daily_volatility * seasonal,
+        'volume': rng.uniform(100000, 5000000, size=shape),
+        'volatilite_jour': np.abs(daily_volatility - 1) * 100
+    }
+
+logger = logging.getLogger(__name__)
+
+# Source des historiques : 'synthetic', 'yfinance' ou chemin d'un fichier local
+MARKET_DATA_SOURCE = os.environ.get('FOREX_DATA_SOURCE', 'synthetic')
+# Répertoire du cache disque des historiques téléchargés
+MARKET_CACHE_DIR = os.environ.get('FOREX_CACHE_DIR', '.forex_cache')
+# Registre persistant des positions du simulateur (SQLite)
+LEDGER_PATH = os.environ.get('FOREX_LEDGER_PATH', os.path.join(MARKET_CACHE_DIR, 'positions.sqlite'))
+
+BAR_COLUMNS = ['date', 'symbole', 'prix', 'volume']
+
+def yahoo_ticker(symbole):
+    """Convertit un symbole de paire (EUR/USD) en ticker Yahoo Finance (EURUSD=X)"""
+    base, quote = symbole.split('/')
+    if base in ('BTC', 'ETH'):
+        return f'{base}-{quote}'
+    return f'{base}{quote}=X'
+
+class MarketDataSource:
+    """Source de barres journalières : retourne un DataFrame long (date, symbole, prix, volume)"""
+    
+    name = 'abstraite'
+    
+    def fetch(self, symboles, start, end=None):
+        raise NotImplementedError
+
+class YFinanceSource(MarketDataSource):
+    """Barres journalières Yahoo Finance, téléchargées en un seul lot pour toutes les paires"""
+    
+    name = 'Yahoo Finance'
+    
+    def fetch(self, symboles, start, end=None):
+        import yfinance as yf
+        
+        tickers = {yahoo_ticker(symbole): symbole for symbole in symboles}
+        raw = yf.download(list(tickers), start=pd.Timestamp(start).date(),
+                          end=None if end is None else (pd.Timestamp(end) + timedelta(days=1)).date(),
+                          interval='1d', auto_adjust=False, progress=False, threads=True)
+        if raw.empty:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        
+        if not isinstance(raw.columns, pd.MultiIndex):
+            raw.columns = pd.MultiIndex.from_product([raw.columns, list(tickers)])
+        bars = pd.DataFrame({
+            'prix': raw['Close'].stack(),
+            'volume': raw['Volume'].stack()
+        }).dropna(subset=['prix'])
+        bars.index.names = ['date', 'ticker']
+        bars = bars.reset_index()
+        bars['date'] = pd.to_datetime(bars['date']).dt.tz_localize(None).dt.normalize()
+        bars['symbole'] = bars['ticker'].map(tickers)
+        return bars[BAR_COLUMNS]
+
+class FileSource(MarketDataSource):
+    """Source locale (CSV ou Parquet au format long) pour le travail hors ligne et les tests"""
+    
+    name = 'fichier local'
+    
+    def __init__(self, path):
+        self.path = path
+    
+    def fetch(self, symboles, start, end=None):
+        if self.path.endswith('.parquet'):
+            bars = pd.read_parquet(self.path)
+        else:
+            bars = pd.read_csv(self.path, parse_dates=['date'])
+        if 'volume' not in bars.columns:
+            bars['volume'] = 0.0
+        mask = bars['symbole'].isin(symboles) & (bars['date'] >= pd.Timestamp(start))
+        if end is not None:
+            mask &= bars['date'] <= pd.Timestamp(end)
+        return bars.loc[mask, BAR_COLUMNS]
+
+def make_data_source(spec):
+    """Instancie la source de données décrite par FOREX_DATA_SOURCE (None pour les données synthétiques)"""
+    if spec in (None, '', 'synthetic'):
+        return None
+    if spec == 'yfinance':
+        return YFinanceSource()
+    return FileSource(spec)
+
+class HistoryCache:
+    """Cache disque colonnaire (Parquet) des barres journalières, complété de façon incrémentale"""
+    
+    def __init__(self, source, cache_dir=MARKET_CACHE_DIR):
+        self.source = source
+        # Un cache par source : deux fichiers locaux différents ne partagent pas leurs barres
+        key = type(source).__name__.lower()
+        if getattr(source, 'path', None) is not None:
+            key += '-' + hashlib.sha1(os.path.abspath(source.path).encode()).hexdigest()[:12]
+        self.path = os.path.join(cache_dir, f"{key}.parquet")
+        # Date jusqu'à laquelle chaque paire a été interrogée avec succès (barres reçues et écrites)
+        self.checked_path = os.path.join(cache_dir, f"{key}.checked.json")
+    
+    def read(self):
+        """Lit les barres déjà en cache"""
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        return pd.read_parquet(self.path)
+    
+    def read_checked(self):
+        """Dates de dernière interrogation de chaque paire"""
+        if not os.path.exists(self.checked_path):
+            return {}
+        with open(self.checked_path) as f:
+            return {symbole: pd.Timestamp(date) for symbole, date in json.load(f).items()}
+    
+    def load(self, symboles, start, end=None):
+        """Retourne les barres demandées en ne téléchargeant que ce qui manque au cache"""
+        cached = self.read()
+        last_dates = cached[cached['symbole'].isin(symboles)].groupby('symbole')['date'].max()
+        checked = self.read_checked()
+        
+        # Départ propre à chaque paire : historique complet si absente du cache, sinon depuis sa
+        # dernière barre (éventuellement partielle, donc rafraîchie) ou sa dernière interrogation.
+        # Un lot par date de départ : une paire au flux arrêté ne fait pas retélécharger les autres
+        starts = {}
+        for symbole in symboles:
+            if symbole in last_dates.index:
+                since = max(last_dates[symbole], checked.get(symbole, last_dates[symbole]))
+            else:
+                since = pd.Timestamp(start)
+            starts.setdefault(since, []).append(symbole)
+        fresh = [self.source.fetch(batch, since, end) for since, batch in starts.items()]
+        
+        fresh = [bars for bars in fresh if not bars.empty]
+        if fresh:
+            # Cache vide (premier chargement) écarté : ses colonnes sans type rendraient les prix objets
+            cached = pd.concat([bars for bars in [cached, *fresh] if not bars.empty], ignore_index=True)
+            cached = cached.drop_duplicates(['date', 'symbole'], keep='last')
+            cached = cached.sort_values(['date', 'symbole'], ignore_index=True)
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            cached.to_parquet(self.path, index=False)
+            
+            # Seules les paires qui ont renvoyé des barres avancent, une fois le cache écrit : une réponse
+            # vide (panne réseau) laisse la paire repartir de sa dernière barre au chargement suivant
+            today = pd.Timestamp(end if end is not None else datetime.now()).normalize()
+            answered = pd.concat([bars['symbole'] for bars in fresh]).unique()
+            checked.update({symbole: today for symbole in answered})
+            with open(self.checked_path, 'w') as f:
+                json.dump({symbole: f'{date:%Y-%m-%d}' for symbole, date in checked.items()}, f)
+        
+        mask = cached['symbole'].isin(symboles) & (cached['date'] >= pd.Timestamp(start))
+        if end is not None:
+            mask &= cached['date'] <= pd.Timestamp(end)
+        return cached[mask]
+
+def load_historical_matrices(currencies, cache, start, end=None):
+    """Charge les barres réelles et les aligne en matrices (dates × paires disponibles)"""
+    bars = cache.load(list(currencies.keys()), start, end)
+    if bars.empty:
+        return None, None, None
+    
+    prix = bars.pivot(index='date', columns='symbole', values='prix').sort_index()
+    # Alignement des calendriers (week-ends des cryptomonnaies) par report du dernier cours
+    prix = prix.ffill().bfill()
+    volume = bars.pivot(index='date', columns='symbole', values='volume').reindex(prix.index).fillna(0.0)
+    
+    symboles = [symbole for symbole in currencies if symbole in prix.columns]
+    prix = prix[symboles]
+    returns = prix.pct_change().fillna(0.0)
+    return prix.index, symboles, {
+        'prix': prix.to_numpy(),
+        'volume': volume.reindex(columns=symboles, fill_value=0.0).to_numpy(),
+        'volatilite_jour': np.abs(returns.to_numpy()) * 100
+    }
+
+HISTORY_SNAPSHOT_FIELDS = ('prix', 'volume', 'volatilite_jour')
+# Âge (secondes) au-delà duquel un répertoire temporaire d'écriture est considéré abandonné
+SNAPSHOT_TMP_MAX_AGE = 3600
+
+class HistorySnapshot:
+    """Instantané disque des matrices d'historique (.npy), relu en lecture seule par mmap.
+    
+    Les processus suivants projettent les mêmes fichiers en mémoire : le démarrage se réduit
+    à une ouverture de fichiers et les workers partagent une seule copie dans le cache de pages.
+    """
+    
+    def __init__(self, cache_dir, key):
+        self.key = key
+        self.root = os.path.join(cache_dir, 'snapshots')
+        self.path = os.path.join(self.root, key)
+    
+    @classmethod
+    def for_universe(cls, cache_dir, currencies, seed, end, source=None):
+        """Instantané associé à un univers, une graine, une date de fin et une source"""
+        universe = hashlib.sha1(json.dumps(currencies, sort_keys=True, ensure_ascii=False).encode())
+        if source is not None:
+            universe.update(f"{type(source).__name__}:{getattr(source, 'path', '')}".encode())
+        # Sans graine, tout tirage de la journée pour cet univers est réutilisable
+        graine = 'aleatoire' if seed is None else f'graine{seed}'
+        return cls(cache_dir, f"{pd.Timestamp(end):%Y%m%d}-{graine}-{universe.hexdigest()[:16]}")
+    
+    def load(self):
+        """Projette l'instantané en mémoire ; (None, None, None) s'il n'existe pas"""
+        meta_path = os.path.join(self.path, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None, None, None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        dates = pd.DatetimeIndex(np.load(os.path.join(self.path, 'dates.npy')))
+        matrices = {field: np.load(os.path.join(self.path, f'{field}.npy'), mmap_mode='r')
+                    for field in HISTORY_SNAPSHOT_FIELDS}
+        return dates, meta['symboles'], matrices
+    
+    def save(self, dates, symboles, matrices):
+        """Écrit l'instantané dans un répertoire temporaire puis le publie par renommage atomique"""
+        tmp_path = f'{self.path}.tmp-{os.getpid()}'
+        os.makedirs(tmp_path, exist_ok=True)
+        np.save(os.path.join(tmp_path, 'dates.npy'), pd.DatetimeIndex(dates).values)
+        for field in HISTORY_SNAPSHOT_FIELDS:
+            values = np.asarray(matrices[field], dtype=np.float64)
+            # Les prix sont lus par colonne (PriceStore) : ordre Fortran pour une projection sans copie
+            if field == 'prix':
+                values = np.asfortranarray(values)
+            np.save(os.path.join(tmp_path, f'{field}.npy'), values)
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump({'symboles': list(symboles), 'dates': len(dates)}, f, ensure_ascii=False)
+        try:
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Un autre processus a publié le même instantané entre-temps
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self.prune()
+    
+    def prune(self):
+        """Supprime les instantanés plus anciens de la même graine et du même univers, ainsi que
+        les écritures abandonnées (les processus qui les projettent encore gardent leur copie)"""
+        date, suffix = self.key.split('-', 1)
+        now = time.time()
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if '.tmp-' in name:
+                try:
+                    stale = now - os.path.getmtime(path) > SNAPSHOT_TMP_MAX_AGE
+                except OSError:
+                    continue
+                if stale:
+                    shutil.rmtree(path, ignore_errors=True)
+            elif name != self.key and name.split('-', 1)[-1] == suffix and name.split('-', 1)[0] < date:
+                shutil.rmtree(path, ignore_errors=True)
+    
+    def load_or_build(self, build):
+        """Projette l'instantané, ou le construit avec build() puis le projette"""
+        dates, symboles, matrices = self.load()
+        if matrices is None:
+            dates, symboles, matrices = build()
+            if matrices is None:
+                return None, None, None
+            self.save(dates, symboles, matrices)
+            dates, symboles, matrices = self.load()
+        return dates, symboles, matrices
+    
+    def discard(self):
+        """Supprime l'instantané (les processus qui le projettent gardent leur copie)"""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+class PriceStore:
+    """Stockage colonnaire des prix : matrice dates × paires indexée par date et par symbole"""
+    
+    def __init__(self, dates, symboles, prix):
+        self.dates = pd.DatetimeIndex(dates)
+        self.symboles = list(symboles)
+        self.columns = {symbole: i for i, symbole in enumerate(self.symboles)}
+        # Ordre Fortran : chaque paire occupe une colonne contiguë en mémoire
+        self.prix = np.asfortranarray(prix, dtype=np.float64)
+    
+    def date_range(self, start=None, end=None):
+        """Retourne les bornes [i, j) des lignes comprises entre deux dates (recherche dichotomique)"""
+        i = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side='left')
+        j = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side='right')
+        return i, j
+    
+    def values(self, symbole, start=None, end=None):
+        """Retourne une vue sur les prix d'une paire, éventuellement restreinte à une période"""
+        i, j = self.date_range(start, end)
+        return self.prix[i:j, self.columns[symbole]]
+    
+    def series(self, symbole, start=None, end=None):
+        """Retourne les prix d'une paire sous forme de Series indexée par date (sans copie)"""
+        i, j = self.date_range(start, end)
+        return pd.Series(self.prix[i:j, self.columns[symbole]], index=self.dates[i:j],
+                         name=symbole, copy=False)
+    
+    def frame(self, symboles=None, start=None, end=None):
+        """Retourne les prix au format large (dates × paires) pour une période"""
+        i, j = self.date_range(start, end)
+        if symboles is None:
+            return pd.DataFrame(self.prix[i:j], index=self.dates[i:j], columns=self.symboles, copy=False)
+        cols = [self.columns[symbole] for symbole in symboles]
+        return pd.DataFrame(self.prix[i:j][:, cols], index=self.dates[i:j], columns=list(symboles))
+    
+    def first(self):
+        """Premiers prix connus de chaque paire"""
+        return pd.Series(self.prix[0], index=self.symboles)
+    
+    def last(self):
+        """Derniers prix connus de chaque paire"""
+        return pd.Series(self.prix[-1], index=self.symboles)
+
+# Niveaux de la pyramide OHLC (du plus fin au plus grossier) et nombre de barres visé par graphique
+OHLC_LEVELS = (('jour', 'D'), ('semaine', 'W'), ('mois', 'M'))
+OHLC_FIELDS = ('ouverture', 'haut', 'bas', 'cloture', 'volume')
+OHLC_TARGET_POINTS = 150
+
+class OHLCLevel:
+    """Un niveau de la pyramide : barres OHLC et volume (périodes × paires), extensibles par la fin"""
+    
+    def __init__(self, name, freq, periods, bars):
+        self.name = name
+        self.freq = freq
+        self.size = len(periods)
+        self.periods = np.asarray(periods, dtype='datetime64[ns]')
+        self.bars = {field: np.asarray(bars[field], dtype=np.float32) for field in OHLC_FIELDS}
+    
+    @classmethod
+    def aggregate(cls, name, freq, dates, prix, volume):
+        """Agrège des clôtures journalières par période (ouverture = clôture précédente, extrêmes, dernière clôture, volume cumulé)"""
+        keys = pd.DatetimeIndex(dates).to_period(freq).start_time.values
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)] - 1
+        ouverture = prix[np.maximum(starts - 1, 0)]
+        return cls(name, freq, keys[starts], {
+            'ouverture': ouverture,
+            'haut': np.maximum(ouverture, np.maximum.reduceat(prix, starts, axis=0)),
+            'bas': np.minimum(ouverture, np.minimum.reduceat(prix, starts, axis=0)),
+            'cloture': prix[ends],
+            'volume': np.add.reduceat(volume, starts, axis=0, dtype=np.float64)
+        })
+    
+    def period_start(self, date):
+        """Début de la période du niveau contenant la date"""
+        return pd.Timestamp(date).to_period(self.freq).start_time.to_datetime64()
+    
+    def range(self, start=None, end=None):
+        """Bornes [i, j) des périodes couvrant [start, end]"""
+        periods = self.periods[:self.size]
+        i = 0 if start is None else periods.searchsorted(self.period_start(start), side='left')
+        j = self.size if end is None else periods.searchsorted(pd.Timestamp(end).to_datetime64(), side='right')
+        return i, j
+    
+    def update(self, date, prix, volume=None):
+        """Intègre une observation : barre en cours mise à jour, ou nouvelle barre si la période change"""
+        period = self.period_start(date)
+        if self.size and period < self.periods[self.size - 1]:
+            return
+        if not self.size or period > self.periods[self.size - 1]:
+            if self.size == len(self.periods):
+                # Capacité doublée : ajouts en temps amorti constant
+                capacity = max(2 * self.size, 1)
+                self.periods = np.resize(self.periods, capacity)
+                self.bars = {field: np.resize(values, (capacity,) + values.shape[1:])
+                             for field, values in self.bars.items()}
+            previous_close = self.bars['cloture'][self.size - 1] if self.size else prix
+            row = self.size
+            self.periods[row] = period
+            self.bars['ouverture'][row] = previous_close
+            self.bars['haut'][row] = np.maximum(previous_close, prix)
+            self.bars['bas'][row] = np.minimum(previous_close, prix)
+            self.bars['volume'][row] = 0.0
+            self.size += 1
+        row = self.size - 1
+        np.maximum(self.bars['haut'][row], prix, out=self.bars['haut'][row])
+        np.minimum(self.bars['bas'][row], prix, out=self.bars['bas'][row])
+        self.bars['cloture'][row] = prix
+        if volume is not None:
+            self.bars['volume'][row] += volume
+    
+    def slice(self, i, j, cols):
+        """Périodes et barres des lignes [i, j) pour les colonnes demandées (copies)"""
+        return self.periods[i:j], {field: values[i:j][:, cols] for field, values in self.bars.items()}
+
+class OHLCStoreLevel(OHLCLevel):
+    """Niveau journalier lu sur place dans les clôtures de l'historique (ouverture = clôture de la veille) ;
+    seules la dernière barre et les journées ajoutées ensuite sont tenues en mémoire"""
+    
+    def __init__(self, name, freq, dates, prix, volume):
+        self.name = name
+        self.freq = freq
+        # Vues sur l'historique (projeté depuis l'instantané), jamais copiées en entier
+        self.prix = prix
+        self.volume = volume
+        periods = pd.DatetimeIndex(dates).normalize().values
+        # La dernière journée est copiée pour être complétée par les ticks
+        self.fixed = max(len(periods) - 1, 0)
+        self.fixed_periods = periods[:self.fixed]
+        self.tail = OHLCLevel(name, freq, periods[self.fixed:],
+                              self.store_bars(self.fixed, len(periods), np.arange(prix.shape[1])))
+    
+    @property
+    def size(self):
+        return self.fixed + self.tail.size
+    
+    @property
+    def periods(self):
+        return np.concatenate([self.fixed_periods, self.tail.periods[:self.tail.size]])
+    
+    def store_bars(self, i, j, cols):
+        """Barres des lignes [i, j) de l'historique, dérivées des clôtures des colonnes demandées"""
+        start = max(i - 1, 0)
+        block = self.prix[np.ix_(np.arange(start, j), cols)].astype(np.float32)
+        cloture = block[i - start:]
+        ouverture = block[:len(block) - 1] if i else np.vstack([block[:1], block[:-1]])
+        return {
+            'ouverture': ouverture,
+            'haut': np.maximum(ouverture, cloture),
+            'bas': np.minimum(ouverture, cloture),
+            'cloture': cloture,
+            'volume': self.volume[np.ix_(np.arange(i, j), cols)].astype(np.float32)
+        }
+    
+    def update(self, date, prix, volume=None):
+        """Complète la dernière journée ou en ajoute une (en mémoire)"""
+        self.tail.update(date, prix, volume)
+    
+    def slice(self, i, j, cols):
+        """Périodes et barres des lignes [i, j) : historique lu sur place, puis journées en mémoire"""
+        h = min(j, self.fixed)
+        periods, tail = self.tail.slice(max(i - self.fixed, 0), max(j - self.fixed, 0), cols)
+        if i >= h:
+            return periods, tail
+        bars = self.store_bars(i, h, cols)
+        return (np.concatenate([self.fixed_periods[i:h], periods]),
+                {field: np.concatenate([bars[field], tail[field]]) for field in OHLC_FIELDS})
+
+class OHLCPyramid:
+    """Barres OHLC pré-agrégées (jour, semaine, mois) ; chaque requête lit le niveau le plus
+    grossier qui remplit encore le graphique"""
+    
+    def __init__(self, symboles, levels):
+        self.symboles = list(symboles)
+        self.columns = {symbole: i for i, symbole in enumerate(self.symboles)}
+        self.levels = levels
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_history(cls, dates, symboles, prix, volume):
+        """Construit la pyramide sur les clôtures et volumes journaliers (dates × paires) : le niveau
+        journalier les lit sur place, seuls les niveaux agrégés sont tenus en mémoire"""
+        daily = OHLCStoreLevel(OHLC_LEVELS[0][0], OHLC_LEVELS[0][1], dates, prix, volume)
+        levels = [daily] + [OHLCLevel.aggregate(name, freq, dates, prix, volume) for name, freq in OHLC_LEVELS[1:]]
+        return cls(symboles, levels)
+    
+    def update(self, date, prix, volume=None):
+        """Étend tous les niveaux avec une observation de toutes les paires (nouvelle barre ou barre en cours)"""
+        prix = np.asarray(prix, dtype=np.float32)
+        with self.lock:
+            for level in self.levels:
+                level.update(date, prix, volume)
+    
+    def get_level(self, name):
+        """Niveau de la pyramide par nom ('jour', 'semaine', 'mois')"""
+        return next(level for level in self.levels if level.name == name)
+    
+    def select_level(self, start=None, end=None, target_points=OHLC_TARGET_POINTS):
+        """Niveau le plus grossier comptant au moins target_points barres sur la période (sinon le plus fin)"""
+        for level in reversed(self.levels):
+            i, j = level.range(start, end)
+            if j - i >= target_points:
+                return level
+        return self.levels[0]
+    
+    def query(self, symboles, start=None, end=None, target_points=OHLC_TARGET_POINTS, level=None):
+        """Barres OHLC des paires demandées au format long (date, symbole, ouverture, haut, bas, cloture, volume)"""
+        with self.lock:
+            level = self.select_level(start, end, target_points) if level is None else level
+            i, j = level.range(start, end)
+            cols = [self.columns[symbole] for symbole in symboles]
+            periods, bars = level.slice(i, j, cols)
+        frame = pd.DataFrame({
+            'date': np.repeat(periods, len(cols)),
+            'symbole': np.tile(np.asarray(symboles, dtype=object), j - i)
+        })
+        for field in OHLC_FIELDS:
+            frame[field] = bars[field].ravel()
+        frame.attrs['niveau'] = level.name
+        return frame
+
+class IndicatorEngine:
+    """Indicateurs techniques incrémentaux (MM20/MM50, RSI de Wilder, Bollinger) pour toutes les paires"""
+    
+    def __init__(self, symboles, ma_short=20, ma_long=50, rsi_period=14, bollinger_period=20, std_dev=2):
+        self.symboles = list(symboles)
+        self.ma_short = ma_short
+        self.ma_long = ma_long
+        self.rsi_period = rsi_period
+        self.bollinger_period = bollinger_period
+        self.std_dev = std_dev
+        # Tampon circulaire des derniers prix (une ligne par barre)
+        self.window = max(ma_short, ma_long, bollinger_period)
+        n_paires = len(self.symboles)
+        self.buffer = np.zeros((self.window, n_paires))
+        self.pos = 0
+        self.state = {}
+    
+    @classmethod
+    def from_history(cls, symboles, prix, **params):
+        """Initialise l'état de tous les indicateurs en un seul passage sur l'historique (dates × paires)"""
+        engine = cls(symboles, **params)
+        prix = np.asarray(prix, dtype=np.float64)
+        if len(prix) <= engine.window:
+            raise ValueError(f"Historique trop court : {len(prix)} barres pour une fenêtre de {engine.window}")
+        
+        engine.buffer[:] = prix[-engine.window:]
+        engine.pos = 0
+        
+        boll = prix[-engine.bollinger_period:]
+        boll_mean = boll.mean(axis=0)
+        
+        # Lissage de Wilder = moyenne exponentielle de paramètre 1/période
+        delta = np.diff(prix, axis=0)
+        smoothing = pd.DataFrame(np.stack([np.maximum(delta, 0), np.maximum(-delta, 0)], axis=1).reshape(len(delta), -1))
+        averages = smoothing.ewm(alpha=1 / engine.rsi_period, adjust=False).mean().to_numpy()[-1]
+        avg_gain, avg_loss = averages.reshape(2, -1)
+        
+        engine.state = {
+            'sum_short': prix[-engine.ma_short:].sum(axis=0),
+            'sum_long': prix[-engine.ma_long:].sum(axis=0),
+            'boll_mean': boll_mean,
+            'boll_m2': ((boll - boll_mean) ** 2).sum(axis=0),
+            'avg_gain': avg_gain,
+            'avg_loss': avg_loss,
+            'last': prix[-1].copy()
+        }
+        return engine
+    
+    def _step(self, prix):
+        """Calcule le nouvel état après une barre, sans modifier l'état courant"""
+        s = self.state
+        leaving = lambda length: self.buffer[(self.pos - length) % self.window]
+        
+        # Moyennes mobiles : sommes glissantes
+        sum_short = s['sum_short'] + prix - leaving(self.ma_short)
+        sum_long = s['sum_long'] + prix - leaving(self.ma_long)
+        
+        # Bollinger : moyenne et variance glissantes de Welford (remplacement d'une valeur)
+        old = leaving(self.bollinger_period)
+        boll_mean = s['boll_mean'] + (prix - old) / self.bollinger_period
+        boll_m2 = s['boll_m2'] + (prix - old) * (prix - boll_mean + old - s['boll_mean'])
+        
+        # RSI : lissage de Wilder des gains et pertes
+        delta = prix - s['last']
+        alpha = 1 / self.rsi_period
+        avg_gain = s['avg_gain'] + alpha * (np.maximum(delta, 0) - s['avg_gain'])
+        avg_loss = s['avg_loss'] + alpha * (np.maximum(-delta, 0) - s['avg_loss'])
+        
+        return {
+            'sum_short': sum_short,
+            'sum_long': sum_long,
+            'boll_mean': boll_mean,
+            'boll_m2': np.maximum(boll_m2, 0.0),
+            'avg_gain': avg_gain,
+            'avg_loss': avg_loss,
+            'last': prix
+        }
+    
+    def update(self, prix):
+        """Intègre une nouvelle barre pour toutes les paires (O(1) par paire)"""
+        prix = np.asarray(prix, dtype=np.float64)
+        self.state = self._step(prix)
+        self.buffer[self.pos] = prix
+        self.pos = (self.pos + 1) % self.window
+        return self.values(self.state)
+    
+    def peek(self, prix):
+        """Indicateurs si la barre en cours clôturait aux prix donnés (tick), sans modifier l'état"""
+        return self.values(self._step(np.asarray(prix, dtype=np.float64)))
+    
+    def current(self):
+        """Indicateurs de la dernière barre intégrée"""
+        return self.values(self.state)
+    
+    def values(self, state):
+        """Convertit un état en tableau d'indicateurs (une ligne par paire)"""
+        std = np.sqrt(state['boll_m2'] / (self.bollinger_period - 1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = state['avg_gain'] / state['avg_loss']
+        rsi = np.where(state['avg_loss'] == 0, 100.0, 100 - 100 / (1 + rs))
+        return pd.DataFrame({
+            'MA20': state['sum_short'] / self.ma_short,
+            'MA50': state['sum_long'] / self.ma_long,
+            'RSI': rsi,
+            'Bollinger_High': state['boll_mean'] + self.std_dev * std,
+            'Bollinger_Low': state['boll_mean'] - self.std_dev * std
+        }, index=pd.Index(self.symboles, name='symbole'))
+
+# Règles par défaut du moteur de signaux
+DEFAULT_SIGNAL_RULES = {
+    'rsi_period': 14,
+    'rsi_overbought': 70,
+    'rsi_oversold': 30,
+    'ma_short': 20,
+    'ma_long': 50,
+    'crossover_lookback': 5,      # barres pendant lesquelles un croisement reste actif
+    'bollinger_period': 20,
+    'bollinger_std': 2,
+    'weight_rsi': 1.0,
+    'weight_crossover': 1.0,
+    'weight_bollinger': 1.0,
+    'threshold': 0.5              # score minimal (en valeur absolue) pour émettre un signal
+}
+
+# Force (sur 10) d'une règle seule à pleine intensité : seuil des signaux forts du tableau de bord.
+# Deux règles concordantes le dépassent, une règle tout juste déclenchée reste en dessous
+SIGNAL_STRONG_FORCE = 7
+
+# Raisons affichées, par règle (RSI, croisement, Bollinger) et par sens (vente, achat)
+SIGNAL_REASONS = np.array([
+    ['Surachat RSI', 'Survente RSI'],
+    ['Croisement baissier MM20/50', 'Croisement haussier MM20/50'],
+    ['Cassure bande haute Bollinger', 'Cassure bande basse Bollinger']
+])
+
+class SignalEngine:
+    """Signaux de trading vectorisés (RSI, croisement MM20/MM50, cassure de Bollinger) pour toutes les paires"""
+    
+    def __init__(self, rules=None):
+        self.rules = {**DEFAULT_SIGNAL_RULES, **(rules or {})}
+        self.cache_key = None
+        self.cache_value = None
+    
+    @property
+    def history_length(self):
+        """Nombre de barres nécessaires (fenêtres + convergence du lissage de Wilder)"""
+        r = self.rules
+        return max(r['ma_long'] + r['crossover_lookback'] + 1, r['bollinger_period'], 20 * r['rsi_period'])
+    
+    def compute(self, symboles, prix):
+        """Évalue toutes les règles pour toutes les paires sur une matrice de prix (dates × paires)"""
+        r = self.rules
+        prix = np.asarray(prix, dtype=np.float64)[-self.history_length:]
+        
+        # RSI de Wilder : la moyenne exponentielle s'écrit comme un produit matrice-vecteur
+        delta = np.diff(prix, axis=0)
+        alpha = 1 / r['rsi_period']
+        weights = alpha * (1 - alpha) ** np.arange(len(delta) - 1, -1, -1)
+        weights[0] = (1 - alpha) ** (len(delta) - 1)
+        avg_gain = weights @ np.maximum(delta, 0)
+        avg_loss = weights @ np.maximum(-delta, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+        rsi_vote = np.where(rsi > r['rsi_overbought'], -1, np.where(rsi < r['rsi_oversold'], 1, 0))
+        rsi_intensity = np.where(rsi_vote < 0,
+                                 (rsi - r['rsi_overbought']) / (100 - r['rsi_overbought']),
+                                 (r['rsi_oversold'] - rsi) / r['rsi_oversold'])
+        
+        # Croisements MM courte / MM longue sur les dernières barres (sommes cumulées)
+        lookback = r['crossover_lookback']
+        cumsum = np.vstack([np.zeros((1, prix.shape[1])), np.cumsum(prix, axis=0)])
+        ends = np.arange(len(prix) - lookback, len(prix) + 1)
+        ma_short = (cumsum[ends] - cumsum[ends - r['ma_short']]) / r['ma_short']
+        ma_long = (cumsum[ends] - cumsum[ends - r['ma_long']]) / r['ma_long']
+        spread_sign = np.sign(ma_short - ma_long)
+        crossed = spread_sign[1:] != spread_sign[:-1]
+        age = np.argmax(crossed[::-1], axis=0)
+        cross_vote = np.where(crossed.any(axis=0), spread_sign[-1], 0)
+        cross_intensity = 1 - age / lookback
+        
+        # Cassure des bandes de Bollinger (retour à la moyenne attendu)
+        window = prix[-r['bollinger_period']:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (prix[-1] - window.mean(axis=0)) / window.std(axis=0, ddof=1)
+        z = np.nan_to_num(z)
+        k = r['bollinger_std']
+        boll_vote = np.where(z > k, -1, np.where(z < -k, 1, 0))
+        boll_intensity = np.minimum((np.abs(z) - k) / k, 1.0)
+        
+        # Score pondéré : chaque règle vote ±1, modulé par son intensité
+        rule_weights = np.array([r['weight_rsi'], r['weight_crossover'], r['weight_bollinger']])
+        votes = np.stack([rsi_vote, cross_vote, boll_vote])
+        intensity = np.clip(np.stack([rsi_intensity, cross_intensity, boll_intensity]), 0, 1)
+        contributions = rule_weights[:, None] * votes * (0.5 + 0.5 * intensity)
+        score = contributions.sum(axis=0)
+        
+        signal = np.where(score >= r['threshold'], 'ACHAT',
+                          np.where(score <= -r['threshold'], 'VENTE', 'NEUTRE'))
+        # Force rapportée à la contribution maximale d'une règle, pas à la somme des poids : sinon une
+        # règle seule ne dépasserait jamais 10 / nombre de règles
+        force = np.abs(score) / (rule_weights.max() or 1.0) * SIGNAL_STRONG_FORCE
+        force = np.clip(np.ceil(force), 1, 10).astype(int)
+        
+        # Raison : la règle qui contribue le plus dans le sens du score
+        aligned = np.where(np.sign(contributions) == np.sign(score), np.abs(contributions), 0)
+        best_rule = np.argmax(aligned, axis=0)
+        reason = SIGNAL_REASONS[best_rule, (score > 0).astype(int)]
+        reason = np.where(aligned.max(axis=0) > 0, reason, 'Aucun signal')
+        
+        return pd.DataFrame({
+            'Symbole': list(symboles),
+            'Signal': signal,
+            'Force': force,
+            'Raison': reason,
+            'Score': score,
+            'RSI': rsi
+        })
+    
+    def evaluate(self, symboles, prix, version):
+        """Retourne les signaux, recalculés uniquement si la version des données a changé"""
+        if self.cache_key != version:
+            self.cache_value = self.compute(symboles, prix)
+            self.cache_key = version
+        return self.cache_value
+
+# Fenêtres glissantes (en barres) du moteur de corrélation
+CORRELATION_WINDOWS = (30, 90, 365)
+
+class CorrelationEngine:
+    """Corrélations glissantes des rendements sur plusieurs fenêtres, mises à jour à chaque barre"""
+    
+    # Recalcul exact périodique pour borner la dérive numérique des sommes glissantes
+    RESYNC_EVERY = 1000
+    
+    def __init__(self, symboles, windows=CORRELATION_WINDOWS):
+        self.symboles = list(symboles)
+        self.windows = tuple(windows)
+        n_paires = len(self.symboles)
+        # Tampon circulaire des derniers rendements : buffer[(pos - k) % taille] est le k-ième plus récent
+        self.buffer = np.zeros((max(self.windows), n_paires))
+        self.pos = 0
+        self.filled = 0
+        self.last = None
+        self.updates = 0
+        self.counts = dict.fromkeys(self.windows, 0)
+        self.sums = {w: np.zeros(n_paires) for w in self.windows}
+        self.cross = {w: np.zeros((n_paires, n_paires)) for w in self.windows}
+    
+    @classmethod
+    def from_history(cls, symboles, prix, windows=CORRELATION_WINDOWS):
+        """Initialise les sommes et produits croisés de chaque fenêtre à partir de l'historique"""
+        engine = cls(symboles, windows)
+        prix = np.asarray(prix, dtype=np.float64)
+        returns = prix[1:] / prix[:-1] - 1
+        m = min(len(engine.buffer), len(returns))
+        engine.buffer[:m] = returns[len(returns) - m:]
+        engine.pos = m % len(engine.buffer)
+        engine.filled = m
+        engine.last = prix[-1].copy()
+        engine.resync()
+        return engine
+    
+    def resync(self):
+        """Recalcule exactement les sommes de chaque fenêtre à partir du tampon"""
+        for w in self.windows:
+            count = min(w, self.filled)
+            idx = (self.pos - np.arange(count, 0, -1)) % len(self.buffer)
+            tail = self.buffer[idx]
+            self.counts[w] = count
+            self.sums[w] = tail.sum(axis=0)
+            self.cross[w] = tail.T @ tail
+    
+    def update(self, prix):
+        """Intègre une nouvelle barre : O(n²) par fenêtre, sans relire l'historique"""
+        prix = np.asarray(prix, dtype=np.float64)
+        r = prix / self.last - 1
+        size = len(self.buffer)
+        for w in self.windows:
+            # Tant que la fenêtre n'est pas pleine, aucun rendement n'en sort
+            leaving = self.buffer[(self.pos - w) % size] if self.filled >= w else np.zeros_like(r)
+            self.sums[w] += r - leaving
+            self.cross[w] += np.outer(r, r) - np.outer(leaving, leaving)
+            self.counts[w] = min(w, self.filled + 1)
+        self.buffer[self.pos] = r
+        self.pos = (self.pos + 1) % size
+        self.filled = min(self.filled + 1, size)
+        self.last = prix
+        self.updates += 1
+        if self.updates % self.RESYNC_EVERY == 0:
+            self.resync()
+    
+    def matrix(self, window):
+        """Matrice de corrélation (paires × paires) sur une fenêtre"""
+        n = self.counts[window]
+        s = self.sums[window]
+        cov = (self.cross[window] - np.outer(s, s) / n) / (n - 1)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        np.fill_diagonal(corr, 1.0)
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.symboles, columns=self.symboles)
+    
+    def strong_pairs(self, window, threshold=0.7, top_k=10):
+        """Les top_k paires les plus corrélées (|ρ| > seuil), extraites du triangle supérieur"""
+        corr = self.matrix(window).to_numpy()
+        i, j = np.triu_indices(len(self.symboles), k=1)
+        values = corr[i, j]
+        strong = np.flatnonzero(np.abs(values) > threshold)
+        if len(strong) > top_k:
+            strong = strong[np.argpartition(-np.abs(values[strong]), top_k)[:top_k]]
+        strong = strong[np.argsort(-np.abs(values[strong]))]
+        symboles = np.array(self.symboles, dtype=object)
+        return pd.DataFrame({
+            'Paire 1': symboles[i[strong]],
+            'Paire 2': symboles[j[strong]],
+            'Corrélation': values[strong]
+        })
+
+# Volatilité : lissage EWMA (RiskMetrics, barres journalières) et horizons de la structure par terme (jours)
+EWMA_LAMBDA = 0.94
+VOLATILITY_HORIZONS = (1, 5, 10, 21, 63, 126, 252)
+# Ajustement GARCH(1,1) : grille initiale (persistance α + β, α), puis affinements autour du meilleur point
+GARCH_PERSISTENCE_GRID = (0.80, 0.90, 0.95, 0.98, 0.995)
+GARCH_ALPHA_GRID = (0.02, 0.05, 0.10, 0.15, 0.25)
+GARCH_REFINEMENTS = 3
+
+def garch_filter(returns2, variance, alpha, beta):
+    """Log-vraisemblance gaussienne et variance prévue pour la barre suivante d'un GARCH(1,1) ciblé
+    sur la variance, pour des candidats (candidats × paires) évalués en une passe sur les rendements"""
+    omega = variance * (1 - alpha - beta)
+    var = np.broadcast_to(variance, alpha.shape).copy()
+    nll = np.zeros(alpha.shape)
+    for r2 in returns2:
+        nll += np.log(var) + r2 / var
+        var *= beta
+        var += omega + alpha * r2
+    return -0.5 * nll, var
+
+class VolatilityEngine:
+    """Volatilités EWMA et GARCH(1,1) de toutes les paires, ajustées en bloc sur la matrice des rendements.
+    
+    Les paramètres sont ajustés une fois par version de l'historique ; chaque nouvelle barre met
+    ensuite à jour les variances prévues en O(paires). Les volatilités sont journalières, en %.
+    """
+    
+    def __init__(self, symboles, lam=EWMA_LAMBDA, horizons=VOLATILITY_HORIZONS):
+        self.symboles = list(symboles)
+        self.lam = lam
+        self.horizons = tuple(horizons)
+        self.version = None
+    
+    def fit(self, prix, version=None):
+        """Ajuste EWMA et GARCH(1,1) pour toutes les paires, sauf si la version est déjà ajustée"""
+        if version is not None and version == self.version:
+            return
+        prix = np.asarray(prix, dtype=np.float64)
+        returns = np.diff(np.log(prix), axis=0)
+        returns2 = returns ** 2
+        n_paires = returns.shape[1]
+        self.variance = returns2.mean(axis=0)
+        
+        # EWMA : la récurrence déroulée est un produit matrice-vecteur, amorcé sur la variance de l'échantillon
+        weights = (1 - self.lam) * self.lam ** np.arange(len(returns) - 1, -1, -1)
+        self.ewma = weights @ returns2 + self.lam ** len(returns) * self.variance
+        
+        # GARCH : recherche sur grille vectorisée (candidats × paires), resserrée à chaque passe
+        persistence, alpha = (np.array(grid, dtype=np.float64) for grid in
+                              np.meshgrid(GARCH_PERSISTENCE_GRID, GARCH_ALPHA_GRID))
+        persistence = np.repeat(persistence.reshape(-1, 1), n_paires, axis=1)
+        alpha = np.repeat(alpha.reshape(-1, 1), n_paires, axis=1)
+        step_p, step_a = 0.5 * np.diff(GARCH_PERSISTENCE_GRID).min(), 0.5 * np.diff(GARCH_ALPHA_GRID).min()
+        cols = np.arange(n_paires)
+        for refinement in range(GARCH_REFINEMENTS + 1):
+            loglik, var = garch_filter(returns2, self.variance, alpha, persistence - alpha)
+            best = np.argmax(loglik, axis=0)
+            best_p, best_a = persistence[best, cols], alpha[best, cols]
+            self.garch = var[best, cols]
+            if refinement == GARCH_REFINEMENTS:
+                break
+            # Voisinage 3 × 3 du meilleur point, pas divisé par deux
+            dp, da = (np.array(offsets, dtype=np.float64).reshape(-1, 1) for offsets in
+                      np.meshgrid([-step_p, 0, step_p], [-step_a, 0, step_a]))
+            persistence = np.clip(best_p + dp.reshape(-1, 1), 0.5, 0.999)
+            alpha = np.clip(best_a + da.reshape(-1, 1), 0.001, persistence)
+            step_p, step_a = step_p / 2, step_a / 2
+        self.alpha = best_a
+        self.beta = best_p - best_a
+        
+        # Derniers rendements (tampon circulaire) pour la volatilité réalisée
+        self.buffer = np.zeros((max(self.horizons), n_paires))
+        m = min(len(self.buffer), len(returns))
+        self.buffer[:m] = returns[len(returns) - m:]
+        self.pos = m % len(self.buffer)
+        self.filled = m
+        self.last = prix[-1].copy()
+        self.version = version
+    
+    def update(self, prix):
+        """Intègre une nouvelle barre : mise à jour des variances prévues sans réajustement"""
+        prix = np.asarray(prix, dtype=np.float64)
+        r = np.log(prix / self.last)
+        self.ewma = self.lam * self.ewma + (1 - self.lam) * r ** 2
+        self.garch = self.variance * (1 - self.alpha - self.beta) + self.alpha * r ** 2 + self.beta * self.garch
+        self.buffer[self.pos] = r
+        self.pos = (self.pos + 1) % len(self.buffer)
+        self.filled = min(self.filled + 1, len(self.buffer))
+        self.last = prix
+    
+    def realized(self, horizons=None):
+        """Volatilité réalisée (quadratique moyenne) sur les `h` dernières barres (horizons × paires)"""
+        horizons = self.horizons if horizons is None else horizons
+        size = len(self.buffer)
+        squared = self.buffer[(self.pos - np.arange(size, 0, -1)) % size] ** 2
+        cumsum = np.cumsum(squared[::-1], axis=0)
+        counts = np.minimum(horizons, self.filled)
+        return np.sqrt(cumsum[counts - 1] / counts[:, None]) * 100
+    
+    def forecast(self, horizons=None):
+        """Volatilité GARCH moyenne prévue sur chaque horizon (horizons × paires) :
+        la variance revient vers le long terme au rythme de la persistance α + β"""
+        horizons = np.asarray(self.horizons if horizons is None else horizons)
+        persistence = self.alpha + self.beta
+        # Somme géométrique des persistances sur l'horizon, divisée par sa longueur
+        with np.errstate(divide='ignore', invalid='ignore'):
+            decay = np.where(persistence < 1,
+                             (1 - persistence ** horizons[:, None]) / (1 - persistence) / horizons[:, None], 1.0)
+        return np.sqrt(self.variance + decay * (self.garch - self.variance)) * 100
+    
+    def term_structure(self, symboles=None):
+        """Structure par terme réalisée / EWMA / GARCH, une ligne par (horizon, paire)"""
+        idx = slice(None) if symboles is None else [self.symboles.index(symbole) for symbole in symboles]
+        realized = self.realized()[:, idx]
+        garch = self.forecast()[:, idx]
+        n_horizons, n_paires = garch.shape
+        return pd.DataFrame({
+            'horizon': np.repeat(self.horizons, n_paires),
+            'symbole': np.tile(np.array(self.symboles, dtype=object)[idx], n_horizons),
+            'realisee': realized.ravel(),
+            # EWMA : variance constante sur tous les horizons
+            'ewma': np.tile(np.sqrt(self.ewma[idx]) * 100, n_horizons),
+            'garch': garch.ravel()
+        })
+    
+    def parameters(self):
+        """Paramètres GARCH et volatilités journalières prévues de chaque paire"""
+        persistence = self.alpha + self.beta
+        return pd.DataFrame({
+            'symbole': self.symboles,
+            'alpha': self.alpha,
+            'beta': self.beta,
+            'persistance': persistence,
+            'demi_vie': np.log(0.5) / np.log(persistence),
+            'long_terme': np.sqrt(self.variance) * 100,
+            'ewma': np.sqrt(self.ewma) * 100,
+            'garch': np.sqrt(self.garch) * 100
+        })
+
+# Écart relatif toléré entre un taux croisé coté et le taux implicite des jambes USD
+CROSS_RATE_TOLERANCE = 0.005
+
+class CrossRateEngine:
+    """Taux croisés de toutes les devises à partir des jambes USD, et cohérence triangulaire des paires cotées.
+    
+    La valeur en USD de chaque devise est un produit de prix cotés : en logarithmes, un
+    produit matrice-vecteur (devises × paires) par tick, puis une différence extérieure
+    donne la matrice N × N des taux croisés.
+    """
+    
+    def __init__(self, symboles, pivot='USD'):
+        self.symboles = list(symboles)
+        legs = [symbole.split('/') for symbole in self.symboles]
+        self.base = [base for base, _ in legs]
+        self.quote = [quote for _, quote in legs]
+        self.devises = list(dict.fromkeys([pivot] + self.base + self.quote))
+        self.index = {devise: i for i, devise in enumerate(self.devises)}
+        
+        # Parcours en largeur depuis la devise pivot : chaque devise est rattachée par le plus
+        # court chemin de paires cotées (les jambes USD directes en priorité)
+        exposants = np.zeros((len(self.devises), len(self.symboles)))
+        resolved = {pivot}
+        frontier = [pivot]
+        while frontier:
+            next_frontier = []
+            for devise in frontier:
+                for col, (base, quote) in enumerate(legs):
+                    # log v(base) = log prix + log v(quote)
+                    if quote == devise and base not in resolved:
+                        exposants[self.index[base]] = exposants[self.index[quote]]
+                        exposants[self.index[base], col] += 1
+                        resolved.add(base)
+                        next_frontier.append(base)
+                    elif base == devise and quote not in resolved:
+                        exposants[self.index[quote]] = exposants[self.index[base]]
+                        exposants[self.index[quote], col] -= 1
+                        resolved.add(quote)
+                        next_frontier.append(quote)
+            frontier = next_frontier
+        self.exposants = exposants
+        self.resolved = np.array([devise in resolved for devise in self.devises])
+        self.base_index = np.array([self.index[base] for base in self.base])
+        self.quote_index = np.array([self.index[quote] for quote in self.quote])
+        # (version, log prix cotés, log valeurs en USD) : remplacé d'un bloc à chaque mise à jour,
+        # les sessions qui lisent pendant qu'une autre met à jour ne mélangent jamais deux ticks
+        self.state = (None, np.full(len(self.symboles), np.nan), np.full(len(self.devises), np.nan))
+    
+    @property
+    def version(self):
+        return self.state[0]
+    
+    @property
+    def log_values(self):
+        return self.state[2]
+    
+    def update(self, prix, version=None):
+        """Recalcule la valeur en USD (log) de toutes les devises à partir des prix cotés"""
+        if version is not None and version == self.state[0]:
+            return
+        log_prix = np.log(np.asarray(prix, dtype=np.float64))
+        log_values = np.where(self.resolved, self.exposants @ log_prix, np.nan)
+        self.state = (version, log_prix, log_values)
+    
+    def matrix(self, devises=None):
+        """Matrice des taux croisés : ligne = devise de base, colonne = devise de cotation"""
+        idx = np.arange(len(self.devises)) if devises is None else [self.index[devise] for devise in devises]
+        log_values = self.state[2][idx]
+        labels = [self.devises[i] for i in idx]
+        return pd.DataFrame(np.exp(np.subtract.outer(log_values, log_values)), index=labels, columns=labels)
+    
+    def rate(self, base, quote):
+        """Taux d'une paire quelconque, cotée ou non, dérivé des jambes USD"""
+        log_values = self.state[2]
+        return float(np.exp(log_values[self.index[base]] - log_values[self.index[quote]]))
+    
+    def inconsistencies(self, tolerance=CROSS_RATE_TOLERANCE):
+        """Paires cotées dont le prix s'écarte du taux implicite de plus de `tolerance` (en relatif)"""
+        _, log_prix, log_values = self.state
+        implied = log_values[self.base_index] - log_values[self.quote_index]
+        ecart = np.expm1(log_prix - implied)
+        flagged = np.flatnonzero(np.abs(ecart) > tolerance)
+        flagged = flagged[np.argsort(-np.abs(ecart[flagged]))]
+        return pd.DataFrame({
+            'Paire': np.array(self.symboles, dtype=object)[flagged],
+            'Prix coté': np.exp(log_prix[flagged]),
+            'Taux implicite': np.exp(implied[flagged]),
+            'Écart (%)': ecart[flagged] * 100
+        })
+
+# Devises des paniers équipondérés
+BASKET_MAJORS = ['USD', 'EUR', 'GBP', 'JPY', 'CHF', 'AUD', 'CAD', 'NZD']
+# Paniers des indices de devises : nom -> devise mesurée et poids des devises du panier.
+# Le DXY reprend les pondérations de l'ICE, les autres sont équipondérés sur les majeures
+BASKET_WEIGHTS = {
+    'Dollar Index (DXY)': {'devise': 'USD', 'poids': {'EUR': 0.576, 'JPY': 0.136, 'GBP': 0.119,
+                                                      'CAD': 0.091, 'SEK': 0.042, 'CHF': 0.036}},
+    **{f'{nom} Index': {'devise': devise, 'poids': {autre: 1.0 for autre in BASKET_MAJORS if autre != devise}}
+       for nom, devise in [('Euro', 'EUR'), ('Pound', 'GBP'), ('Yen', 'JPY'), ('Franc', 'CHF'),
+                           ('Aussie', 'AUD'), ('Loonie', 'CAD'), ('Kiwi', 'NZD')]}
+}
+# Valeur des indices au premier jour de l'historique
+BASKET_BASE_VALUE = 100.0
+
+class BasketIndexEngine:
+    """Indices de devises à moyenne géométrique pondérée (style DXY), calculés depuis les prix des paires.
+    
+    log indice = Σ poids · log(devise / devise du panier) ; les jambes USD du moteur de taux
+    croisés en font une ligne de la matrice (paniers × paires) : tous les paniers sont
+    évalués en un seul produit matrice-vecteur par tick.
+    """
+    
+    def __init__(self, cross_rates, reference_prix, ouverture_prix, baskets=BASKET_WEIGHTS, seance=None):
+        self.cross_rates = cross_rates
+        self.log_reference = np.log(np.asarray(reference_prix, dtype=np.float64))
+        self.log_ouverture = np.log(np.asarray(ouverture_prix, dtype=np.float64))
+        # Séance des prix d'ouverture (TickRing.seance du moteur de ticks)
+        self.seance = seance
+        # Paniers (noms, devises, matrice, références de base et d'ouverture) et état courant
+        # (version, log prix, paniers, valeurs, variations) : chacun est remplacé d'un bloc, un
+        # lecteur concurrent voit toujours des valeurs d'un même tick et d'une même liste de paniers
+        self.baskets = ([], [], np.zeros((0, len(cross_rates.symboles))), np.zeros(0), np.zeros(0))
+        self.state = self.compute(None, self.log_ouverture, self.baskets)
+        self.lock = threading.Lock()
+        for nom, basket in baskets.items():
+            self.add_basket(nom, basket['devise'], basket['poids'])
+    
+    @property
+    def version(self):
+        return self.state[0]
+    
+    @property
+    def noms(self):
+        return self.state[2][0]
+    
+    @property
+    def values(self):
+        return self.state[3]
+    
+    @property
+    def change_pct(self):
+        return self.state[4]
+    
+    def add_basket(self, nom, devise, poids):
+        """Ajoute (ou remplace) un panier ; les devises absentes de l'univers en sont retirées.
+        Retourne False si le panier ne peut pas être calculé"""
+        cross = self.cross_rates
+        resolved = lambda d: d in cross.index and cross.resolved[cross.index[d]]
+        poids = {autre: w for autre, w in poids.items() if autre != devise and resolved(autre)}
+        if not resolved(devise) or not poids:
+            return False
+        total = sum(poids.values())
+        row = cross.exposants[cross.index[devise]].copy()
+        for autre, w in poids.items():
+            row -= w / total * cross.exposants[cross.index[autre]]
+        # Les ajouts sont sérialisés entre eux ; les lecteurs ne prennent pas le verrou
+        with self.lock:
+            noms, devises, matrix, _, _ = self.baskets
+            noms, devises = list(noms), list(devises)
+            if nom in noms:
+                matrix = matrix.copy()
+                matrix[noms.index(nom)] = row
+                devises[noms.index(nom)] = devise
+            else:
+                noms.append(nom)
+                devises.append(devise)
+                matrix = np.vstack([matrix, row])
+            # Références par panier : valeur de base et ouverture de la séance
+            self.baskets = (noms, devises, matrix, matrix @ self.log_reference, matrix @ self.log_ouverture)
+            self.state = self.compute(None, self.state[1], self.baskets)
+        return True
+    
+    def reopen(self, ouverture_prix, seance=None):
+        """Ancre les variations de tous les paniers sur l'ouverture d'une nouvelle séance"""
+        with self.lock:
+            self.log_ouverture = np.log(np.asarray(ouverture_prix, dtype=np.float64))
+            noms, devises, matrix, reference, _ = self.baskets
+            self.baskets = (noms, devises, matrix, reference, matrix @ self.log_ouverture)
+            self.seance = seance
+            self.state = self.compute(None, self.state[1], self.baskets)
+    
+    def evaluate(self, prix):
+        """Valeur des indices pour un vecteur de prix (paires) ou une matrice (instants × paires)"""
+        _, _, matrix, reference, _ = self.baskets
+        log_prix = np.log(np.asarray(prix, dtype=np.float64))
+        return BASKET_BASE_VALUE * np.exp(log_prix @ matrix.T - reference)
+    
+    @staticmethod
+    def compute(version, log_prix, baskets):
+        """État de tous les paniers sur des prix donnés (un produit matrice-vecteur)"""
+        _, _, matrix, reference, ouverture = baskets
+        log_index = matrix @ log_prix
+        return (version, log_prix, baskets, BASKET_BASE_VALUE * np.exp(log_index - reference),
+                np.expm1(log_index - ouverture) * 100)
+    
+    def update(self, prix, version=None):
+        """Met à jour la valeur courante et la variation de séance de tous les paniers"""
+        if version is not None and version == self.state[0]:
+            return
+        self.state = self.compute(version, np.log(np.asarray(prix, dtype=np.float64)), self.baskets)
+    
+    def frame(self):
+        """Valeur courante et variation de séance de chaque indice"""
+        _, _, (noms, devises, _, _, _), values, change_pct = self.state
+        return pd.DataFrame({
+            'indice': noms,
+            'devise': devises,
+            'valeur': values,
+            'change_pct': change_pct
+        })
+
+# Motifs de sortie d'une position (codes renvoyés par backtest_block)
+EXIT_TAKE_PROFIT, EXIT_STOP_LOSS, EXIT_LIQUIDATION, EXIT_EXPIRY = range(4)
+EXIT_REASONS = np.array(['Take Profit', 'Stop Loss', 'Liquidation', 'Échéance'])
+# En dessous de ce nombre de (configuration × paire), le balayage reste dans le processus courant
+BACKTEST_PARALLEL_MIN_CELLS = 200_000
+
+def backtest_block(returns, stop_losses, take_profits, leverages):
+    """Noyau du backtest : premières sorties pour une grille SL × TP × levier.
+    
+    returns est une matrice (horizon × paires) des variations en % depuis l'entrée, déjà
+    signées par le sens de la position. Retourne l'indice de sortie, le motif et le P&L
+    en % de la marge, de forme (paires × SL × TP × levier).
+    """
+    horizon, n_paires = returns.shape
+    stop_losses = np.asarray(stop_losses, dtype=np.float64)
+    take_profits = np.asarray(take_profits, dtype=np.float64)
+    leverages = np.asarray(leverages, dtype=np.float64)
+    # Stop effectif : le stop demandé, ou la liquidation (perte de toute la marge) si elle est plus proche
+    liquidation = 100.0 / leverages
+    stops = np.minimum(stop_losses[:, None], liquidation[None, :])
+    
+    # Extrêmes courants : monotones, le premier franchissement d'un niveau est une recherche dichotomique
+    highs = np.maximum.accumulate(returns, axis=0)
+    lows = -np.minimum.accumulate(returns, axis=0)
+    hit_tp = np.empty((n_paires, len(take_profits)), dtype=np.int64)
+    hit_sl = np.empty((n_paires,) + stops.shape, dtype=np.int64)
+    for j in range(n_paires):
+        hit_tp[j] = np.searchsorted(highs[:, j], take_profits, side='left')
+        hit_sl[j] = np.searchsorted(lows[:, j], stops.ravel(), side='left').reshape(stops.shape)
+    
+    t_tp = hit_tp[:, None, :, None]
+    t_sl = hit_sl[:, :, None, :]
+    exit_index = np.minimum(np.minimum(t_tp, t_sl), horizon - 1)
+    liquidated = (liquidation[None, :] <= stop_losses[:, None])[None, :, None, :]
+    reason = np.where(t_tp < t_sl, EXIT_TAKE_PROFIT,
+                      np.where(liquidated, EXIT_LIQUIDATION, EXIT_STOP_LOSS))
+    reason = np.where(np.minimum(t_tp, t_sl) >= horizon, EXIT_EXPIRY, reason)
+    
+    # Exécution au cours de clôture de la barre de sortie ; la perte est limitée à la marge
+    paires = np.arange(n_paires)[:, None, None, None]
+    pnl_pct = np.maximum(returns[exit_index, paires] * leverages[None, None, None, :], -100.0)
+    return exit_index, reason, pnl_pct
+
+class Backtester:
+    """Rejoue une position long/short sur l'historique de toutes les paires à la fois"""
+    
+    def __init__(self, price_store):
+        self.price_store = price_store
+    
+    def returns(self, start, horizon, direction=1, symboles=None):
+        """Variations signées (en %) depuis l'entrée, sur les barres qui suivent la date d'entrée"""
+        store = self.price_store
+        entry, _ = store.date_range(start, None)
+        entry = min(entry, len(store.dates) - 1)
+        end = min(entry + 1 + horizon, len(store.dates))
+        if end <= entry + 1:
+            raise ValueError("Aucune barre disponible après la date d'entrée")
+        symboles = store.symboles if symboles is None else list(symboles)
+        cols = [store.columns[symbole] for symbole in symboles]
+        prix = store.prix[entry:end][:, cols]
+        returns = (prix[1:] / prix[0] - 1) * 100 * direction
+        return entry, symboles, prix, returns
+    
+    def run(self, start, horizon, direction, stop_loss, take_profit, leverage, amount=1000.0, symboles=None):
+        """Backtest d'une configuration pour toutes les paires : P&L, durée et motif de sortie"""
+        entry, symboles, prix, returns = self.returns(start, horizon, direction, symboles)
+        exit_index, reason, pnl_pct = backtest_block(returns, [stop_loss], [take_profit], [leverage])
+        exit_index = exit_index[:, 0, 0, 0]
+        pnl_pct = pnl_pct[:, 0, 0, 0]
+        paires = np.arange(len(symboles))
+        return pd.DataFrame({
+            'symbole': symboles,
+            'entree': prix[0],
+            'sortie': prix[exit_index + 1, paires],
+            'date_sortie': self.price_store.dates[entry + 1 + exit_index],
+            'jours': exit_index + 1,
+            'variation_pct': returns[exit_index, paires],
+            'pnl_pct': pnl_pct,
+            'pnl': amount * pnl_pct / 100,
+            'raison': EXIT_REASONS[reason[:, 0, 0, 0]]
+        })
+    
+    def sweep(self, start, horizon, direction, stop_losses, take_profits, leverages, symboles=None, workers=None):
+        """Balayage SL × TP × levier × paire, réparti par blocs de paires sur un pool de processus"""
+        _, symboles, _, returns = self.returns(start, horizon, direction, symboles)
+        n_cells = len(symboles) * len(stop_losses) * len(take_profits) * len(leverages)
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        
+        if workers <= 1 or n_cells < BACKTEST_PARALLEL_MIN_CELLS:
+            blocks = [backtest_block(returns, stop_losses, take_profits, leverages)]
+        else:
+            chunks = np.array_split(np.arange(len(symboles)), workers)
+            # spawn : le processus parent peut porter des threads (flux temps réel)
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                blocks = list(pool.map(backtest_block, [np.ascontiguousarray(returns[:, chunk]) for chunk in chunks],
+                                       *[[grid] * len(chunks) for grid in (stop_losses, take_profits, leverages)]))
+        exit_index, reason, pnl_pct = (np.concatenate(parts) for parts in zip(*blocks))
+        
+        grid = pd.MultiIndex.from_product([symboles, stop_losses, take_profits, leverages],
+                                          names=['symbole', 'stop_loss', 'take_profit', 'levier'])
+        return pd.DataFrame({
+            'jours': exit_index.ravel() + 1,
+            'pnl_pct': pnl_pct.ravel(),
+            'raison': EXIT_REASONS[reason.ravel()]
+        }, index=grid).reset_index()
+
+# Aperçu Monte Carlo : nombre de trajectoires, taille des lots de trajectoires (mémoire) et fenêtre de calibration (jours)
+MONTE_CARLO_PATHS = 100_000
+# Jours simulés par bloc : les trajectoires sorties (stop ou objectif) ne sont plus prolongées
+MONTE_CARLO_BLOCK_DAYS = 16
+MONTE_CARLO_CHUNK = 25_000
+MONTE_CARLO_WINDOW = 250
+PNL_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+class MonteCarloPreview:
+    """Distribution des issues d'une position par simulation de trajectoires de prix en bloc"""
+    
+    def __init__(self, price_store, currencies, rng, window=MONTE_CARLO_WINDOW, prior_weight=0.5):
+        self.price_store = price_store
+        self.currencies = currencies
+        self.rng = rng
+        self.window = window
+        # Poids de la volatilité de référence (fiche de la paire) face à la volatilité historique
+        self.prior_weight = prior_weight
+    
+    def calibrate(self, symbole):
+        """Dérive et écart-type journaliers des log-rendements de la paire"""
+        prix = self.price_store.values(symbole)[-(self.window + 1):]
+        log_returns = np.diff(np.log(prix))
+        drift = log_returns.mean() if len(log_returns) else 0.0
+        historical_var = log_returns.var(ddof=1) if len(log_returns) > 1 else 0.0
+        reference_var = (self.currencies[symbole]['volatilite'] / 100) ** 2
+        sigma = np.sqrt((1 - self.prior_weight) * historical_var + self.prior_weight * reference_var)
+        return drift, sigma
+    
+    def simulate(self, symbole, horizon, direction, stop_loss, take_profit, leverage, amount=1000.0,
+                 n_paths=MONTE_CARLO_PATHS, chunk_size=MONTE_CARLO_CHUNK):
+        """Probabilités de sortie, P&L espéré et quantiles du P&L au levier choisi"""
+        drift, sigma = self.calibrate(symbole)
+        liquidation = 100.0 / leverage
+        stop = min(stop_loss, liquidation)
+        stop_reason = EXIT_LIQUIDATION if liquidation <= stop_loss else EXIT_STOP_LOSS
+        # Seuils sur le log-rendement cumulé : le prix franchit +x % quand il franchit log(1 + x),
+        # ce qui évite de convertir chaque point de trajectoire en variation
+        with np.errstate(divide='ignore'):
+            if direction > 0:
+                upper, lower = np.log1p(take_profit / 100), np.log1p(-min(stop, 100.0) / 100)
+                upper_reason, lower_reason = EXIT_TAKE_PROFIT, stop_reason
+            else:
+                upper, lower = np.log1p(stop / 100), np.log1p(-min(take_profit, 100.0) / 100)
+                upper_reason, lower_reason = stop_reason, EXIT_TAKE_PROFIT
+        
+        reasons = np.full(n_paths, EXIT_EXPIRY, dtype=np.int8)
+        days = np.full(n_paths, horizon, dtype=np.int32)
+        levels = np.empty(n_paths, dtype=np.float32)
+        for start in range(0, n_paths, chunk_size):
+            n = min(chunk_size, n_paths - start)
+            # Trajectoires encore ouvertes et leur log-rendement cumulé
+            active = np.arange(start, start + n)
+            level = np.zeros(n, dtype=np.float32)
+            for day in range(0, horizon, MONTE_CARLO_BLOCK_DAYS):
+                # Un bloc (jours × trajectoires ouvertes), en float32 pour la mémoire : les extrêmes
+                # de chaque trajectoire sont des réductions sur l'axe contigu
+                width = min(MONTE_CARLO_BLOCK_DAYS, horizon - day)
+                paths = self.rng.standard_normal((width, len(active)), dtype=np.float32)
+                paths *= np.float32(sigma)
+                paths += np.float32(drift)
+                paths[0] += level
+                np.cumsum(paths, axis=0, out=paths)
+                
+                # Premier franchissement, cherché seulement sur les trajectoires qui sortent dans le bloc
+                done = np.flatnonzero((paths.max(axis=0) >= upper) | (paths.min(axis=0) <= lower))
+                block = paths[:, done]
+                hit_upper = block >= upper
+                hit_lower = block <= lower
+                t_upper = np.where(hit_upper.any(axis=0), hit_upper.argmax(axis=0), width)
+                t_lower = np.where(hit_lower.any(axis=0), hit_lower.argmax(axis=0), width)
+                exit_index = np.minimum(t_upper, t_lower)
+                
+                exited = active[done]
+                reasons[exited] = np.where(t_upper < t_lower, upper_reason, lower_reason)
+                days[exited] = day + exit_index + 1
+                levels[exited] = block[exit_index, np.arange(len(done))]
+                
+                # Les trajectoires sorties ne sont pas prolongées dans les blocs suivants
+                still_open = np.ones(len(active), dtype=bool)
+                still_open[done] = False
+                active = active[still_open]
+                level = paths[-1, still_open]
+                if not len(active):
+                    break
+            # Échéance : sortie au dernier cours de l'horizon
+            levels[active] = level
+        
+        pnl_pct = np.maximum(direction * np.expm1(levels) * 100 * leverage, -100.0)
+        pnl = pnl_pct.astype(np.float64) * amount / 100
+        return {
+            'drift': drift,
+            'sigma': sigma,
+            'probabilites': pd.Series(np.bincount(reasons, minlength=len(EXIT_REASONS)) / n_paths,
+                                      index=EXIT_REASONS),
+            'pnl_moyen': pnl.mean(),
+            'jours_moyen': days.mean(),
+            'quantiles': pd.Series(np.quantile(pnl, PNL_QUANTILES), index=PNL_QUANTILES),
+            'pnl': pnl
+        }
+
+POSITION_OPEN, POSITION_CLOSED = 'ouverte', 'fermee'
+
+LEDGER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    id INTEGER PRIMARY KEY,
+    symbole TEXT NOT NULL,
+    sens INTEGER NOT NULL,
+    montant REAL NOT NULL,
+    levier REAL NOT NULL,
+    prix_entree REAL NOT NULL,
+    stop_loss REAL NOT NULL,
+    take_profit REAL NOT NULL,
+    ouverte_le TEXT NOT NULL,
+    statut TEXT NOT NULL,
+    prix_sortie REAL,
+    fermee_le TEXT,
+    pnl REAL,
+    raison TEXT
+);
+CREATE INDEX IF NOT EXISTS positions_symbole_statut ON positions (symbole, statut);
+CREATE INDEX IF NOT EXISTS positions_statut_fermeture ON positions (statut, fermee_le);
+-- Index couvrant des agrégats (taux de réussite, P&L) : la table n'est pas relue
+CREATE INDEX IF NOT EXISTS positions_statut_pnl ON positions (statut, symbole, pnl);
+"""
+
+def position_pnl(sens, prix_entree, prix, montant, levier):
+    """P&L (en $) de positions au prix donné ; la perte est limitée à la marge"""
+    variation = sens * (prix / prix_entree - 1) * 100
+    return variation, np.maximum(variation * levier, -100.0) * montant / 100
+
+class PositionLedger:
+    """Registre transactionnel (SQLite, mode WAL) des positions ouvertes et clôturées du simulateur"""
+    
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Connexion partagée par les sessions du processus, sérialisée par le verrou
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            # WAL : les lectures (autres processus compris) ne bloquent pas les écritures
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            self.connection.executescript(LEDGER_SCHEMA)
+        # Positions ouvertes gardées en mémoire entre deux écritures : la valorisation
+        # à chaque tick ne relit pas la base
+        self.open_cache = None
+    
+    def query(self, sql, params=()):
+        """Exécute une requête de lecture et retourne un DataFrame"""
+        with self.lock:
+            return pd.read_sql_query(sql, self.connection, params=params)
+    
+    def open(self, symbole, sens, montant, levier, prix_entree, stop_loss, take_profit, ouverte_le=None):
+        """Enregistre une position ouverte et retourne son identifiant"""
+        ouverte_le = (ouverte_le or datetime.now()).isoformat(timespec='seconds')
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO positions (symbole, sens, montant, levier, prix_entree, stop_loss, take_profit, '
+                'ouverte_le, statut) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (symbole, int(sens), float(montant), float(levier), float(prix_entree),
+                 float(stop_loss), float(take_profit), ouverte_le, POSITION_OPEN)
+            )
+            self.open_cache = None
+        return cursor.lastrowid
+    
+    def open_positions(self):
+        """Positions ouvertes (DataFrame mis en cache jusqu'à la prochaine écriture)"""
+        if self.open_cache is None:
+            self.open_cache = self.query(
+                'SELECT id, symbole, sens, montant, levier, prix_entree, stop_loss, take_profit, ouverte_le '
+                'FROM positions WHERE statut = ?', (POSITION_OPEN,)
+            )
+        return self.open_cache
+    
+    def mark_to_market(self, snapshot):
+        """Valorise toutes les positions ouvertes sur l'instantané temps réel (une jointure vectorisée)"""
+        positions = self.open_positions()
+        prix = positions['symbole'].map(snapshot.set_index('symbole')['prix']).to_numpy(dtype=np.float64)
+        variation, pnl = position_pnl(positions['sens'].to_numpy(), positions['prix_entree'].to_numpy(),
+                                      prix, positions['montant'].to_numpy(), positions['levier'].to_numpy())
+        liquidation = 100.0 / positions['levier'].to_numpy()
+        stop = np.minimum(positions['stop_loss'].to_numpy(), liquidation)
+        raison = np.where(variation >= positions['take_profit'].to_numpy(), 'Take Profit',
+                          np.where(variation > -stop, None,
+                                   np.where(liquidation <= positions['stop_loss'].to_numpy(), 'Liquidation', 'Stop Loss')))
+        # Paire absente de l'instantané (retirée de l'univers) : la position reste ouverte, non valorisée
+        raison = np.where(np.isnan(prix), None, raison)
+        return positions.assign(prix=prix, variation_pct=variation, pnl_latent=pnl, raison=raison)
+    
+    def close(self, ids, prix, raison='Clôture manuelle', fermee_le=None):
+        """Clôture des positions ouvertes aux prix donnés"""
+        ids = np.atleast_1d(ids).astype(np.int64)
+        prix = np.broadcast_to(np.asarray(prix, dtype=np.float64), ids.shape)
+        raisons = np.broadcast_to(np.asarray(raison, dtype=object), ids.shape)
+        # Positions déjà clôturées ailleurs (autre session, autre processus) ou sans prix : ignorées
+        positions = self.open_positions().set_index('id').reindex(ids)
+        keep = positions['prix_entree'].notna().to_numpy() & ~np.isnan(prix)
+        ids, prix, raisons, positions = ids[keep], prix[keep], raisons[keep], positions[keep]
+        if not len(ids):
+            return 0
+        _, pnl = position_pnl(positions['sens'].to_numpy(), positions['prix_entree'].to_numpy(), prix,
+                              positions['montant'].to_numpy(), positions['levier'].to_numpy())
+        fermee_le = (fermee_le or datetime.now()).isoformat(timespec='seconds')
+        with self.lock, self.connection:
+            # statut = ouverte : une position clôturée entre-temps par un autre processus n'est pas réécrite
+            cursor = self.connection.executemany(
+                'UPDATE positions SET statut = ?, prix_sortie = ?, fermee_le = ?, pnl = ?, raison = ? '
+                'WHERE id = ? AND statut = ?',
+                zip([POSITION_CLOSED] * len(ids), prix.tolist(), [fermee_le] * len(ids),
+                    pnl.tolist(), raisons.tolist(), ids.tolist(), [POSITION_OPEN] * len(ids))
+            )
+            self.open_cache = None
+        return cursor.rowcount
+    
+    def settle(self, snapshot):
+        """Valorise les positions ouvertes et clôture celles qui ont atteint leur stop ou leur objectif"""
+        valued = self.mark_to_market(snapshot)
+        hit = valued[valued['raison'].notna()]
+        if len(hit):
+            self.close(hit['id'].to_numpy(), hit['prix'].to_numpy(), hit['raison'].to_numpy())
+            valued = valued[valued['raison'].isna()]
+        return valued
+    
+    def history(self, limit=50):
+        """Dernières positions clôturées"""
+        return self.query(
+            'SELECT id, symbole, sens, montant, levier, prix_entree, prix_sortie, ouverte_le, fermee_le, pnl, raison '
+            'FROM positions WHERE statut = ? ORDER BY fermee_le DESC, id DESC LIMIT ?', (POSITION_CLOSED, limit)
+        )
+    
+    def statistics(self):
+        """Nombre de trades, taux de réussite et P&L des positions clôturées (agrégats SQL)"""
+        stats = self.query(
+            'SELECT COUNT(*) AS trades, COALESCE(SUM(pnl > 0), 0) AS gagnants, '
+            'COALESCE(SUM(pnl), 0.0) AS pnl_total, AVG(pnl) AS pnl_moyen '
+            'FROM positions WHERE statut = ?', (POSITION_CLOSED,)
+        ).iloc[0]
+        stats['taux_reussite'] = stats['gagnants'] / stats['trades'] * 100 if stats['trades'] else 0.0
+        return stats
+    
+    def statistics_by_pair(self):
+        """Agrégats des positions clôturées par paire"""
+        return self.query(
+            'SELECT symbole, COUNT(*) AS trades, 100.0 * SUM(pnl > 0) / COUNT(*) AS taux_reussite, '
+            'SUM(pnl) AS pnl_total FROM positions WHERE statut = ? GROUP BY symbole ORDER BY pnl_total DESC',
+            (POSITION_CLOSED,)
+        )
+    
+    def close_connection(self):
+        """Ferme la connexion à la base"""
+        with self.lock:
+            self.connection.close()
+
+# Risque de portefeuille : fenêtre des rendements historiques (jours), niveaux de confiance
+# et nombre de scénarios Monte Carlo (horizon d'un jour)
+RISK_WINDOW = 500
+RISK_CONFIDENCE = (0.95, 0.975, 0.99)
+RISK_PATHS = 10_000
+RISK_METHODS = ('parametrique', 'historique', 'monte_carlo')
+
+def tail_risk(pnl, confidence):
+    """VaR et ES (pertes positives) de scénarios de P&L, pour plusieurs niveaux de confiance"""
+    losses = np.sort(-np.asarray(pnl, dtype=np.float64))[::-1]
+    # ES : moyenne des k plus fortes pertes (somme cumulée des pertes triées)
+    k = np.maximum(np.ceil((1 - np.asarray(confidence)) * len(losses)).astype(int), 1)
+    return losses[k - 1], np.cumsum(losses)[k - 1] / k
+
+class PortfolioRisk:
+    """VaR et Expected Shortfall à un jour des positions ouvertes : paramétrique, historique et Monte Carlo.
+    
+    Les positions sont réduites à un vecteur d'exposition ($ par paire) ; chaque méthode est
+    alors un produit matrice-vecteur. Rendements centrés, covariance et tirages Monte Carlo
+    sont préparés une fois par version de l'historique.
+    """
+    
+    def __init__(self, price_store, rng, window=RISK_WINDOW, confidence=RISK_CONFIDENCE, n_paths=RISK_PATHS):
+        self.price_store = price_store
+        self.index = {symbole: i for i, symbole in enumerate(price_store.symboles)}
+        self.rng = rng
+        self.window = window
+        self.confidence = tuple(confidence)
+        self.n_paths = n_paths
+        self.version = None
+    
+    def prepare(self, version=None):
+        """Rendements de la fenêtre, covariance et chocs Monte Carlo de la version de l'historique"""
+        if version is not None and version == self.version:
+            return
+        prix = np.asarray(self.price_store.prix[-(self.window + 1):], dtype=np.float64)
+        self.returns = prix[1:] / prix[:-1] - 1
+        self.mean = self.returns.mean(axis=0)
+        # Facteur de la covariance (Σ = Fᵀ F) : la matrice paires × paires n'est jamais formée, et
+        # des chocs gaussiens sur les jours de la fenêtre (chemins × jours) ont la covariance Σ
+        self.factor = (self.returns - self.mean) / np.sqrt(len(self.returns) - 1)
+        self.shocks = self.rng.standard_normal((self.n_paths, len(self.returns)), dtype=np.float32)
+        self.version = version
+    
+    def exposure(self, positions):
+        """Exposition en $ de chaque paire : variation du P&L pour un rendement de 100 % (au premier ordre).
+        Les positions hors de l'univers ou sans prix courant n'entrent pas dans le calcul"""
+        sensitivity = (positions['sens'] * positions['montant'] * positions['levier']
+                       * positions['prix'] / positions['prix_entree']).to_numpy(dtype=np.float64)
+        pair_index = positions['symbole'].map(self.index).to_numpy(dtype=np.float64, na_value=np.nan)
+        known = ~np.isnan(pair_index) & ~np.isnan(sensitivity)
+        return np.bincount(pair_index[known].astype(np.int64), weights=sensitivity[known],
+                           minlength=len(self.index))
+    
+    def unpriced(self, positions):
+        """Positions exclues du calcul de risque (paire hors de l'univers ou sans prix courant)"""
+        return positions[~positions['symbole'].isin(self.index) | positions['prix'].isna()]
+    
+    def evaluate(self, positions):
+        """VaR et ES (en $, pertes positives) par méthode et niveau de confiance"""
+        exposure = self.exposure(positions)
+        mean = self.mean @ exposure
+        loadings = self.factor @ exposure
+        
+        # Écart-type du P&L : √(eᵀ Σ e) = ‖F e‖
+        sigma = np.linalg.norm(loadings)
+        z = np.array([NormalDist().inv_cdf(c) for c in self.confidence])
+        density = np.array([NormalDist().pdf(value) for value in z])
+        parametric = (sigma * z - mean, sigma * density / (1 - np.array(self.confidence)) - mean)
+        
+        historical = tail_risk(self.returns @ exposure, self.confidence)
+        
+        monte_carlo = tail_risk(self.shocks @ loadings.astype(np.float32) + mean, self.confidence)
+        
+        return pd.DataFrame({
+            'methode': np.repeat(RISK_METHODS, len(self.confidence)),
+            'confiance': np.tile(self.confidence, len(RISK_METHODS)),
+            'var': np.concatenate([parametric[0], historical[0], monte_carlo[0]]),
+            'es': np.concatenate([parametric[1], historical[1], monte_carlo[1]])
+        })
+
+# Cadence des ticks simulés et plafond de rattrapage entre deux lectures
+TICKS_PER_SECOND = 1.0
+MAX_CATCHUP_TICKS = 3600
+# Écart-type (log) de la variation de volume à chaque tick
+VOLUME_TICK_SIGMA = 0.002
+# Profondeur de l'historique intraday des ticks (heures) et nombre de points des sparklines
+TICK_HISTORY_HOURS = 2.0
+SPARKLINE_POINTS = 60
+
+class TickRing:
+    """Historique intraday des ticks : tampon circulaire (instants × paires) de taille fixe.
+    
+    Chaque ligne est écrite deux fois (positions i et i + capacité) : toute fenêtre des
+    dernières lignes est une tranche contiguë, donc une vue sans copie.
+    """
+    
+    def __init__(self, n_paires, capacity):
+        self.capacity = capacity
+        self.times = np.full(2 * capacity, np.nan)
+        self.prix = np.full((2 * capacity, n_paires), np.nan, dtype=np.float32)
+        self.pos = 0
+        self.count = 0
+        # Extrêmes de la séance (jour calendaire local), tenus à jour à chaque ajout
+        self.haut = np.full(n_paires, -np.inf)
+        self.bas = np.full(n_paires, np.inf)
+        self.seance = None
+    
+    def append(self, timestamp, prix):
+        """Ajoute une ligne (O(1)) en écrasant la plus ancienne une fois le tampon plein"""
+        i = self.pos
+        self.times[i] = self.times[i + self.capacity] = timestamp
+        self.prix[i] = prix
+        self.prix[i + self.capacity] = prix
+        self.pos = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        seance = datetime.fromtimestamp(timestamp).date()
+        if seance != self.seance:
+            self.seance = seance
+            self.haut.fill(-np.inf)
+            self.bas.fill(np.inf)
+        np.maximum(self.haut, prix, out=self.haut)
+        np.minimum(self.bas, prix, out=self.bas)
+    
+    def window(self, seconds=None, step=1):
+        """Vue (instants, prix) sur les dernières lignes, éventuellement limitée aux `seconds`
+        dernières secondes et espacée de `step` lignes"""
+        end = self.pos + self.capacity
+        start = end - self.count
+        if seconds is not None and self.count:
+            start += self.times[start:end].searchsorted(self.times[end - 1] - seconds, side='left')
+        # Le pas part de la ligne la plus récente pour qu'elle figure toujours dans la fenêtre
+        start += (end - 1 - start) % step
+        return self.times[start:end:step], self.prix[start:end:step]
+    
+    def sparkline(self, points=SPARKLINE_POINTS, seconds=None):
+        """Vue d'au plus `points` lignes régulièrement espacées sur la fenêtre"""
+        _, prix = self.window(seconds)
+        return self.window(seconds, step=max(-(-len(prix) // points), 1))[1]
+
+class TickEngine:
+    """Moteur de ticks vectorisé : toutes les paires avancent en une seule opération par tick"""
+    
+    def __init__(self, current_data, rng, tick_probability=0.6, ticks_per_day=86400):
+        self.rng = rng
+        self.tick_probability = tick_probability
+        self.columns = list(current_data.columns)
+        self.static = current_data.drop(columns=['prix', 'change_pct', 'volume_journalier'])
+        self.prix = current_data['prix'].to_numpy(dtype=np.float64, copy=True)
+        self.ouverture = self.prix / (1 + current_data['change_pct'].to_numpy(dtype=np.float64) / 100)
+        self.volume = current_data['volume_journalier'].to_numpy(dtype=np.float64, copy=True)
+        # Écart-type par tick (en fraction) déduit de la volatilité journalière de chaque paire
+        self.sigma = current_data['volatilite'].to_numpy(dtype=np.float64) / 100 / np.sqrt(ticks_per_day)
+        self.tick_count = 0
+        self.last_update = time.monotonic()
+        self.lock = threading.Lock()
+        # Une ligne par avancée des ticks (une par seconde avec le producteur temps réel)
+        self.history = TickRing(len(self.prix), int(TICK_HISTORY_HOURS * 3600 * TICKS_PER_SECOND))
+        self.history.append(time.time(), self.prix)
+    
+    def tick(self, n_ticks=1):
+        """Avance toutes les paires de n_ticks en une seule opération vectorisée"""
+        if n_ticks <= 0:
+            return
+        n_paires = len(self.prix)
+        # Nombre de ticks effectifs par paire ; la somme de k chocs gaussiens
+        # indépendants suit une loi normale de variance k·σ²
+        moved = self.rng.binomial(n_ticks, self.tick_probability, size=n_paires)
+        scale = np.sqrt(moved)
+        log_returns = self.rng.standard_normal(n_paires) * self.sigma * scale
+        log_volume = self.rng.standard_normal(n_paires) * VOLUME_TICK_SIGMA * scale
+        
+        now = time.time()
+        with self.lock:
+            # Nouvelle séance (même frontière que les extrêmes de TickRing) : les variations
+            # repartent du dernier prix de la séance précédente
+            if datetime.fromtimestamp(now).date() != self.history.seance:
+                self.ouverture = self.prix.copy()
+            self.prix *= np.exp(log_returns)
+            self.volume *= np.exp(log_volume)
+            self.tick_count += n_ticks
+            self.history.append(now, self.prix)
+    
+    def advance(self, now=None):
+        """Rattrape les ticks écoulés depuis la dernière mise à jour"""
+        now = time.monotonic() if now is None else now
+        n_ticks = int((now - self.last_update) * TICKS_PER_SECOND)
+        if n_ticks <= 0:
+            return 0
+        if n_ticks > MAX_CATCHUP_TICKS:
+            n_ticks = MAX_CATCHUP_TICKS
+            self.last_update = now
+        else:
+            self.last_update += n_ticks / TICKS_PER_SECOND
+        self.tick(n_ticks)
+        return n_ticks
+    
+    def snapshot(self):
+        """Retourne une copie cohérente des données courantes (même format que current_data)"""
+        with self.lock:
+            prix = self.prix.copy()
+            volume = self.volume.copy()
+            ouverture = self.ouverture
+        snapshot = self.static.assign(
+            prix=prix,
+            change_pct=(prix / ouverture - 1) * 100,
+            volume_journalier=volume
+        )
+        return snapshot[self.columns]
+
+# Période de publication du producteur temps réel (secondes)
+LIVE_FEED_INTERVAL = 1.0
+
+class LiveFeed(threading.Thread):
+    """Producteur en arrière-plan : fait avancer les ticks et publie des instantanés immuables"""
+    
+    def __init__(self, tick_engine, interval=LIVE_FEED_INTERVAL):
+        super().__init__(name='forex-live-feed', daemon=True)
+        self.tick_engine = tick_engine
+        self.interval = interval
+        self.stop_event = threading.Event()
+        # Publication par remplacement de référence : les lecteurs ne voient jamais
+        # un instantané partiellement mis à jour
+        self.snapshot = tick_engine.snapshot()
+        self.version = 0
+        # Santé du producteur : dernière erreur (None si le dernier tick a réussi) et heure du dernier succès
+        self.error = None
+        self.last_success = datetime.now()
+    
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            # Une erreur ponctuelle ne doit pas figer les prix de toutes les sessions : on journalise
+            # et on réessaie au tick suivant
+            try:
+                self.tick_engine.advance()
+                self.snapshot = self.tick_engine.snapshot()
+            except Exception as error:
+                logger.exception("Échec d'un tick du flux temps réel")
+                self.error = error
+                continue
+            self.version += 1
+            self.error = None
+            self.last_success = datetime.now()
+    
+    def stop(self):
+        """Arrête le producteur"""
+        self.stop_event.set()
+
+# Compteur des historiques chargés dans le processus (voir MarketState.history_version)
+HISTORY_VERSIONS = itertools.count(1)
+
+class MarketState:
+    def __init__(self, seed=None, source=None, cache_dir=MARKET_CACHE_DIR, currencies=None, snapshot=True,
+                 tick_engine=None):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.source = source
+        self.cache_dir = cache_dir
+        self.source_name = 'synthétique'
+        self.created_at = datetime.now()
+        self.currencies = currencies if currencies is not None else self.define_currencies()
+        self.history_snapshot = None
+        self.history_dates, self.history_matrices = self.load_history(snapshot)
+        # Métadonnées des paires (une ligne par paire), jointes à la demande à l'historique
+        self.currency_table = self.initialize_currency_table()
+        # Les prix restent projetés depuis l'instantané (pas de copie dans le tas)
+        self.price_store = PriceStore(self.history_dates, self.currencies, self.history_matrices['prix'])
+        self.ohlc = OHLCPyramid.from_history(self.history_dates, self.currencies,
+                                             self.price_store.prix, self.history_matrices['volume'])
+        self.indicators = IndicatorEngine.from_history(self.price_store.symboles, self.price_store.prix)
+        self.correlations = CorrelationEngine.from_history(self.price_store.symboles, self.price_store.prix)
+        self.cross_rates = CrossRateEngine(self.price_store.symboles)
+        # Ajusté à la première demande (quelques secondes pour les grands univers)
+        self.volatility = VolatilityEngine(self.price_store.symboles)
+        # Un moteur de ticks repris d'un état précédent (même univers) conserve les prix,
+        # l'historique intraday et les extrêmes de la séance au-delà de la reconstruction
+        if tick_engine is not None and tick_engine.static['symbole'].tolist() == self.price_store.symboles:
+            self.tick_engine = tick_engine
+            self.current_data = tick_engine.snapshot()
+        else:
+            self.current_data = self.initialize_current_data()
+            self.tick_engine = TickEngine(self.current_data, self.rng)
+        self.live_feed = None
+        self.signal_engine = SignalEngine()
+        self.backtester = Backtester(self.price_store)
+        # Générateur dédié : le flux temps réel tire dans self.rng depuis un autre thread
+        self.monte_carlo = MonteCarloPreview(self.price_store, self.currencies, self.rng.spawn(1)[0])
+        self.risk = PortfolioRisk(self.price_store, self.rng.spawn(1)[0])
+        # Identifie l'historique chargé (clé des caches des moteurs) : unique dans le processus,
+        # elle change à chaque chargement, y compris d'un état reconstruit qui reprend le moteur de ticks
+        self.history_version = next(HISTORY_VERSIONS)
+        self.basket_indices = BasketIndexEngine(self.cross_rates, self.price_store.prix[0],
+                                                self.tick_engine.ouverture, seance=self.tick_engine.history.seance)
+        
+    def define_currencies(self):
+        """Définit les 40 principales paires de devises avec leurs caractéristiques"""
+        return {
+            # Paires Majeures (contre USD)
+            'EUR/USD': {
+                'nom': 'Euro / Dollar Américain',
+                'symbole': 'EUR/USD',
+                'icone': '🇪🇺🇺🇸',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 1.0850,
+                'volatilite': 1.2,
+                'volume_journalier': 750.0,  # milliards USD
+                'pays': ['Zone Euro', 'États-Unis'],
+                'banque_centrale': ['BCE', 'Fed'],
+                'description': 'La paire de devises la plus échangée au monde'
+            },
+            'GBP/USD': {
+                'nom': 'Livre Sterling / Dollar Américain',
+                'symbole': 'GBP/USD',
+                'icone': '🇬🇧🇺🇸',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 1.2750,
+                'volatilite': 1.5,
+                'volume_journalier': 350.0,
+                'pays': ['Royaume-Uni', 'États-Unis'],
+                'banque_centrale': ['BoE', 'Fed'],
+                'description': 'Aussi connue sous le nom de "Cable"'
+            },
+            'USD/JPY': {
+                'nom': 'Dollar Américain / Yen Japonais',
+                'symbole': 'USD/JPY',
+                'icone': '🇺🇸🇯🇵',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 155.50,
+                'volatilite': 1.3,
+                'volume_journalier': 550.0,
+                'pays': ['États-Unis', 'Japon'],
+                'banque_centrale': ['Fed', 'BoJ'],
+                'description': 'La troisième paire la plus échangée'
+            },
+            'USD/CHF': {
+                'nom': 'Dollar Américain / Franc Suisse',
+                'symbole': 'USD/CHF',
+                'icone': '🇺🇸🇨🇭',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 0.9050,
+                'volatilite': 1.4,
+                'volume_journalier': 250.0,
+                'pays': ['États-Unis', 'Suisse'],
+                'banque_centrale': ['Fed', 'SNB'],
+                'description': 'Considérée comme une valeur refuge'
+            },
+            'AUD/USD': {
+                'nom': 'Dollar Australien / Dollar Américain',
+                'symbole': 'AUD/USD',
+                'icone': '🇦🇺🇺🇸',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 0.6650,
+                'volatilite': 1.6,
+                'volume_journalier': 200.0,
+                'pays': ['Australie', 'États-Unis'],
+                'banque_centrale': ['RBA', 'Fed'],
+                'description': 'Influencée par les prix des matières premières'
+            },
+            'USD/CAD': {
+                'nom': 'Dollar Américain / Dollar Canadien',
+                'symbole': 'USD/CAD',
+                'icone': '🇺🇸🇨🇦',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 1.3650,
+                'volatilite': 1.4,
+                'volume_journalier': 180.0,
+                'pays': ['États-Unis', 'Canada'],
+                'banque_centrale': ['Fed', 'BoC'],
+                'description': 'Influencée par les prix du pétrole'
+            },
+            'NZD/USD': {
+                'nom': 'Dollar Néo-Zélandais / Dollar Américain',
+                'symbole': 'NZD/USD',
+                'icone': '🇳🇿🇺🇸',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 0.6150,
+                'volatilite': 1.7,
+                'volume_journalier': 80.0,
+                'pays': ['Nouvelle-Zélande', 'États-Unis'],
+                'banque_centrale': ['RBNZ', 'Fed'],
+                'description': 'Souvent appelée "Kiwi"'
+            },
+            
+            # Paires Croisées Majeures
+            'EUR/GBP': {
+                'nom': 'Euro / Livre Sterling',
+                'symbole': 'EUR/GBP',
+                'icone': '🇪🇺🇬🇧',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 0.8520,
+                'volatilite': 1.3,
+                'volume_journalier': 100.0,
+                'pays': ['Zone Euro', 'Royaume-Uni'],
+                'banque_centrale': ['BCE', 'BoE'],
+                'description': 'Paire croisée importante'
+            },
+            'EUR/JPY': {
+                'nom': 'Euro / Yen Japonais',
+                'symbole': 'EUR/JPY',
+                'icone': '🇪🇺🇯🇵',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 168.50,
+                'volatilite': 1.5,
+                'volume_journalier': 120.0,
+                'pays': ['Zone Euro', 'Japon'],
+                'banque_centrale': ['BCE', 'BoJ'],
+                'description': 'Très liquide'
+            },
+            'GBP/JPY': {
+                'nom': 'Livre Sterling / Yen Japonais',
+                'symbole': 'GBP/JPY',
+                'icone': '🇬🇧🇯🇵',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 197.50,
+                'volatilite': 1.8,
+                'volume_journalier': 90.0,
+                'pays': ['Royaume-Uni', 'Japon'],
+                'banque_centrale': ['BoE', 'BoJ'],
+                'description': 'Connue pour sa volatilité'
+            },
+            'EUR/CHF': {
+                'nom': 'Euro / Franc Suisse',
+                'symbole': 'EUR/CHF',
+                'icone': '🇪🇺🇨🇭',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 0.9820,
+                'volatilite': 1.2,
+                'volume_journalier': 60.0,
+                'pays': ['Zone Euro', 'Suisse'],
+                'banque_centrale': ['BCE', 'SNB'],
+                'description': 'Considérée comme stable'
+            },
+            'EUR/AUD': {
+                'nom': 'Euro / Dollar Australien',
+                'symbole': 'EUR/AUD',
+                'icone': '🇪🇺🇦🇺',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 1.6320,
+                'volatilite': 1.6,
+                'volume_journalier': 50.0,
+                'pays': ['Zone Euro', 'Australie'],
+                'banque_centrale': ['BCE', 'RBA'],
+                'description': 'Influencée par les matières premières'
+            },
+            'EUR/CAD': {
+                'nom': 'Euro / Dollar Canadien',
+                'symbole': 'EUR/CAD',
+                'icone': '🇪🇺🇨🇦',
+                'categorie': 'Majeures',
+                'unite': 'taux de change',
+                'prix_base': 1.4820,
+                'volatilite': 1.5,
+                'volume_journalier': 45.0,
+                'pays': ['Zone Euro', 'Canada'],
+                'banque_centrale': ['BCE', 'BoC'],
+                'description': 'Paire croisée importante'
+            },
+            
+            # Paires Mineures
+            'USD/SEK': {
+                'nom': 'Dollar Américain / Couronne Suédoise',
+                'symbole': 'USD/SEK',
+                'icone': '🇺🇸🇸🇪',
+                'categorie': 'Mineures',
+                'unite': 'taux de change',
+                'prix_base': 10.7500,
+                'volatilite': 1.8,
+                'volume_journalier': 40.0,
+                'pays': ['États-Unis', 'Suède'],
+                'banque_centrale': ['Fed', 'Riksbank'],
+                'description': 'Paire nordique'
+            },
+            'USD/NOK': {
+                'nom': 'Dollar Américain / Couronne Norvégienne',
+                'symbole': 'USD/NOK',
+                'icone': '🇺🇸🇳🇴',
+                'categorie': 'Mineures',
+                'unite': 'taux de change',
+                'prix_base': 10.5500,
+                'volatilite': 1.9,
+                'volume_journalier': 35.0,
+                'pays': ['États-Unis', 'Norvège'],
+                'banque_centrale': ['Fed', 'Norges Bank'],
+                'description': 'Influencée par les prix du pétrole'
+            },
+            'USD/DKK': {
+                'nom': 'Dollar Américain / Couronne Danoise',
+                'symbole': 'USD/DKK',
+                'icone': '🇺🇸🇩🇰',
+                'categorie': 'Mineures',
+                'unite': 'taux de change',
+                'prix_base': 6.8800,
+                'volatilite': 1.4,
+                'volume_journalier': 30.0,
+                'pays': ['États-Unis', 'Danemark'],
+                'banque_centrale': ['Fed', 'Danmarks Nationalbank'],
+                'description': 'Liée à l\'EUR via l\'ERM II'
+            },
+            'USD/PLN': {
+                'nom': 'Dollar Américain / Zloty Polonais',
+                'symbole': 'USD/PLN',
+                'icone': '🇺🇸🇵🇱',
+                'categorie': 'Mineures',
+                'unite': 'taux de change',
+                'prix_base': 3.9500,
+                'volatilite': 2.0,
+                'volume_journalier': 25.0,
+                'pays': ['États-Unis', 'Pologne'],
+                'banque_centrale': ['Fed', 'NBP'],
+                'description': 'Paire d\'Europe de l\'Est'
+            },
+            'USD/CZK': {
+                'nom': 'Dollar Américain / Couronne Tchèque',
+                'symbole': 'USD/CZK',
+                'icone': '🇺🇸🇨🇿',
+                'categorie': 'Mineures',
+                'unite': 'taux de change',
+                'prix_base': 23.2500,
+                'volatilite': 1.7,
+                'volume_journalier': 20.0,
+                'pays': ['États-Unis', 'République Tchèque'],
+                'banque_centrale': ['Fed', 'ČNB'],
+                'description': 'Paire d\'Europe centrale'
+            },
+            'USD/HUF': {
+                'nom': 'Dollar Américain / Forint Hongrois',
+                'symbole': 'USD/HUF',
+                'icone': '🇺🇸🇭🇺',
+                'categorie': 'Mineures',
+                'unite': 'taux de change',
+                'prix_base': 355.50,
+                'volatilite': 2.1,
+                'volume_journalier': 18.0,
+                'pays': ['États-Unis', 'Hongrie'],
+                'banque_centrale': ['Fed', 'MNB'],
+                'description': 'Paire d\'Europe de l\'Est'
+            },
+            'USD/SGD': {
+                'nom': 'Dollar Américain / Dollar de Singapour',
+                'symbole': 'USD/SGD',
+                'icone': '🇺🇸🇸🇬',
+                'categorie': 'Mineures',
+                'unite': 'taux de change',
+                'prix_base': 1.3450,
+                'volatilite': 1.3,
+                'volume_journalier': 45.0,
+                'pays': ['États-Unis', 'Singapour'],
+                'banque_centrale': ['Fed', 'MAS'],
+                'description': 'Paire asiatique importante'
+            },
+            'USD/HKD': {
+                'nom': 'Dollar Américain / Dollar de Hong Kong',
+                'symbole': 'USD/HKD',
+                'icone': '🇺🇸🇭🇰',
+                'categorie': 'Mineures',
+                'unite': 'taux de change',
+                'prix_base': 7.8250,
+                'volatilite': 0.3,
+                'volume_journalier': 60.0,
+                'pays': ['États-Unis', 'Hong Kong'],
+                'banque_centrale': ['Fed', 'HKMA'],
+                'description': 'Paire à taux fixe'
+            },
+            'USD/ZAR': {
+                'nom': 'Dollar Américain / Rand Sud-Africain',
+                'symbole': 'USD/ZAR',
+                'icone': '🇺🇸🇿🇦',
+                'categorie': 'Mineures',
+                'unite': 'taux de change',
+                'prix_base': 18.8500,
+                'volatilite': 2.5,
+                'volume_journalier': 25.0,
+                'pays': ['États-Unis', 'Afrique du Sud'],
+                'banque_centrale': ['Fed', 'SARB'],
+                'description': 'Paire de matières premières'
+            },
+            'USD/MXN': {
+                'nom': 'Dollar Américain / Peso Mexicain',
+                'symbole': 'USD/MXN',
+                'icone': '🇺🇸🇲🇽',
+                'categorie': 'Mineures',
+                'unite': 'taux de change',
+                'prix_base': 16.8500,
+                'volatilite': 2.2,
+                'volume_journalier': 30.0,
+                'pays': ['États-Unis', 'Mexique'],
+                'banque_centrale': ['Fed', 'Banxico'],
+                'description': 'Paire d\'Amérique latine'
+            },
+            
+            # Paires Exotiques
+            'USD/TRY': {
+                'nom': 'Dollar Américain / Livre Turque',
+                'symbole': 'USD/TRY',
+                'icone': '🇺🇸🇹🇷',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 32.2500,
+                'volatilite': 3.5,
+                'volume_journalier': 15.0,
+                'pays': ['États-Unis', 'Turquie'],
+                'banque_centrale': ['Fed', 'CBRT'],
+                'description': 'Paire très volatile'
+            },
+            'USD/THB': {
+                'nom': 'Dollar Américain / Baht Thaïlandais',
+                'symbole': 'USD/THB',
+                'icone': '🇺🇸🇹🇭',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 36.5500,
+                'volatilite': 1.8,
+                'volume_journalier': 12.0,
+                'pays': ['États-Unis', 'Thaïlande'],
+                'banque_centrale': ['Fed', 'BOT'],
+                'description': 'Paire d\'Asie du Sud-Est'
+            },
+            'USD/IDR': {
+                'nom': 'Dollar Américain / Rupiah Indonésien',
+                'symbole': 'USD/IDR',
+                'icone': '🇺🇸🇮🇩',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 15850.0,
+                'volatilite': 2.0,
+                'volume_journalier': 10.0,
+                'pays': ['États-Unis', 'Indonésie'],
+                'banque_centrale': ['Fed', 'BI'],
+                'description': 'Paire d\'Asie du Sud-Est'
+            },
+            'USD/INR': {
+                'nom': 'Dollar Américain / Roupie Indienne',
+                'symbole': 'USD/INR',
+                'icone': '🇺🇸🇮🇳',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 83.2500,
+                'volatilite': 1.5,
+                'volume_journalier': 20.0,
+                'pays': ['États-Unis', 'Inde'],
+                'banque_centrale': ['Fed', 'RBI'],
+                'description': 'Paire asiatique importante'
+            },
+            'USD/CNY': {
+                'nom': 'Dollar Américain / Yuan Chinois',
+                'symbole': 'USD/CNY',
+                'icone': '🇺🇸🇨🇳',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 7.2450,
+                'volatilite': 1.4,
+                'volume_journalier': 40.0,
+                'pays': ['États-Unis', 'Chine'],
+                'banque_centrale': ['Fed', 'PBoC'],
+                'description': 'Paire gérée par la Chine'
+            },
+            'USD/KRW': {
+                'nom': 'Dollar Américain / Won Sud-Coréen',
+                'symbole': 'USD/KRW',
+                'icone': '🇺🇸🇰🇷',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 1325.50,
+                'volatilite': 1.6,
+                'volume_journalier': 15.0,
+                'pays': ['États-Unis', 'Corée du Sud'],
+                'banque_centrale': ['Fed', 'BoK'],
+                'description': 'Paire asiatique importante'
+            },
+            'USD/BRL': {
+                'nom': 'Dollar Américain / Real Brésilien',
+                'symbole': 'USD/BRL',
+                'icone': '🇺🇸🇧🇷',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 5.2500,
+                'volatilite': 2.8,
+                'volume_journalier': 18.0,
+                'pays': ['États-Unis', 'Brésil'],
+                'banque_centrale': ['Fed', 'BCB'],
+                'description': 'Paire d\'Amérique du Sud'
+            },
+            'USD/RUB': {
+                'nom': 'Dollar Américain / Rouble Russe',
+                'symbole': 'USD/RUB',
+                'icone': '🇺🇸🇷🇺',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 91.2500,
+                'volatilite': 3.2,
+                'volume_journalier': 12.0,
+                'pays': ['États-Unis', 'Russie'],
+                'banque_centrale': ['Fed', 'CBR'],
+                'description': 'Paire très volatile'
+            },
+            'USD/CLP': {
+                'nom': 'Dollar Américain / Peso Chilien',
+                'symbole': 'USD/CLP',
+                'icone': '🇺🇸🇨🇱',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 925.50,
+                'volatilite': 2.0,
+                'volume_journalier': 8.0,
+                'pays': ['États-Unis', 'Chili'],
+                'banque_centrale': ['Fed', 'BCCh'],
+                'description': 'Paire d\'Amérique du Sud'
+            },
+            'USD/COP': {
+                'nom': 'Dollar Américain / Peso Colombien',
+                'symbole': 'USD/COP',
+                'icone': '🇺🇸🇨🇴',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 3850.50,
+                'volatilite': 2.3,
+                'volume_journalier': 6.0,
+                'pays': ['États-Unis', 'Colombie'],
+                'banque_centrale': ['Fed', 'Banco de la República'],
+                'description': 'Paire d\'Amérique du Sud'
+            },
+            'USD/PHP': {
+                'nom': 'Dollar Américain / Peso Philippin',
+                'symbole': 'USD/PHP',
+                'icone': '🇺🇸🇵🇭',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 56.8500,
+                'volatilite': 1.7,
+                'volume_journalier': 8.0,
+                'pays': ['États-Unis', 'Philippines'],
+                'banque_centrale': ['Fed', 'BSP'],
+                'description': 'Paire d\'Asie du Sud-Est'
+            },
+            'USD/MYR': {
+                'nom': 'Dollar Américain / Ringgit Malaisien',
+                'symbole': 'USD/MYR',
+                'icone': '🇺🇸🇲🇾',
+                'categorie': 'Exotiques',
+                'unite': 'taux de change',
+                'prix_base': 4.6250,
+                'volatilite': 1.5,
+                'volume_journalier': 10.0,
+                'pays': ['États-Unis', 'Malaisie'],
+                'banque_centrale': ['Fed', 'BNM'],
+                'description': 'Paire d\'Asie du Sud-Est'
+            },
+            
+            # Cryptomonnaies
+            'BTC/USD': {
+                'nom': 'Bitcoin / Dollar Américain',
+                'symbole': 'BTC/USD',
+                'icone': '₿',
+                'categorie': 'Cryptomonnaies',
+                'unite': 'taux de change',
+                'prix_base': 65250.0,
+                'volatilite': 4.5,
+                'volume_journalier': 30.0,
+                'pays': ['Global', 'États-Unis'],
+                'banque_centrale': ['Décentralisé', 'Fed'],
+                'description': 'La cryptomonnaie la plus connue'
+            },
+            'ETH/USD': {
+                'nom': 'Ethereum / Dollar Américain',
+                'symbole': 'ETH/USD',
+                'icone': 'Ξ',
+                'categorie': 'Cryptomonnaies',
+                'unite': 'taux de change',
+                'prix_base': 3250.0,
+                'volatilite': 5.0,
+                'volume_journalier': 20.0,
+                'pays': ['Global', 'États-Unis'],
+                'banque_centrale': ['Décentralisé', 'Fed'],
+                'description': 'Deuxième cryptomonnaie par capitalisation'
+            }
+        }
+    
+    def load_history(self, snapshot=True):
+        """Charge les matrices d'historique (dates × paires), depuis l'instantané disque si possible"""
+        end = pd.Timestamp(datetime.now()).normalize()
+        # Flux aléatoire dédié : la suite des tirages ne dépend pas de la présence d'un instantané
+        history_rng = self.rng.spawn(1)[0]
+        
+        def real_history():
+            return load_historical_matrices(
+                self.currencies, HistoryCache(self.source, self.cache_dir), '2020-01-01'
+            )
+        
+        def synthetic_history():
+            dates = pd.date_range('2020-01-01', end, freq='D')
+            return dates, list(self.currencies), generate_historical_matrices(self.currencies, dates, history_rng)
+        
+        def cached(build, source=None):
+            if not snapshot:
+                return build()
+            history_snapshot = HistorySnapshot.for_universe(self.cache_dir, self.currencies, self.seed, end, source)
+            dates, symboles, matrices = history_snapshot.load_or_build(build)
+            if matrices is not None:
+                self.history_snapshot = history_snapshot
+            return dates, symboles, matrices
+        
+        dates, symboles, matrices = None, None, None
+        if self.source is not None:
+            dates, symboles, matrices = cached(real_history, self.source)
+        
+        if matrices is None:
+            # Pas de source réelle (ou source indisponible) : historique synthétique
+            dates, symboles, matrices = cached(synthetic_history)
+        else:
+            # Les paires sans historique disponible sont retirées de l'univers
+            self.currencies = {symbole: self.currencies[symbole] for symbole in symboles}
+            self.source_name = self.source.name
+        return dates, matrices
+    
+    def initialize_currency_table(self):
+        """Table de dimension des paires : nom, catégorie et caractéristiques, indexée par symbole"""
+        table = pd.DataFrame.from_dict(self.currencies, orient='index')
+        table.index.name = 'symbole'
+        table['categorie'] = table['categorie'].astype('category')
+        return table.drop(columns=['symbole'])
+    
+    @cached_property
+    def historical_data(self):
+        """Historique au format long, construit à la première lecture : les pages lisent les matrices
+        de l'instantané, partagées entre processus, et non cette copie dans le tas"""
+        return self.initialize_historical_data()
+    
+    def initialize_historical_data(self):
+        """Initialise les données historiques des devises"""
+        dates, matrices = self.history_dates, self.history_matrices
+        
+        # Passage au format long (une ligne par date et par paire) : symbole catégoriel (codes
+        # entiers), métadonnées dans currency_table, float32 pour des valeurs destinées à l'affichage
+        n_paires = len(self.currencies)
+        codes = np.tile(np.arange(n_paires, dtype=np.min_scalar_type(max(n_paires - 1, 0))), len(dates))
+        return pd.DataFrame({
+            'date': np.repeat(dates.values, n_paires),
+            'symbole': pd.Categorical.from_codes(codes, categories=list(self.currencies.keys())),
+            'prix': np.ravel(matrices['prix'], order='C').astype(np.float32),
+            'volume': np.ravel(matrices['volume'], order='C').astype(np.float32),
+            'volatilite_jour': np.ravel(matrices['volatilite_jour'], order='C').astype(np.float32)
+        })
+    
+    def with_metadata(self, frame, columns=('nom', 'categorie')):
+        """Joint les métadonnées des paires (currency_table) à un DataFrame comportant une colonne symbole"""
+        return frame.join(self.currency_table[list(columns)], on='symbole')
+    
+    def memory_usage(self):
+        """Mémoire (octets, memory_usage(deep=True)) de l'historique long et de la table des paires"""
+        return {
+            'historical_data': int(self.historical_data.memory_usage(deep=True).sum()),
+            'currency_table': int(self.currency_table.memory_usage(deep=True).sum())
+        }
+    
+    def initialize_current_data(self):
+        """Initialise les données courantes"""
+        current_data = []
+        # Dernières données historiques
+        last_prices = self.price_store.last()
+        for symbole, info in self.currencies.items():
+            
+            # Le temps réel repart du dernier cours connu (séance ouverte à ce cours) : pas de saut
+            # de prix à la reconstruction de l'état, les positions ouvertes ne sont pas clôturées à tort
+            current_data.append({
+                'symbole': symbole,
+                'nom': info['nom'],
+                'icone': info['icone'],
+                'categorie': info['categorie'],
+                'unite': info['unite'],
+                'prix': last_prices[symbole],
+                'change_pct': 0.0,
+                'volatilite': info['volatilite'],
+                'volume_journalier': info['volume_journalier'],
+                'pays': info['pays'],
+                'banque_centrale': info['banque_centrale'],
+                'spread': random.uniform(0.1, 2.0)
+            })
+        
+        return pd.DataFrame(current_data)
+    
+    def update_live_data(self):
+        """Met à jour les données en temps réel"""
+        self.tick_engine.advance()
+        self.current_data = self.tick_engine.snapshot()
+        return self.current_data
+    
+    def start_live_feed(self, interval=LIVE_FEED_INTERVAL):
+        """Confie la génération des ticks à un producteur en arrière-plan"""
+        if self.live_feed is None:
+            self.live_feed = LiveFeed(self.tick_engine, interval)
+            self.live_feed.start()
+    
+    def stop_live_feed(self):
+        """Arrête le producteur en arrière-plan"""
+        if self.live_feed is not None:
+            self.live_feed.stop()
+            # Le moteur de ticks peut être repris par un autre état : plus aucun tick après le retour
+            self.live_feed.join(timeout=2 * self.live_feed.interval)
+            self.live_feed = None
+    
+    def live_snapshot(self):
+        """Dernier instantané publié (lecture seule) ; sans producteur, avance les ticks à la demande"""
+        if self.live_feed is None:
+            return self.update_live_data()
+        return self.live_feed.snapshot
+    
+    @property
+    def data_version(self):
+        """Version des données (historique, ticks publiés) servant de clé de cache"""
+        live = self.live_feed.version if self.live_feed is not None else self.tick_engine.tick_count
+        return (self.history_version, live)
+    
+    def live_cross_rates(self):
+        """Moteur de taux croisés mis à jour sur le dernier instantané publié"""
+        snapshot = self.live_snapshot()
+        self.cross_rates.update(snapshot['prix'].to_numpy(), self.data_version)
+        return self.cross_rates
+    
+    def portfolio_risk(self, positions):
+        """VaR et ES à un jour de positions valorisées (mark_to_market du registre)"""
+        self.risk.prepare(self.history_version)
+        return self.risk.evaluate(positions)
+    
+    def volatility_model(self):
+        """Modèles de volatilité, réajustés seulement quand l'historique a changé"""
+        self.volatility.fit(self.price_store.prix, self.history_version)
+        return self.volatility
+    
+    def live_indices(self):
+        """Indices de devises mis à jour sur le dernier instantané publié"""
+        snapshot = self.live_snapshot()
+        with self.tick_engine.lock:
+            ouverture, seance = self.tick_engine.ouverture, self.tick_engine.history.seance
+        if seance != self.basket_indices.seance:
+            self.basket_indices.reopen(ouverture, seance)
+        self.basket_indices.update(snapshot['prix'].to_numpy(), self.data_version)
+        return self.basket_indices
+    
+    def intraday_indices(self, points=SPARKLINE_POINTS, seconds=None):
+        """Sparklines des indices (points × paniers) recalculées depuis l'historique des ticks"""
+        with self.tick_engine.lock:
+            prix = self.tick_engine.history.sparkline(points, seconds).copy()
+        return self.basket_indices.evaluate(prix)
+    
+    def intraday(self, points=SPARKLINE_POINTS, seconds=None):
+        """Extrêmes de la séance et sparklines (vue points × paires) issus de l'historique des ticks"""
+        history = self.tick_engine.history
+        # Copies prises sous le verrou : le producteur réécrit ces lignes pendant la lecture
+        with self.tick_engine.lock:
+            return {
+                'haut': history.haut.copy(),
+                'bas': history.bas.copy(),
+                'sparkline': history.sparkline(points, seconds).copy()
+            }
+    
+    def ohlc_bars(self, symboles, start=None, end=None, target_points=OHLC_TARGET_POINTS, level=None):
+        """Barres OHLC au niveau adapté à la période, barre en cours complétée par les derniers ticks"""
+        snapshot = self.live_snapshot()
+        self.ohlc.update(datetime.now(), snapshot['prix'].to_numpy())
+        if level is not None:
+            level = self.ohlc.get_level(level)
+        return self.ohlc.query(symboles, start, end, target_points, level)
+    
+    def signals(self):
+        """Signaux de trading de toutes les paires (historique + dernier prix publié)"""
+        snapshot = self.live_snapshot()
+        version = self.data_version
+        if self.signal_engine.cache_key == version:
+            return self.signal_engine.cache_value
+        prix = np.vstack([self.price_store.prix[-self.signal_engine.history_length:],
+                          snapshot['prix'].to_numpy()])
+        return self.signal_engine.evaluate(self.price_store.symboles, prix, version)
+    
+    def live_indicators(self):
+        """Indicateurs de toutes les paires au dernier prix publié"""
+        return self.indicators.peek(self.live_snapshot()['prix'].to_numpy())
+    
+    def calculate_rsi(self, prices, period=14):
+        """Calcule le RSI (Relative Strength Index)"""
+        delta = prices.diff()
+        gain = delta.where(delta > 0, 0)
+        loss = -delta.where(delta < 0, 0)
+        
+        # Lissage de Wilder (identique au moteur incrémental)
+        avg_gain = gain.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+        avg_loss = loss.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+        
+        rs = avg_gain / avg_loss
+        rsi = 100 - (100 / (1 + rs))
+        
+        return rsi
+    
+    def calculate_bollinger_bands(self, prices, period=20, std_dev=2):
+        """Calcule les bandes de Bollinger"""
+        sma = prices.rolling(window=period).mean()
+        std = prices.rolling(window=period).std()
+        
+        upper_band = sma + (std * std_dev)
+        lower_band = sma - (std * std_dev)
+        
+        return upper_band, lower_band
@@ -0,0 +1,28 @@
+# tests/conftest.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forex_core import MarketState, PriceStore, generate_historical_matrices
+
+@pytest.fixture(scope='session')
+def currencies():
+    """Univers réel du dashboard (37 paires)"""
+    return MarketState.define_currencies(None)
+
+@pytest.fixture(scope='session')
+def history(currencies):
+    """Historique synthétique reproductible : dates, symboles et matrices (dates × paires)"""
+    dates = pd.date_range('2021-01-01', '2023-12-31', freq='D')
+    matrices = generate_historical_matrices(currencies, dates, np.random.default_rng(42))
+    return dates, list(currencies), matrices
+
+@pytest.fixture(scope='session')
+def price_store(history):
+    dates, symboles, matrices = history
+    return PriceStore(dates, symboles, matrices['prix'])
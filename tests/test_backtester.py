@@ -0,0 +1,50 @@
+# tests/test_backtester.py
+import numpy as np
+import pytest
+
+from forex_core import Backtester
+
+def naive_backtest(returns, stop_loss, take_profit, leverage):
+    """Parcours barre à barre d'une paire : indice, motif et P&L de la première sortie"""
+    liquidation = 100.0 / leverage
+    stop = min(stop_loss, liquidation)
+    for i, variation in enumerate(returns):
+        if variation >= take_profit:
+            return i, 'Take Profit', variation * leverage
+        if variation <= -stop:
+            reason = 'Liquidation' if liquidation <= stop_loss else 'Stop Loss'
+            return i, reason, max(variation * leverage, -100.0)
+    return len(returns) - 1, 'Échéance', max(returns[-1] * leverage, -100.0)
+
+@pytest.mark.parametrize('direction, stop_loss, take_profit, leverage', [
+    (1, 2.0, 3.0, 1.0),
+    (-1, 1.0, 1.5, 5.0),
+    (1, 10.0, 20.0, 50.0),
+    (-1, 50.0, 50.0, 1.0),
+])
+def test_backtester_run_matches_naive_loop(price_store, direction, stop_loss, take_profit, leverage):
+    backtester = Backtester(price_store)
+    result = backtester.run('2022-03-01', 90, direction, stop_loss, take_profit, leverage)
+    _, symboles, _, returns = backtester.returns('2022-03-01', 90, direction)
+    assert result['symbole'].tolist() == symboles
+    for j, row in result.iterrows():
+        exit_index, reason, pnl_pct = naive_backtest(returns[:, j], stop_loss, take_profit, leverage)
+        assert (row['jours'], row['raison']) == (exit_index + 1, reason), row['symbole']
+        assert row['pnl_pct'] == pytest.approx(pnl_pct)
+        assert row['pnl'] == pytest.approx(10 * pnl_pct)
+
+def test_backtester_sweep_matches_run(price_store):
+    backtester = Backtester(price_store)
+    symboles = ['EUR/USD', 'USD/JPY', 'BTC/USD']
+    sweep = backtester.sweep('2021-06-01', 60, 1, [1.0, 3.0], [2.0, 5.0], [1.0, 20.0], symboles=symboles, workers=1)
+    assert len(sweep) == 3 * 2 * 2 * 2
+    for (stop_loss, take_profit, leverage), cells in sweep.groupby(['stop_loss', 'take_profit', 'levier']):
+        run = backtester.run('2021-06-01', 60, 1, stop_loss, take_profit, leverage, symboles=symboles)
+        assert cells['symbole'].tolist() == symboles
+        np.testing.assert_array_equal(cells['jours'], run['jours'])
+        np.testing.assert_array_equal(cells['raison'], run['raison'])
+        np.testing.assert_allclose(cells['pnl_pct'], run['pnl_pct'])
+
+def test_backtester_rejects_entry_on_last_bar(price_store):
+    with pytest.raises(ValueError):
+        Backtester(price_store).returns(price_store.dates[-1], 30)
@@ -0,0 +1,53 @@
+# tests/test_basket_indices.py
+import numpy as np
+import pytest
+
+from forex_core import BASKET_BASE_VALUE, BasketIndexEngine, CrossRateEngine
+from test_cross_rates import consistent_prices
+
+def test_basket_index_matches_weighted_geometric_mean(history):
+    _, symboles, matrices = history
+    cross_rates = CrossRateEngine(symboles)
+    reference = consistent_prices(CrossRateEngine(symboles), matrices['prix'][0])
+    ouverture = consistent_prices(CrossRateEngine(symboles), matrices['prix'][-2])
+    prix = consistent_prices(CrossRateEngine(symboles), matrices['prix'][-1])
+    engine = BasketIndexEngine(cross_rates, reference, ouverture)
+    cross_rates.update(prix)
+    engine.update(prix)
+    
+    # DXY : Π (USD/X)^w, poids renormalisés sur les devises de l'univers (SEK comprise)
+    weights = {'EUR': 0.576, 'JPY': 0.136, 'GBP': 0.119, 'CAD': 0.091, 'SEK': 0.042, 'CHF': 0.036}
+    
+    def dxy(prix):
+        rates = CrossRateEngine(symboles)
+        rates.update(prix)
+        return np.prod([rates.rate('USD', devise) ** w for devise, w in weights.items()]) ** (1 / sum(weights.values()))
+    
+    frame = engine.frame().set_index('indice')
+    assert frame.loc['Dollar Index (DXY)', 'devise'] == 'USD'
+    assert frame.loc['Dollar Index (DXY)', 'valeur'] == pytest.approx(
+        BASKET_BASE_VALUE * dxy(prix) / dxy(reference), rel=1e-10)
+    assert frame.loc['Dollar Index (DXY)', 'change_pct'] == pytest.approx(
+        (dxy(prix) / dxy(ouverture) - 1) * 100, rel=1e-8)
+    np.testing.assert_allclose(engine.evaluate(prix), engine.values, rtol=1e-12)
+    np.testing.assert_allclose(engine.evaluate(reference), BASKET_BASE_VALUE, rtol=1e-12)
+
+def test_basket_index_add_basket(history):
+    _, symboles, matrices = history
+    prix = matrices['prix'][-1]
+    cross_rates = CrossRateEngine(symboles)
+    engine = BasketIndexEngine(cross_rates, matrices['prix'][0], prix, baskets={})
+    assert engine.frame().empty
+    
+    assert engine.add_basket('Euro / Dollar', 'EUR', {'USD': 1.0})
+    assert not engine.add_basket('Inconnu', 'XYZ', {'USD': 1.0})
+    engine.update(prix)
+    frame = engine.frame()
+    assert frame['indice'].tolist() == ['Euro / Dollar']
+    eur_usd = symboles.index('EUR/USD')
+    assert frame['valeur'].iloc[0] == pytest.approx(BASKET_BASE_VALUE * prix[eur_usd] / matrices['prix'][0, eur_usd])
+    assert frame['change_pct'].iloc[0] == pytest.approx(0.0, abs=1e-12)
+    
+    # Remplacement d'un panier existant : même nombre de paniers, valeurs recalculées
+    assert engine.add_basket('Euro / Dollar', 'EUR', {'GBP': 1.0})
+    assert len(engine.frame()) == 1
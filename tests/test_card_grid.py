@@ -0,0 +1,75 @@
+# tests/test_card_grid.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from Dashboard import CARD_SPARKLINE_REFRESH, CurrencyCardGrid
+
+@pytest.fixture
+def snapshot(currencies):
+    """Instantané temps réel au format de MarketState.current_data"""
+    return pd.DataFrame([{
+        'symbole': symbole,
+        'nom': info['nom'],
+        'icone': info['icone'],
+        'categorie': info['categorie'],
+        'unite': info['unite'],
+        'prix': info['prix_base'],
+        'change_pct': 0.5,
+        'volatilite': info['volatilite'],
+        'volume_journalier': info['volume_journalier']
+    } for symbole, info in currencies.items()])
+
+def test_card_grid_renders_one_block_per_category(snapshot):
+    grids, changed = CurrencyCardGrid().render(snapshot)
+    assert changed == snapshot['symbole'].tolist()
+    assert set(grids) == set(snapshot['categorie'])
+    for categorie, html in grids.items():
+        symboles = snapshot.loc[snapshot['categorie'] == categorie, 'symbole']
+        assert html.startswith('<div class="currency-grid">')
+        assert html.count('class="currency-card') == len(symboles)
+        assert all(symbole in html for symbole in symboles)
+
+def test_card_grid_regenerates_only_changed_cards(snapshot):
+    grid = CurrencyCardGrid()
+    first, _ = grid.render(snapshot)
+    
+    # Même instantané : aucune carte regénérée, même HTML
+    grids, changed = grid.render(snapshot)
+    assert changed == []
+    assert grids == first
+    
+    # Tick invisible à l'arrondi affiché : pas de regénération
+    ticked = snapshot.copy()
+    ticked.loc[0, 'prix'] += 1e-7
+    assert grid.render(ticked)[1] == []
+    
+    # Prix, variation ou volume affichés modifiés : seules ces cartes sont regénérées
+    ticked.loc[0, 'prix'] *= 1.01
+    ticked.loc[3, 'change_pct'] = -1.25
+    ticked.loc[5, 'volume_journalier'] += 10
+    grids, changed = grid.render(ticked)
+    assert changed == [snapshot['symbole'][i] for i in (0, 3, 5)]
+    assert '-1.25%' in grids[snapshot['categorie'][3]]
+
+def test_card_grid_redraws_sparklines_once_per_period(snapshot):
+    n = len(snapshot)
+    rng = np.random.default_rng(0)
+    intraday = {
+        'haut': snapshot['prix'].to_numpy() * 1.01,
+        'bas': snapshot['prix'].to_numpy() * 0.99,
+        'sparkline': 1 + rng.normal(scale=1e-3, size=(60, n)).cumsum(axis=0)
+    }
+    grid = CurrencyCardGrid()
+    grids, changed = grid.render(snapshot, intraday, now=0.0)
+    assert len(changed) == n
+    assert all(html.count('<svg') == html.count('class="currency-card') for html in grids.values())
+    
+    # Courbe qui défile sans changement des valeurs affichées : aucune carte regénérée dans la période
+    scrolled = dict(intraday, sparkline=np.roll(intraday['sparkline'], -1, axis=0))
+    assert grid.render(snapshot, scrolled, now=CARD_SPARKLINE_REFRESH - 1)[1] == []
+    
+    # Période suivante : toutes les sparklines sont redessinées
+    grids, changed = grid.render(snapshot, scrolled, now=CARD_SPARKLINE_REFRESH)
+    assert changed == snapshot['symbole'].tolist()
+    assert grids != grid.render(snapshot, intraday, now=2 * CARD_SPARKLINE_REFRESH)[0]
@@ -0,0 +1,43 @@
+# tests/test_correlation.py
+import numpy as np
+
+from forex_core import CorrelationEngine
+
+# Barres intégrées une à une après l'initialisation sur le début de l'historique
+SPLIT = 400
+
+def test_correlation_engine_update_matches_batch(history):
+    _, symboles, matrices = history
+    prix = matrices['prix']
+    engine = CorrelationEngine.from_history(symboles, prix[:SPLIT], windows=(30, 90, 365))
+    for row in prix[SPLIT:]:
+        engine.update(row)
+    
+    returns = prix[1:] / prix[:-1] - 1
+    for window in (30, 90, 365):
+        expected = np.corrcoef(returns[-window:].T)
+        np.testing.assert_allclose(engine.matrix(window).to_numpy(), expected, atol=1e-9)
+
+def test_correlation_engine_fills_window_incrementally(history):
+    _, symboles, matrices = history
+    prix = matrices['prix']
+    # Historique plus court que la fenêtre : les premières mises à jour n'en retirent rien
+    engine = CorrelationEngine.from_history(symboles, prix[:20], windows=(30,))
+    for row in prix[20:40]:
+        engine.update(row)
+    returns = prix[1:40] / prix[:39] - 1
+    np.testing.assert_allclose(engine.matrix(30).to_numpy(), np.corrcoef(returns[-30:].T), atol=1e-9)
+
+def test_strong_pairs_are_the_largest_off_diagonal_correlations():
+    rng = np.random.default_rng(5)
+    common = rng.normal(size=(200, 1))
+    returns = np.hstack([common + 0.1 * rng.normal(size=(200, 3)), rng.normal(size=(200, 3))])
+    prix = 100 * np.cumprod(1 + 0.01 * np.vstack([np.zeros((1, 6)), returns]), axis=0)
+    symboles = [f'P{j}' for j in range(6)]
+    engine = CorrelationEngine.from_history(symboles, prix, windows=(90,))
+    
+    strong = engine.strong_pairs(90, threshold=0.7, top_k=2)
+    assert len(strong) == 2
+    assert set(strong['Paire 1']) | set(strong['Paire 2']) <= {'P0', 'P1', 'P2'}
+    assert (strong['Corrélation'].abs().diff().iloc[1:] <= 0).all()
+    assert len(engine.strong_pairs(90, threshold=0.7, top_k=10)) == 3
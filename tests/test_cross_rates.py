@@ -0,0 +1,46 @@
+# tests/test_cross_rates.py
+import numpy as np
+import pytest
+
+from forex_core import CrossRateEngine
+
+def consistent_prices(cross_rates, prix):
+    """Prix de toutes les paires alignés sur les taux implicites des jambes USD"""
+    cross_rates.update(prix)
+    return np.array([cross_rates.rate(*symbole.split('/')) for symbole in cross_rates.symboles])
+
+def test_cross_rates_reproduce_usd_legs(history):
+    _, symboles, matrices = history
+    prix = matrices['prix'][-1]
+    engine = CrossRateEngine(symboles)
+    engine.update(prix)
+    assert engine.resolved.all()
+    for symbole, value in zip(symboles, prix):
+        if 'USD' in symbole.split('/'):
+            assert engine.rate(*symbole.split('/')) == pytest.approx(value, rel=1e-12)
+    
+    matrix = engine.matrix(['EUR', 'GBP', 'JPY'])
+    assert matrix.loc['EUR', 'GBP'] == pytest.approx(engine.rate('EUR', 'GBP'), rel=1e-12)
+    assert matrix.loc['GBP', 'EUR'] == pytest.approx(1 / matrix.loc['EUR', 'GBP'], rel=1e-12)
+    np.testing.assert_allclose(np.diag(matrix), 1.0)
+
+def test_cross_rates_flag_inconsistent_crosses(history):
+    _, symboles, matrices = history
+    engine = CrossRateEngine(symboles)
+    prix = consistent_prices(engine, matrices['prix'][-1])
+    engine.update(prix)
+    assert engine.inconsistencies().empty
+    
+    prix[symboles.index('EUR/GBP')] *= 1.01
+    engine.update(prix)
+    flagged = engine.inconsistencies()
+    assert flagged['Paire'].tolist() == ['EUR/GBP']
+    assert flagged['Écart (%)'].iloc[0] == pytest.approx(1.0, rel=1e-9)
+
+def test_cross_rates_update_is_keyed_by_version(history):
+    _, symboles, matrices = history
+    engine = CrossRateEngine(symboles)
+    engine.update(matrices['prix'][-1], version=1)
+    before = engine.log_values
+    engine.update(matrices['prix'][-2], version=1)
+    assert engine.log_values is before
@@ -0,0 +1,47 @@
+# tests/test_downsampling.py
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from Dashboard import WEBGL_POINT_THRESHOLD, downsample_columns, downsample_minmax, line_trace_class
+
+def test_downsample_minmax_keeps_bucket_extremes():
+    rng = np.random.default_rng(0)
+    values = np.cumsum(rng.normal(size=(10_007, 3)), axis=0)
+    idx = downsample_minmax(values, 100)
+    assert idx.shape[1] == 3
+    assert len(idx) <= 2 * 100 + 2
+    for j in range(3):
+        column = idx[:, j]
+        assert (np.diff(column) >= 0).all()
+        assert column[0] == 0 and column[-1] == len(values) - 1
+        # Extrêmes de chaque intervalle (et donc extrêmes globaux) conservés
+        size = -(-len(values) // 100)
+        for start in range(0, len(values), size):
+            block = values[start:start + size, j]
+            assert start + block.argmin() in column
+            assert start + block.argmax() in column
+
+def test_downsample_minmax_short_series_unchanged():
+    values = np.arange(150.0)
+    np.testing.assert_array_equal(downsample_minmax(values, 100), np.arange(150))
+
+def test_downsample_minmax_uneven_last_bucket():
+    # Dernier intervalle incomplet : le rembourrage ne produit pas d'indice hors limites
+    values = np.r_[np.zeros(1000), 5.0]
+    idx = downsample_minmax(values, 7)
+    assert idx.max() == 1000
+    assert 1000 in idx
+
+def test_downsample_columns_pairs_x_and_y():
+    dates = pd.date_range('2020-01-01', periods=5000, freq='D')
+    frame = pd.DataFrame({'A': np.sin(np.arange(5000) / 50), 'B': np.arange(5000.0)})
+    series = downsample_columns(dates, frame, n_buckets=200)
+    for column, (x, y) in series.items():
+        assert len(x) == len(y) <= 402
+        np.testing.assert_array_equal(y, frame[column].to_numpy()[dates.get_indexer(x)])
+    assert series['A'][1].max() == frame['A'].max()
+
+def test_line_trace_class_switches_to_webgl():
+    assert line_trace_class(WEBGL_POINT_THRESHOLD) is go.Scatter
+    assert line_trace_class(WEBGL_POINT_THRESHOLD + 1) is go.Scattergl
@@ -0,0 +1,66 @@
+# tests/test_generation.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from forex_core import generate_historical_matrices
+
+class ConstantRng:
+    """Générateur dont les tirages uniformes valent `u` et les tirages gaussiens leur moyenne :
+    le prix généré est alors prix_base × impact mondial × saisonnalité"""
+    
+    def __init__(self, u):
+        self.u = u
+    
+    def random(self, size):
+        return np.full(size, self.u)
+    
+    def normal(self, loc, scale, size):
+        return np.broadcast_to(np.asarray(loc, dtype=np.float64), size).copy()
+    
+    def uniform(self, low, high, size):
+        return np.full(size, low)
+
+def regime_bounds(date, symbole):
+    """Bornes de l'impact mondial d'une barre, selon les règles de la boucle ligne à ligne d'origine"""
+    usd = 'USD' in symbole and symbole != 'USD/JPY'
+    if date.year == 2020 and date.month <= 6:
+        return (1.05, 1.15) if usd else (0.9, 1.1)
+    if date.year == 2021:
+        return (0.95, 1.05) if usd else (1.05, 1.15)
+    if date.year == 2022 and date.month >= 2:
+        if symbole in ['EUR/USD', 'GBP/USD']:
+            return 0.9, 1.0
+        if symbole in ['USD/CHF', 'USD/JPY']:
+            return 1.0, 1.1
+        return 1.0, 1.0
+    if date.year >= 2023:
+        return 0.98, 1.08
+    return 1.0, 1.0
+
+@pytest.mark.parametrize('u', [0.0, 1.0])
+def test_regime_masks_match_row_by_row_rules(currencies, u):
+    # Premiers et derniers jours de chaque régime, et les jours hors régime qui les encadrent
+    dates = pd.DatetimeIndex(['2019-12-31', '2020-01-01', '2020-06-30', '2020-07-01', '2021-01-01',
+                              '2021-12-31', '2022-01-31', '2022-02-01', '2022-12-31', '2023-01-01', '2024-06-15'])
+    prix = generate_historical_matrices(currencies, dates, ConstantRng(u))['prix']
+    
+    prix_base = np.array([info['prix_base'] for info in currencies.values()])
+    seasonal = 1 + 0.003 * np.sin(2 * np.pi * dates.dayofyear.values[:, None] / 365)
+    impact = prix / (prix_base * seasonal)
+    expected = np.array([[regime_bounds(date, symbole)[int(u)] for symbole in currencies] for date in dates])
+    np.testing.assert_allclose(impact, expected, rtol=1e-12)
+
+def test_generation_is_reproducible_and_within_profile(currencies):
+    dates = pd.date_range('2020-01-01', '2020-12-31', freq='D')
+    first = generate_historical_matrices(currencies, dates, np.random.default_rng(7))
+    second = generate_historical_matrices(currencies, dates, np.random.default_rng(7))
+    for field in ('prix', 'volume', 'volatilite_jour'):
+        assert first[field].shape == (len(dates), len(currencies))
+        np.testing.assert_array_equal(first[field], second[field])
+    
+    assert (first['prix'] > 0).all()
+    assert ((first['volume'] >= 100000) & (first['volume'] < 5000000)).all()
+    # Volatilité quotidienne : |N(1, volatilite %) - 1| a pour moyenne volatilite × √(2/π)
+    volatilite = np.array([info['volatilite'] for info in currencies.values()])
+    np.testing.assert_allclose(first['volatilite_jour'].mean(axis=0), volatilite * np.sqrt(2 / np.pi), rtol=0.15)
@@ -0,0 +1,116 @@
+# tests/test_history_cache.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from forex_core import BAR_COLUMNS, FileSource, HistoryCache, load_historical_matrices
+
+class SpySource(FileSource):
+    """Source locale qui enregistre chaque interrogation (paires, date de départ)"""
+    
+    def __init__(self, path):
+        super().__init__(path)
+        self.calls = []
+        self.offline = False
+    
+    def fetch(self, symboles, start, end=None):
+        self.calls.append((sorted(symboles), pd.Timestamp(start)))
+        if self.offline:
+            # Comme yf.download en cas de panne réseau : un résultat vide, sans exception
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        return super().fetch(symboles, start, end)
+
+def write_bars(path, bars):
+    """Écrit des barres (symbole -> (première date, dernière date, prix)) au format long"""
+    frames = [pd.DataFrame({'date': pd.date_range(first, last, freq='D'), 'symbole': symbole, 'prix': prix,
+                            'volume': 1.0}) for symbole, (first, last, prix) in bars.items()]
+    pd.concat(frames, ignore_index=True).to_csv(path, index=False)
+
+def test_file_source_filters_pairs_and_dates(tmp_path):
+    path = str(tmp_path / 'bars.csv')
+    write_bars(path, {'EUR/USD': ('2024-01-01', '2024-01-31', 1.1), 'GBP/USD': ('2024-01-01', '2024-01-31', 1.3)})
+    bars = FileSource(path).fetch(['EUR/USD'], '2024-01-10', '2024-01-20')
+    assert list(bars.columns) == BAR_COLUMNS
+    assert set(bars['symbole']) == {'EUR/USD'}
+    assert bars['date'].min() == pd.Timestamp('2024-01-10')
+    assert bars['date'].max() == pd.Timestamp('2024-01-20')
+
+def test_history_cache_refreshes_each_pair_from_its_own_start(tmp_path):
+    path = str(tmp_path / 'bars.csv')
+    # GBP/USD : flux arrêté le 5 janvier
+    write_bars(path, {'EUR/USD': ('2024-01-01', '2024-01-10', 1.1), 'GBP/USD': ('2024-01-01', '2024-01-05', 1.3)})
+    source = SpySource(path)
+    cache = HistoryCache(source, str(tmp_path / 'cache'))
+    
+    bars = cache.load(['EUR/USD', 'GBP/USD'], '2024-01-01', end='2024-01-10')
+    assert source.calls == [(['EUR/USD', 'GBP/USD'], pd.Timestamp('2024-01-01'))]
+    assert len(bars) == 10 + 5
+    assert bars['prix'].dtype == np.float64
+    
+    # Nouvelles barres pour EUR/USD : GBP/USD a répondu au chargement précédent, elle repart de
+    # cette interrogation et non de sa dernière barre ; les deux paires partagent un lot
+    write_bars(path, {'EUR/USD': ('2024-01-01', '2024-01-20', 1.2), 'GBP/USD': ('2024-01-01', '2024-01-05', 1.3)})
+    source.calls.clear()
+    bars = cache.load(['EUR/USD', 'GBP/USD'], '2024-01-01', end='2024-01-20')
+    assert source.calls == [(['EUR/USD', 'GBP/USD'], pd.Timestamp('2024-01-10'))]
+    assert bars.groupby('symbole')['date'].max().to_dict() == {
+        'EUR/USD': pd.Timestamp('2024-01-20'), 'GBP/USD': pd.Timestamp('2024-01-05')
+    }
+    # La barre du 10 janvier (éventuellement partielle) est remplacée par la nouvelle
+    eur = bars[bars['symbole'] == 'EUR/USD'].set_index('date')['prix']
+    assert eur[pd.Timestamp('2024-01-10')] == 1.2
+    assert eur[pd.Timestamp('2024-01-09')] == 1.1
+    
+    # GBP/USD n'a rien renvoyé : elle n'avance pas et ne retarde pas EUR/USD. Une paire nouvelle
+    # dans l'univers est téléchargée depuis le début, dans son propre lot
+    source.calls.clear()
+    cache.load(['EUR/USD', 'GBP/USD', 'USD/JPY'], '2024-01-01', end='2024-01-20')
+    assert source.calls == [(['EUR/USD'], pd.Timestamp('2024-01-20')), (['GBP/USD'], pd.Timestamp('2024-01-10')),
+                            (['USD/JPY'], pd.Timestamp('2024-01-01'))]
+
+def test_history_cache_retries_after_an_empty_answer(tmp_path):
+    path = str(tmp_path / 'bars.csv')
+    write_bars(path, {'EUR/USD': ('2024-01-01', '2024-01-10', 1.1)})
+    source = SpySource(path)
+    cache = HistoryCache(source, str(tmp_path / 'cache'))
+    cache.load(['EUR/USD'], '2024-01-01', end='2024-01-10')
+    
+    # Panne au démarrage suivant : la paire n'est pas marquée comme interrogée
+    write_bars(path, {'EUR/USD': ('2024-01-01', '2024-01-20', 1.1)})
+    source.offline = True
+    bars = cache.load(['EUR/USD'], '2024-01-01', end='2024-01-20')
+    assert bars['date'].max() == pd.Timestamp('2024-01-10')
+    assert cache.read_checked() == {'EUR/USD': pd.Timestamp('2024-01-10')}
+    
+    # Source rétablie : le trou du 11 au 20 janvier est comblé
+    source.offline = False
+    source.calls.clear()
+    bars = cache.load(['EUR/USD'], '2024-01-01', end='2024-01-20')
+    assert source.calls == [(['EUR/USD'], pd.Timestamp('2024-01-10'))]
+    assert (bars['date'] == pd.date_range('2024-01-01', '2024-01-20')).all()
+
+def test_history_cache_is_keyed_by_source_path(tmp_path):
+    first, second = str(tmp_path / 'first.csv'), str(tmp_path / 'second.csv')
+    write_bars(first, {'EUR/USD': ('2024-01-01', '2024-01-10', 1.1)})
+    write_bars(second, {'EUR/USD': ('2024-01-01', '2024-01-10', 1.5)})
+    cache_dir = str(tmp_path / 'cache')
+    
+    bars = HistoryCache(FileSource(first), cache_dir).load(['EUR/USD'], '2024-01-01', end='2024-01-10')
+    assert (bars['prix'] == 1.1).all()
+    bars = HistoryCache(FileSource(second), cache_dir).load(['EUR/USD'], '2024-01-01', end='2024-01-10')
+    assert (bars['prix'] == 1.5).all()
+    assert len([name for name in os.listdir(cache_dir) if name.endswith('.parquet')]) == 2
+
+def test_load_historical_matrices_aligns_calendars(tmp_path, currencies):
+    path = str(tmp_path / 'bars.csv')
+    write_bars(path, {'EUR/USD': ('2024-01-01', '2024-01-10', 1.1), 'BTC/USD': ('2024-01-03', '2024-01-12', 40000.0)})
+    cache = HistoryCache(FileSource(path), str(tmp_path / 'cache'))
+    dates, symboles, matrices = load_historical_matrices(currencies, cache, '2024-01-01', end='2024-01-12')
+    # Ordre de l'univers, paires sans historique retirées
+    assert symboles == ['EUR/USD', 'BTC/USD']
+    assert len(dates) == 12
+    assert matrices['prix'].dtype == np.float64
+    assert not np.isnan(matrices['prix']).any()
+    assert (matrices['prix'][:, 1] == 40000.0).all()
+    assert matrices['volatilite_jour'][0].tolist() == [0.0, 0.0]
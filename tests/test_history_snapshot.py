@@ -0,0 +1,61 @@
+# tests/test_history_snapshot.py
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from forex_core import SNAPSHOT_TMP_MAX_AGE, HistorySnapshot, MarketState
+
+def test_history_snapshot_roundtrip_and_prune(tmp_path, history):
+    dates, symboles, matrices = history
+    cache_dir = str(tmp_path)
+    older = HistorySnapshot(cache_dir, '20240101-graine1-abc')
+    other = HistorySnapshot(cache_dir, '20240101-graine2-abc')
+    for snapshot in (older, other):
+        snapshot.save(dates[:10], symboles, {field: values[:10] for field, values in matrices.items()})
+    abandoned = os.path.join(older.root, '20240102-graine1-abc.tmp-1')
+    recent = os.path.join(older.root, '20240102-graine1-abc.tmp-2')
+    os.makedirs(abandoned)
+    os.makedirs(recent)
+    stale = time.time() - SNAPSHOT_TMP_MAX_AGE - 60
+    os.utime(abandoned, (stale, stale))
+    
+    snapshot = HistorySnapshot(cache_dir, '20240102-graine1-abc')
+    snapshot.save(dates, symboles, matrices)
+    loaded_dates, loaded_symboles, loaded = snapshot.load()
+    assert loaded_symboles == symboles
+    assert loaded_dates.equals(pd.DatetimeIndex(dates))
+    assert isinstance(loaded['prix'], np.memmap)
+    assert loaded['prix'].flags['F_CONTIGUOUS']
+    np.testing.assert_array_equal(loaded['prix'], matrices['prix'])
+    
+    # Le jour précédent de la même graine et l'écriture abandonnée disparaissent ;
+    # l'autre graine et l'écriture en cours restent
+    assert sorted(os.listdir(snapshot.root)) == ['20240101-graine2-abc', '20240102-graine1-abc',
+                                                 '20240102-graine1-abc.tmp-2']
+
+def test_history_snapshot_load_or_build_builds_once(tmp_path, history):
+    dates, symboles, matrices = history
+    snapshot = HistorySnapshot(str(tmp_path), '20240101-graine1-abc')
+    builds = []
+    
+    def build():
+        builds.append(1)
+        return dates, symboles, matrices
+    
+    for _ in range(2):
+        loaded_dates, _, loaded = snapshot.load_or_build(build)
+    assert len(builds) == 1
+    assert len(loaded_dates) == len(dates)
+    np.testing.assert_array_equal(loaded['volume'], matrices['volume'])
+
+def test_market_state_reads_prices_from_the_snapshot(tmp_path):
+    built = MarketState(seed=3, cache_dir=str(tmp_path))
+    reopened = MarketState(seed=3, cache_dir=str(tmp_path))
+    assert reopened.history_snapshot.path == built.history_snapshot.path
+    # Les prix restent projetés depuis le fichier : aucune copie dans le tas
+    assert isinstance(reopened.history_matrices['prix'], np.memmap)
+    assert np.shares_memory(reopened.price_store.prix, reopened.history_matrices['prix'])
+    np.testing.assert_array_equal(reopened.price_store.prix, built.price_store.prix)
+    assert reopened.history_version != built.history_version
@@ -0,0 +1,53 @@
+# tests/test_indicators.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from forex_core import IndicatorEngine
+
+# Barres intégrées une à une après l'initialisation sur le début de l'historique
+SPLIT = 400
+
+def test_indicator_engine_update_matches_batch(history):
+    _, symboles, matrices = history
+    prix = matrices['prix']
+    engine = IndicatorEngine.from_history(symboles, prix[:SPLIT])
+    for row in prix[SPLIT:]:
+        values = engine.update(row)
+    
+    batch = IndicatorEngine.from_history(symboles, prix).current()
+    pd.testing.assert_frame_equal(values, batch, rtol=1e-8)
+
+def test_indicator_engine_matches_pandas_reference(history):
+    _, symboles, matrices = history
+    prix = matrices['prix']
+    engine = IndicatorEngine.from_history(symboles, prix[:SPLIT])
+    for row in prix[SPLIT:]:
+        values = engine.update(row)
+    
+    frame = pd.DataFrame(prix, columns=symboles)
+    std = frame.rolling(20).std().iloc[-1].to_numpy()
+    np.testing.assert_allclose(values['MA20'], frame.rolling(20).mean().iloc[-1], rtol=1e-10)
+    np.testing.assert_allclose(values['MA50'], frame.rolling(50).mean().iloc[-1], rtol=1e-10)
+    np.testing.assert_allclose(values['Bollinger_High'], values['MA20'] + 2 * std, rtol=1e-8)
+    np.testing.assert_allclose(values['Bollinger_Low'], values['MA20'] - 2 * std, rtol=1e-8)
+    
+    # RSI de Wilder : lissage exponentiel de paramètre 1/14 des gains et des pertes
+    delta = frame.diff().iloc[1:]
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    np.testing.assert_allclose(values['RSI'], 100 - 100 / (1 + gain / loss), rtol=1e-8)
+
+def test_indicator_engine_peek_leaves_state_unchanged(history):
+    _, symboles, matrices = history
+    prix = matrices['prix']
+    engine = IndicatorEngine.from_history(symboles, prix[:SPLIT])
+    before = engine.current()
+    peeked = engine.peek(prix[SPLIT])
+    pd.testing.assert_frame_equal(engine.current(), before)
+    pd.testing.assert_frame_equal(peeked, engine.update(prix[SPLIT]))
+
+def test_indicator_engine_rejects_short_history(history):
+    _, symboles, matrices = history
+    with pytest.raises(ValueError):
+        IndicatorEngine.from_history(symboles, matrices['prix'][:50])
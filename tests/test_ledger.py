@@ -0,0 +1,82 @@
+# tests/test_ledger.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from forex_core import PositionLedger
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = PositionLedger(str(tmp_path / 'positions.sqlite'))
+    yield ledger
+    ledger.close_connection()
+
+def snapshot(**prix):
+    """Instantané temps réel minimal (symbole, prix) ; les clés utilisent _ à la place de /"""
+    return pd.DataFrame({'symbole': [s.replace('_', '/') for s in prix], 'prix': list(prix.values())})
+
+def open_position(ledger, symbole='EUR/USD', sens=1, levier=1.0, stop_loss=1.0, take_profit=2.0):
+    return ledger.open(symbole, sens, 1000.0, levier, 1.0, stop_loss, take_profit)
+
+def test_ledger_settles_take_profit(ledger):
+    position = open_position(ledger)
+    assert ledger.settle(snapshot(EUR_USD=1.025)).empty
+    assert ledger.open_positions().empty
+    closed = ledger.history().set_index('id').loc[position]
+    assert closed['raison'] == 'Take Profit'
+    assert closed['prix_sortie'] == 1.025
+    assert closed['pnl'] == pytest.approx(25.0)
+
+def test_ledger_settles_stop_loss_on_short(ledger):
+    position = open_position(ledger, sens=-1, levier=10.0, stop_loss=1.0)
+    ledger.settle(snapshot(EUR_USD=1.015))
+    closed = ledger.history().set_index('id').loc[position]
+    assert closed['raison'] == 'Stop Loss'
+    assert closed['pnl'] == pytest.approx(-150.0)
+
+def test_ledger_settles_liquidation_before_wider_stop(ledger):
+    # Levier 50 : la marge est perdue à -2 %, avant le stop demandé de 5 %
+    position = open_position(ledger, levier=50.0, stop_loss=5.0, take_profit=10.0)
+    ledger.settle(snapshot(EUR_USD=0.975))
+    closed = ledger.history().set_index('id').loc[position]
+    assert closed['raison'] == 'Liquidation'
+    assert closed['pnl'] == pytest.approx(-1000.0)
+
+def test_ledger_keeps_positions_within_bounds_open(ledger):
+    position = open_position(ledger)
+    valued = ledger.settle(snapshot(EUR_USD=1.01))
+    assert valued['id'].tolist() == [position]
+    assert valued['raison'].isna().all()
+    assert valued['pnl_latent'].iloc[0] == pytest.approx(10.0)
+    assert ledger.history().empty
+
+def test_ledger_keeps_positions_without_price_open(ledger):
+    missing = open_position(ledger, symbole='USD/JPY')
+    unpriced = open_position(ledger, symbole='GBP/USD')
+    hit = open_position(ledger)
+    valued = ledger.settle(snapshot(EUR_USD=1.05, GBP_USD=np.nan)).set_index('id')
+    
+    # Paire absente de l'instantané ou sans prix : ni stop ni objectif, la position reste ouverte
+    assert sorted(valued.index) == [missing, unpriced]
+    assert valued['prix'].isna().all()
+    assert valued['raison'].isna().all()
+    assert sorted(ledger.open_positions()['id']) == [missing, unpriced]
+    assert ledger.history()['id'].tolist() == [hit]
+
+def test_ledger_close_ignores_closed_and_unpriced_positions(ledger):
+    first = open_position(ledger)
+    second = open_position(ledger)
+    assert ledger.close([first], 1.01) == 1
+    assert ledger.close([first, second], [1.02, np.nan]) == 0
+    assert ledger.open_positions()['id'].tolist() == [second]
+    
+    # Cache des positions ouvertes périmé (clôture par un autre processus) : rien n'est réécrit
+    ledger.open_positions()
+    with ledger.connection:
+        ledger.connection.execute("UPDATE positions SET statut = 'cloturee' WHERE id = ?", (second,))
+    assert ledger.close([second], 1.03) == 0
+    
+    stats = ledger.statistics()
+    assert stats['trades'] == 1
+    assert stats['pnl_total'] == pytest.approx(10.0)
+    assert stats['taux_reussite'] == 100.0
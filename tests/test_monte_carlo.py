@@ -0,0 +1,58 @@
+# tests/test_monte_carlo.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from forex_core import EXIT_REASONS, MONTE_CARLO_PATHS, MonteCarloPreview, PriceStore
+
+def naive_simulate(preview, symbole, horizon, direction, stop_loss, take_profit, leverage, n_paths, rng):
+    """Référence : trajectoires complètes converties en variations (%) puis premier franchissement"""
+    drift, sigma = preview.calibrate(symbole)
+    stop = min(stop_loss, 100.0 / leverage)
+    returns = np.expm1(np.cumsum(rng.standard_normal((n_paths, horizon)) * sigma + drift, axis=1)) * 100 * direction
+    t_tp = np.where((returns >= take_profit).any(axis=1), (returns >= take_profit).argmax(axis=1), horizon)
+    t_sl = np.where((returns <= -stop).any(axis=1), (returns <= -stop).argmax(axis=1), horizon)
+    exit_index = np.minimum(np.minimum(t_tp, t_sl), horizon - 1)
+    reason = np.where(np.minimum(t_tp, t_sl) >= horizon, 'Échéance', np.where(t_tp < t_sl, 'Take Profit', 'Stop'))
+    return reason, exit_index + 1
+
+def test_preview_runs_all_paths_at_the_longest_horizon(price_store, currencies):
+    preview = MonteCarloPreview(price_store, currencies, np.random.default_rng(0))
+    result = preview.simulate('USD/HKD', 365, 1, 10.0, 20.0, 1)
+    assert len(result['pnl']) == MONTE_CARLO_PATHS
+    assert result['probabilites'].sum() == pytest.approx(1.0)
+    assert list(result['probabilites'].index) == list(EXIT_REASONS)
+    assert result['quantiles'].is_monotonic_increasing
+    assert 1 <= result['jours_moyen'] <= 365
+
+@pytest.mark.parametrize('direction', [1, -1])
+def test_preview_matches_full_path_reference(price_store, currencies, direction):
+    preview = MonteCarloPreview(price_store, currencies, np.random.default_rng(1))
+    result = preview.simulate('EUR/USD', 60, direction, 1.0, 2.0, 10, chunk_size=7_000)
+    reason, days = naive_simulate(preview, 'EUR/USD', 60, direction, 1.0, 2.0, 10, MONTE_CARLO_PATHS,
+                                  np.random.default_rng(2))
+    probabilites = result['probabilites']
+    assert probabilites['Take Profit'] == pytest.approx((reason == 'Take Profit').mean(), abs=0.01)
+    assert probabilites['Stop Loss'] == pytest.approx((reason == 'Stop').mean(), abs=0.01)
+    assert probabilites['Échéance'] == pytest.approx((reason == 'Échéance').mean(), abs=0.01)
+    assert result['jours_moyen'] == pytest.approx(days.mean(), rel=0.03)
+
+@pytest.fixture
+def trending():
+    """Paire sans volatilité dont le cours croît de 0,1 % par jour : trajectoires déterministes"""
+    dates = pd.date_range('2023-01-01', periods=300, freq='D')
+    store = PriceStore(dates, ['X/USD'], (1.001 ** np.arange(300))[:, None])
+    return MonteCarloPreview(store, {'X/USD': {'volatilite': 0.0}}, np.random.default_rng(0))
+
+@pytest.mark.parametrize('direction, stop_loss, take_profit, leverage, reason, day', [
+    (1, 1.0, 2.0, 10, 'Take Profit', 20),     # log(1.02) / log(1.001) = 19.8
+    (-1, 1.0, 2.0, 10, 'Stop Loss', 10),      # log(1.01) / log(1.001) = 9.96
+    (-1, 5.0, 2.0, 100, 'Liquidation', 10),   # marge perdue à +1 %, avant le stop de 5 %
+    (1, 1.0, 50.0, 1, 'Échéance', 30),
+])
+def test_preview_exits_on_deterministic_paths(trending, direction, stop_loss, take_profit, leverage, reason, day):
+    result = trending.simulate('X/USD', 30, direction, stop_loss, take_profit, leverage, n_paths=1000)
+    assert result['probabilites'][reason] == 1.0
+    assert result['jours_moyen'] == day
+    expected = max(direction * (1.001 ** day - 1) * 100 * leverage, -100.0) * 1000.0 / 100
+    np.testing.assert_allclose(result['pnl'], expected, rtol=1e-4)
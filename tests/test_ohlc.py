@@ -0,0 +1,62 @@
+# tests/test_ohlc.py
+import numpy as np
+import pandas as pd
+
+from forex_core import OHLC_FIELDS, OHLCPyramid, OHLCStoreLevel, PriceStore
+
+def test_ohlc_pyramid_update_matches_batch(history):
+    dates, symboles, matrices = history
+    prix, volume = matrices['prix'], matrices['volume']
+    # Coupure en milieu de semaine et de mois : les barres en cours sont complétées
+    split = dates.get_loc(pd.Timestamp('2022-06-15'))
+    pyramid = OHLCPyramid.from_history(dates[:split], symboles, prix[:split], volume[:split])
+    for date, row, row_volume in zip(dates[split:], prix[split:], volume[split:]):
+        pyramid.update(date, row, row_volume)
+    
+    batch = OHLCPyramid.from_history(dates, symboles, prix, volume)
+    cols = np.arange(len(symboles))
+    for level, expected in zip(pyramid.levels, batch.levels):
+        assert level.size == expected.size
+        periods, bars = level.slice(0, level.size, cols)
+        expected_periods, expected_bars = expected.slice(0, expected.size, cols)
+        np.testing.assert_array_equal(periods, expected_periods)
+        for field in OHLC_FIELDS:
+            np.testing.assert_allclose(bars[field], expected_bars[field], rtol=1e-5,
+                                       err_msg=f'{level.name} / {field}')
+
+def test_ohlc_daily_level_reads_price_store(history):
+    dates, symboles, matrices = history
+    store = PriceStore(dates, symboles, matrices['prix'])
+    pyramid = OHLCPyramid.from_history(dates, symboles, store.prix, matrices['volume'])
+    daily = pyramid.get_level('jour')
+    assert isinstance(daily, OHLCStoreLevel)
+    assert daily.prix is store.prix
+    # Seule la dernière journée est copiée en mémoire
+    assert daily.tail.size == 1
+    
+    bars = pyramid.query(['EUR/USD', 'USD/JPY'], start='2022-03-01', end='2022-03-31', level=daily)
+    prix = store.frame(['EUR/USD', 'USD/JPY'], start='2022-02-01', end='2022-03-31')
+    expected = prix.shift(1).loc['2022-03-01':].stack()
+    np.testing.assert_allclose(bars['ouverture'], expected.to_numpy(), rtol=1e-6)
+    np.testing.assert_allclose(bars['cloture'], prix.loc['2022-03-01':].stack().to_numpy(), rtol=1e-6)
+    
+    # La journée en cours est complétée en mémoire, l'historique n'est pas modifié
+    last_close = store.prix[-1].copy()
+    pyramid.update(dates[-1], last_close * 1.01)
+    np.testing.assert_array_equal(store.prix[-1], last_close)
+    assert daily.size == len(dates)
+    bars = pyramid.query(['EUR/USD'], start=dates[-1], level=daily)
+    np.testing.assert_allclose(bars['cloture'], last_close[store.columns['EUR/USD']] * 1.01, rtol=1e-6)
+
+def test_ohlc_pyramid_selects_coarsest_level(history):
+    dates, symboles, matrices = history
+    pyramid = OHLCPyramid.from_history(dates, symboles, matrices['prix'], matrices['volume'])
+    assert pyramid.select_level(target_points=30).name == 'mois'
+    assert pyramid.select_level(target_points=150).name == 'semaine'
+    assert pyramid.select_level('2023-06-01', target_points=150).name == 'jour'
+    
+    bars = pyramid.query(['EUR/USD'], level=pyramid.get_level('mois'))
+    assert bars.attrs['niveau'] == 'mois'
+    assert len(bars) == 36
+    assert (bars['haut'] >= bars[['ouverture', 'cloture']].max(axis=1)).all()
+    assert (bars['bas'] <= bars[['ouverture', 'cloture']].min(axis=1)).all()
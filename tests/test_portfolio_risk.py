@@ -0,0 +1,56 @@
+# tests/test_portfolio_risk.py
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forex_core import PortfolioRisk, tail_risk
+
+def positions_frame(rows):
+    return pd.DataFrame(rows, columns=['symbole', 'sens', 'montant', 'levier', 'prix_entree', 'prix'])
+
+def test_portfolio_risk_parametric_single_position(price_store):
+    risk = PortfolioRisk(price_store, np.random.default_rng(0), window=250, n_paths=20_000)
+    risk.prepare(version=1)
+    positions = positions_frame([('EUR/USD', 1, 1000.0, 10.0, 1.0, 1.0)])
+    result = risk.evaluate(positions).set_index(['methode', 'confiance'])
+    
+    returns = price_store.values('EUR/USD')[-251:]
+    returns = returns[1:] / returns[:-1] - 1
+    exposure = 10_000.0
+    sigma = exposure * returns.std(ddof=1)
+    mean = exposure * returns.mean()
+    z = NormalDist().inv_cdf(0.95)
+    assert result.loc[('parametrique', 0.95), 'var'] == pytest.approx(sigma * z - mean, rel=1e-9)
+    assert result.loc[('parametrique', 0.95), 'es'] == pytest.approx(
+        sigma * NormalDist().pdf(z) / 0.05 - mean, rel=1e-9)
+    
+    var, es = tail_risk(exposure * returns, [0.95])
+    assert result.loc[('historique', 0.95), 'var'] == pytest.approx(var[0])
+    assert result.loc[('historique', 0.95), 'es'] == pytest.approx(es[0])
+    # Monte Carlo : mêmes moments que la loi paramétrique, à l'erreur d'échantillonnage près
+    assert result.loc[('monte_carlo', 0.95), 'var'] == pytest.approx(sigma * z - mean, rel=0.05)
+    assert (result['es'] >= result['var']).all()
+
+def test_portfolio_risk_nets_and_excludes_positions(price_store):
+    risk = PortfolioRisk(price_store, np.random.default_rng(0), window=250)
+    risk.prepare(version=1)
+    positions = positions_frame([
+        ('EUR/USD', 1, 1000.0, 10.0, 1.0, 1.1),
+        ('EUR/USD', -1, 500.0, 2.0, 1.0, 1.1),
+        ('XAU/USD', 1, 1000.0, 10.0, 1.0, 1.0),
+        ('USD/JPY', 1, 1000.0, 10.0, 150.0, np.nan),
+    ])
+    exposure = risk.exposure(positions)
+    expected = np.zeros(len(price_store.symboles))
+    expected[price_store.columns['EUR/USD']] = 10_000.0 * 1.1 - 1000.0 * 1.1
+    np.testing.assert_allclose(exposure, expected)
+    assert risk.unpriced(positions)['symbole'].tolist() == ['XAU/USD', 'USD/JPY']
+    
+    # Les positions exclues ne changent pas le risque
+    pd.testing.assert_frame_equal(risk.evaluate(positions), risk.evaluate(positions.iloc[:2]))
+    
+    shocks = risk.shocks
+    risk.prepare(version=1)
+    assert risk.shocks is shocks
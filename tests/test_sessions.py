@@ -0,0 +1,58 @@
+# tests/test_sessions.py
+import types
+
+import Dashboard
+from Dashboard import (SESSION_FORGET_AFTER, SESSION_IDLE_TIMEOUT, SESSION_RESERVED_KEYS,
+                       SessionRegistry, enforce_session_budget)
+
+class FakeSessionState(dict):
+    """État de session minimal : un dict exposant to_dict comme celui de Streamlit"""
+    
+    def to_dict(self):
+        return dict(self)
+
+def test_session_registry_idle_after_timeout():
+    registry = SessionRegistry()
+    registry.touch('a', 100, now=0.0)
+    assert not registry.is_idle('a', now=SESSION_IDLE_TIMEOUT)
+    assert registry.is_idle('a', now=SESSION_IDLE_TIMEOUT + 1)
+    # Une nouvelle interaction réveille la session
+    registry.touch('a', 100, now=SESSION_IDLE_TIMEOUT + 1)
+    assert not registry.is_idle('a', now=SESSION_IDLE_TIMEOUT + 2)
+    # Session inconnue : jamais en veille
+    assert not registry.is_idle('inconnue', now=10 * SESSION_IDLE_TIMEOUT)
+
+def test_session_registry_summary_counts_active_sessions():
+    registry = SessionRegistry()
+    registry.touch('a', 100, now=0.0)
+    registry.touch('b', 250, now=SESSION_IDLE_TIMEOUT)
+    assert registry.summary(now=SESSION_IDLE_TIMEOUT) == (2, 350)
+    # 'a' est en veille : elle n'est plus comptée mais reste connue
+    assert registry.summary(now=SESSION_IDLE_TIMEOUT + 1) == (1, 250)
+    assert 'a' in registry.sessions
+
+def test_session_registry_forgets_vanished_sessions():
+    registry = SessionRegistry()
+    registry.touch('a', 100, now=0.0)
+    registry.touch('b', 100, now=SESSION_FORGET_AFTER)
+    assert set(registry.sessions) == {'a', 'b'}
+    registry.touch('b', 100, now=SESSION_FORGET_AFTER + 1)
+    assert set(registry.sessions) == {'b'}
+
+def test_enforce_session_budget_evicts_largest_entries(monkeypatch):
+    state = FakeSessionState({
+        'session_id': 'x' * 5000,
+        'historique': list(range(20_000)),
+        'selection': ['EUR/USD'] * 500,
+        'periode': '1A',
+    })
+    monkeypatch.setattr(Dashboard, 'st', types.SimpleNamespace(session_state=state))
+    sizes = Dashboard.session_state_sizes()
+    budget = sizes['session_id'] + sizes['selection'] + sizes['periode']
+    total = enforce_session_budget(budget)
+    # Seule la plus grosse entrée part ; les clés réservées restent même si elles pèsent lourd
+    assert set(state) == {'session_id', 'selection', 'periode'}
+    assert total == budget
+    total = enforce_session_budget(0)
+    assert set(state) <= set(SESSION_RESERVED_KEYS)
+    assert total == sizes['session_id']
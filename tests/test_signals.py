@@ -0,0 +1,89 @@
+# tests/test_signals.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from forex_core import DEFAULT_SIGNAL_RULES, SIGNAL_STRONG_FORCE, SignalEngine
+
+# Une seule règle pondérée : le signal émis est alors le vote de cette règle
+ONLY = {
+    'rsi': {'weight_rsi': 1.0, 'weight_crossover': 0.0, 'weight_bollinger': 0.0},
+    'crossover': {'weight_rsi': 0.0, 'weight_crossover': 1.0, 'weight_bollinger': 0.0},
+    'bollinger': {'weight_rsi': 0.0, 'weight_crossover': 0.0, 'weight_bollinger': 1.0},
+}
+VOTE_SIGNALS = {-1: 'VENTE', 0: 'NEUTRE', 1: 'ACHAT'}
+
+@pytest.fixture(scope='module')
+def random_walk():
+    """Marches aléatoires (dates × paires) : tendances et retournements pour toutes les règles"""
+    rng = np.random.default_rng(11)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(1500, 40)), axis=0))
+
+def reference_votes(prix, rules=DEFAULT_SIGNAL_RULES):
+    """Votes (-1, 0, 1) de chaque règle sur la dernière barre, calculés avec pandas"""
+    frame = pd.DataFrame(prix)
+    delta = frame.diff().iloc[1:]
+    gain = delta.clip(lower=0).ewm(alpha=1 / rules['rsi_period'], adjust=False).mean().iloc[-1]
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / rules['rsi_period'], adjust=False).mean().iloc[-1]
+    rsi = (100 - 100 / (1 + gain / loss)).to_numpy()
+    rsi_vote = np.where(rsi > rules['rsi_overbought'], -1, np.where(rsi < rules['rsi_oversold'], 1, 0))
+    
+    spread = np.sign(frame.rolling(rules['ma_short']).mean() - frame.rolling(rules['ma_long']).mean())
+    recent = spread.iloc[-(rules['crossover_lookback'] + 1):]
+    crossed = (recent.diff().iloc[1:] != 0).any()
+    cross_vote = np.where(crossed, spread.iloc[-1], 0)
+    
+    mean = frame.rolling(rules['bollinger_period']).mean().iloc[-1]
+    std = frame.rolling(rules['bollinger_period']).std().iloc[-1]
+    z = ((frame.iloc[-1] - mean) / std).to_numpy()
+    k = rules['bollinger_std']
+    boll_vote = np.where(z > k, -1, np.where(z < -k, 1, 0))
+    return rsi, {'rsi': rsi_vote, 'crossover': cross_vote.astype(int), 'bollinger': boll_vote}
+
+def test_signal_votes_match_pandas_reference(random_walk):
+    engines = {rule: SignalEngine(weights) for rule, weights in ONLY.items()}
+    history_length = engines['rsi'].history_length
+    seen = {rule: set() for rule in ONLY}
+    for end in range(history_length, len(random_walk) + 1, 25):
+        prix = random_walk[end - history_length:end]
+        symboles = [f'P{j}' for j in range(prix.shape[1])]
+        rsi, votes = reference_votes(prix)
+        for rule, engine in engines.items():
+            signals = engine.compute(symboles, prix)
+            np.testing.assert_allclose(signals['RSI'], rsi, rtol=1e-8)
+            expected = [VOTE_SIGNALS[vote] for vote in votes[rule]]
+            assert signals['Signal'].tolist() == expected, (rule, end)
+            seen[rule].update(votes[rule].tolist())
+    # Chaque règle a voté dans les deux sens sur l'échantillon
+    assert all(values == {-1, 0, 1} for values in seen.values()), seen
+
+def test_single_full_intensity_rule_is_a_strong_signal():
+    # Baisse régulière puis saut : MM20 croise MM50 à la hausse sur la dernière barre
+    prix = np.r_[100 - 0.1 * np.arange(299), 100.0][:, None]
+    prix[-1] = prix[-2] + 80
+    signals = SignalEngine(ONLY['crossover']).compute(['X/USD'], prix).iloc[0]
+    assert signals['Signal'] == 'ACHAT'
+    assert signals['Raison'] == 'Croisement haussier MM20/50'
+    assert signals['Force'] == SIGNAL_STRONG_FORCE
+    
+    # Règles concordantes (RSI et Bollinger en surachat) : au-delà du seuil des signaux forts
+    signals = SignalEngine({'weight_crossover': 0.0}).compute(['X/USD'], prix).iloc[0]
+    assert signals['Signal'] == 'VENTE'
+    assert signals['Force'] > SIGNAL_STRONG_FORCE
+
+def test_strong_signals_occur_on_synthetic_history(history):
+    _, symboles, matrices = history
+    engine = SignalEngine()
+    strong = 0
+    for end in range(engine.history_length, len(matrices['prix']), 30):
+        signals = engine.compute(symboles, matrices['prix'][:end])
+        strong += ((signals['Force'] >= SIGNAL_STRONG_FORCE) & (signals['Signal'] != 'NEUTRE')).sum()
+        assert signals['Force'].between(1, 10).all()
+    assert strong > 0
+
+def test_signal_engine_caches_per_version(history):
+    _, symboles, matrices = history
+    engine = SignalEngine()
+    first = engine.evaluate(symboles, matrices['prix'], version=(1, 0))
+    assert engine.evaluate(symboles, matrices['prix'][:-1], version=(1, 0)) is first
+    assert engine.evaluate(symboles, matrices['prix'][:-1], version=(1, 1)) is not first
@@ -0,0 +1,118 @@
+# tests/test_tick_engine.py
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forex_core import MAX_CATCHUP_TICKS, LiveFeed, TickEngine
+
+def current_data(n_paires=3, prix=1.0, volatilite=2.0):
+    """Données courantes minimales au format de MarketState.initialize_current_data"""
+    return pd.DataFrame({
+        'symbole': [f'X{i:04d}/USD' for i in range(n_paires)],
+        'categorie': 'Majeures',
+        'prix': prix,
+        'change_pct': 0.0,
+        'volatilite': volatilite,
+        'volume_journalier': 100.0
+    })
+
+def test_tick_engine_moves_all_pairs_with_daily_volatility():
+    data = current_data(20_000, volatilite=2.0)
+    engine = TickEngine(data, np.random.default_rng(0), tick_probability=0.5, ticks_per_day=100)
+    engine.tick(100)
+    log_returns = np.log(engine.prix)
+    # Somme de k ~ B(100, 0.5) chocs de variance σ² / 100 : variance totale 0.5 σ²
+    assert log_returns.mean() == pytest.approx(0.0, abs=5e-4)
+    assert log_returns.var() == pytest.approx(0.5 * 0.02 ** 2, rel=0.05)
+    assert (engine.volume > 0).all()
+    assert engine.tick_count == 100
+    
+    engine.tick(0)
+    assert engine.tick_count == 100
+
+def test_tick_engine_is_reproducible():
+    first = TickEngine(current_data(), np.random.default_rng(3))
+    second = TickEngine(current_data(), np.random.default_rng(3))
+    for engine in (first, second):
+        engine.tick(5)
+        engine.tick(1)
+    np.testing.assert_array_equal(first.prix, second.prix)
+    np.testing.assert_array_equal(first.volume, second.volume)
+
+def test_tick_engine_advance_catches_up_elapsed_ticks():
+    engine = TickEngine(current_data(), np.random.default_rng(0))
+    start = engine.last_update
+    assert engine.advance(start + 0.5) == 0
+    assert engine.advance(start + 3.2) == 3
+    assert engine.last_update == pytest.approx(start + 3.0)
+    # Longue absence : rattrapage plafonné, l'horloge repart de maintenant
+    assert engine.advance(start + 10 * MAX_CATCHUP_TICKS) == MAX_CATCHUP_TICKS
+    assert engine.last_update == start + 10 * MAX_CATCHUP_TICKS
+    assert engine.tick_count == 3 + MAX_CATCHUP_TICKS
+    # Une ligne d'historique intraday par avancée (plus la ligne initiale)
+    assert engine.history.count == 3
+
+def test_tick_engine_snapshot_keeps_current_data_format():
+    data = current_data().assign(change_pct=[1.0, -2.0, 0.0])
+    engine = TickEngine(data, np.random.default_rng(0))
+    snapshot = engine.snapshot()
+    assert list(snapshot.columns) == list(data.columns)
+    pd.testing.assert_frame_equal(snapshot, data)
+    
+    engine.tick(10)
+    snapshot = engine.snapshot()
+    np.testing.assert_array_equal(snapshot['prix'], engine.prix)
+    np.testing.assert_allclose(snapshot['change_pct'], (engine.prix / engine.ouverture - 1) * 100)
+    # Copie : les ticks suivants ne modifient pas un instantané publié
+    prix = snapshot['prix'].copy()
+    engine.tick(10)
+    pd.testing.assert_series_equal(snapshot['prix'], prix)
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def test_live_feed_publishes_snapshots_until_stopped():
+    engine = TickEngine(current_data(), np.random.default_rng(0))
+    feed = LiveFeed(engine, interval=0.01)
+    feed.start()
+    try:
+        assert wait_for(lambda: feed.version >= 3)
+        assert feed.error is None
+    finally:
+        feed.stop()
+        feed.join(timeout=1.0)
+    assert not feed.is_alive()
+    version = feed.version
+    time.sleep(0.05)
+    assert feed.version == version
+
+def test_live_feed_survives_a_failed_tick(caplog):
+    engine = TickEngine(current_data(), np.random.default_rng(0))
+    failures = threading.Event()
+    advance = engine.advance
+    
+    def flaky_advance(now=None):
+        if not failures.is_set():
+            failures.set()
+            raise RuntimeError('source indisponible')
+        return advance(now)
+    
+    engine.advance = flaky_advance
+    feed = LiveFeed(engine, interval=0.01)
+    feed.start()
+    try:
+        assert wait_for(lambda: failures.is_set() and feed.version >= 2)
+    finally:
+        feed.stop()
+        feed.join(timeout=1.0)
+    # L'erreur est journalisée, puis effacée au tick réussi suivant
+    assert 'source indisponible' in caplog.text
+    assert feed.error is None
@@ -0,0 +1,72 @@
+# tests/test_tick_history.py
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forex_core import BasketIndexEngine, CrossRateEngine, TickEngine, TickRing
+
+def test_tick_ring_window_and_sparkline():
+    ring = TickRing(2, capacity=100)
+    start = pd.Timestamp('2024-01-02 10:00').timestamp()
+    for i in range(250):
+        ring.append(start + i, np.array([i, -i], dtype=np.float32))
+    
+    times, prix = ring.window()
+    assert len(prix) == 100
+    assert prix[-1, 0] == 249 and prix[0, 0] == 150
+    assert np.all(np.diff(times) == 1)
+    assert len(ring.window(seconds=9)[1]) == 10
+    
+    sparkline = ring.sparkline(points=30)
+    assert len(sparkline) <= 30
+    assert sparkline[-1, 0] == 249
+    # Extrêmes de la séance : tous les ticks du jour, au-delà de la capacité du tampon
+    np.testing.assert_array_equal(ring.haut, [249, 0])
+    np.testing.assert_array_equal(ring.bas, [0, -249])
+    
+    ring.append(pd.Timestamp('2024-01-03 00:00:01').timestamp(), np.array([5, 5], dtype=np.float32))
+    np.testing.assert_array_equal(ring.haut, [5, 5])
+    np.testing.assert_array_equal(ring.bas, [5, 5])
+
+def test_tick_engine_resets_session_open_at_day_change():
+    data = pd.DataFrame({
+        'symbole': ['EUR/USD', 'USD/JPY'],
+        'prix': [1.10, 150.0],
+        'change_pct': [1.0, -2.0],
+        'volatilite': 5.0,
+        'volume_journalier': 100.0
+    })
+    engine = TickEngine(data, np.random.default_rng(0))
+    opening = engine.ouverture.copy()
+    engine.tick(10)
+    # Même séance : l'ouverture ne bouge pas
+    np.testing.assert_array_equal(engine.ouverture, opening)
+    
+    # Séance précédente (moteur repris d'un état construit la veille) : l'ouverture repart
+    # du dernier prix connu, les variations sont celles du seul tick de la nouvelle séance
+    engine.history.seance = date(2000, 1, 1)
+    last = engine.prix.copy()
+    engine.tick(1)
+    np.testing.assert_array_equal(engine.ouverture, last)
+    assert engine.history.seance == date.today()
+    snapshot = engine.snapshot()
+    np.testing.assert_allclose(snapshot['change_pct'], (engine.prix / last - 1) * 100)
+
+def test_basket_index_reopen_anchors_session_change(history):
+    _, symboles, matrices = history
+    cross_rates = CrossRateEngine(symboles)
+    engine = BasketIndexEngine(cross_rates, matrices['prix'][0], matrices['prix'][-2], baskets={},
+                               seance=date(2023, 12, 30))
+    engine.add_basket('Euro / Dollar', 'EUR', {'USD': 1.0})
+    eur_usd = symboles.index('EUR/USD')
+    prix = matrices['prix'][-1]
+    engine.update(prix)
+    assert engine.change_pct[0] == pytest.approx((prix[eur_usd] / matrices['prix'][-2, eur_usd] - 1) * 100)
+    
+    engine.reopen(prix, date(2023, 12, 31))
+    assert engine.seance == date(2023, 12, 31)
+    # Variation nulle sur les prix d'ouverture, valeur de l'indice inchangée
+    assert engine.change_pct[0] == pytest.approx(0.0, abs=1e-12)
+    assert engine.values[0] == pytest.approx(100 * prix[eur_usd] / matrices['prix'][0, eur_usd])
@@ -0,0 +1,45 @@
+# tests/test_volatility.py
+import numpy as np
+
+from forex_core import VolatilityEngine, garch_filter
+
+# Barres intégrées une à une après l'ajustement sur le début de l'historique
+SPLIT = 400
+
+def test_volatility_engine_update_matches_refit_recursions(history):
+    _, symboles, matrices = history
+    prix = matrices['prix']
+    engine = VolatilityEngine(symboles)
+    engine.fit(prix[:SPLIT], version=1)
+    alpha, beta, variance = engine.alpha.copy(), engine.beta.copy(), engine.variance.copy()
+    for row in prix[SPLIT:]:
+        engine.update(row)
+    
+    returns = np.diff(np.log(prix), axis=0)
+    # EWMA : même récurrence qu'un ajustement sur tout l'historique (l'amorce s'est éteinte)
+    refit = VolatilityEngine(symboles)
+    refit.fit(prix)
+    np.testing.assert_allclose(engine.ewma, refit.ewma, rtol=1e-10)
+    
+    # GARCH : paramètres figés, le filtre rejoué sur tous les rendements donne la même variance
+    _, garch = garch_filter(returns ** 2, variance, alpha[None, :], beta[None, :])
+    np.testing.assert_allclose(engine.garch, garch[0], rtol=1e-10)
+    
+    realized = engine.realized((1, 21, 252))
+    for h, row in zip((1, 21, 252), realized):
+        np.testing.assert_allclose(row, np.sqrt((returns[-h:] ** 2).mean(axis=0)) * 100, rtol=1e-10)
+
+def test_volatility_engine_fit_is_keyed_by_version(history):
+    _, symboles, matrices = history
+    prix = matrices['prix']
+    engine = VolatilityEngine(symboles)
+    engine.fit(prix[:SPLIT], version=1)
+    garch = engine.garch.copy()
+    engine.fit(prix, version=1)
+    np.testing.assert_array_equal(engine.garch, garch)
+    
+    parameters = engine.parameters()
+    assert (parameters['persistance'] < 1).all()
+    assert (parameters['alpha'] > 0).all()
+    structure = engine.term_structure(['EUR/USD', 'USD/JPY'])
+    assert len(structure) == 2 * len(engine.horizons)